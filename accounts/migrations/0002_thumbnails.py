@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='thumbnails',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -16,6 +16,8 @@ class UserProfile(models.Model):
     emergency_contact = models.CharField(max_length=15, blank=True, null=True)
     is_field_owner = models.BooleanField(default=False)
     profile_picture = models.ImageField(upload_to='profiles/', blank=True, null=True)
+    # Recorded by generate_thumbnails, like Field.thumbnails
+    thumbnails = models.JSONField(null=True, blank=True, editable=False)
     
     def __str__(self):
         return f"{self.user.username}'s Profile"
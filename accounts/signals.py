@@ -0,0 +1,10 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from fields.tasks import queue_thumbnails
+from .models import UserProfile
+
+
+@receiver(post_save, sender=UserProfile)
+def make_profile_picture_thumbnails(sender, instance, **kwargs):
+    queue_thumbnails(instance.profile_picture)
@@ -0,0 +1,48 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from bookings.models import Booking
+from bookings.occupancy import refresh_occupancy
+from fields.caching import field_cache
+from fields.models import Field
+from jobs.queue import task
+from .models import UserProfile
+
+
+@task
+def purge_user(user_id):
+    user = User.objects.filter(pk=user_id).first()
+    if user is None:
+        return
+    profile = UserProfile.objects.filter(user=user).first()
+    if profile and profile.profile_picture:
+        profile.profile_picture.delete(save=False)
+    # Cascades through the user's fields, bookings, payments, reviews and teams
+    user.delete()
+
+
+def schedule_account_deletion(user):
+    """Lock the account, hide its fields and cancel its bookings now; a worker does the cascading delete
+
+    Only the call that flips is_active goes on, so concurrent requests enqueue one purge.
+    Cancelling here rather than in the purge frees the user's slots for others right away.
+    """
+    with transaction.atomic():
+        if not User.objects.filter(pk=user.pk, is_active=True).update(is_active=False):
+            return
+        user.is_active = False
+        now = timezone.now()
+        for field in Field.objects.filter(owner=user, deleted_at__isnull=True):
+            field.is_active = False
+            field.deleted_at = now
+            field.save(update_fields=['is_active', 'deleted_at'])
+
+        active = Booking.objects.filter(user=user, status__in=['Pending', 'Confirmed'])
+        touched = set(active.values_list('field_id', 'booking_date'))
+        active.update(status='Cancelled', updated_at=now)
+        for field_id, booking_date in touched:
+            refresh_occupancy(field_id, booking_date)
+        for field_id in {field_id for field_id, _ in touched}:
+            field_cache.bump_on_commit(field_id)
+        purge_user.enqueue(user_id=user.id)
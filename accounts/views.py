@@ -6,6 +6,7 @@ from django.contrib.auth.decorators import login_required
 from django.utils import timezone
 from .models import UserProfile
 from .forms import UserRegistrationForm, UserProfileForm, UserUpdateForm, ForgotPasswordForm, ResetPasswordForm
+from .tasks import schedule_account_deletion
 
 def register(request):
     if request.method == 'POST':
@@ -77,15 +78,8 @@ def user_login(request):
 def delete_account(request):
     if request.method == 'POST':
         user = request.user
-        try:
-            profile = user.userprofile
-            if getattr(profile, 'profile_picture', None):
-                profile.profile_picture.delete(save=False)
-        except Exception:
-            pass
-
         logout(request)
-        user.delete()
+        schedule_account_deletion(user)
         messages.success(request, 'Your account has been deleted.')
         return redirect('home')
 
@@ -116,7 +110,9 @@ def user_profile(request):
     if request.method == 'POST':
         if 'delete_account' in request.POST:
             username = request.user.username
-            request.user.delete()
+            user = request.user
+            logout(request)
+            schedule_account_deletion(user)
             messages.success(request, f'Account {username} deleted successfully.')
             return redirect('home')
         
@@ -151,7 +147,7 @@ def user_profile(request):
     if user_profile.is_field_owner:
         try:
             from fields.models import Field
-            owned_fields = Field.objects.filter(owner=request.user)
+            owned_fields = Field.objects.owned_by(request.user).cards()
         except ImportError:
             pass
     
@@ -0,0 +1,65 @@
+from decimal import Decimal
+from operator import attrgetter
+
+CENTS = Decimal('0.01')
+
+
+def _plain(*names):
+    return {name: attrgetter(name) for name in names}
+
+
+def _image_url(file):
+    return file.url if file else None
+
+
+# What each resource can include, by name. A getter only runs when its attribute is in the
+# response, so a sparse fieldset (`?fields=id,name`) also skips the queries behind the rest.
+FIELD_ATTRIBUTES = {
+    **_plain('id', 'name', 'field_type', 'location', 'cost_per_hour', 'availability_type', 'is_women_only',
+             'capacity', 'latitude', 'longitude', 'review_count', 'average_rating', 'created_at'),
+    'cost_per_90min': lambda field: field.get_90min_cost().quantize(CENTS),
+    'image': lambda field: _image_url(field.image),
+}
+
+# Listing rows are FieldCards, so only card columns (plus the near-me distance) are on offer
+FIELD_LIST_ATTRIBUTES = {
+    **FIELD_ATTRIBUTES,
+    **_plain('amenities_preview', 'distance_km'),
+}
+
+FIELD_DETAIL_ATTRIBUTES = {
+    **FIELD_ATTRIBUTES,
+    **_plain('description', 'amenities'),
+    'amenity_tags': lambda field: list(field.amenity_tags.order_by('name').values('slug', 'name')),
+    'rating_histogram': lambda field: {str(stars): count for stars, count in field.get_rating_histogram()},
+}
+
+REVIEW_ATTRIBUTES = {
+    **_plain('id', 'rating', 'comment', 'created_at', 'updated_at'),
+    'title': attrgetter('experience_title'),
+    'author': lambda review: review.user.username,
+    'images': lambda review: [
+        {'id': image.id, 'url': image.image.url, 'caption': image.caption} for image in review.images.all()
+    ],
+}
+
+
+def parse_fieldset(value, attributes, default=None):
+    """Attribute names to include, from a `?fields=a,b` value; `default` (or all of them) when absent
+
+    `id` is always included. Raises ValueError naming any attribute the resource doesn't have.
+    """
+    if not value:
+        names = list(default or attributes)
+    else:
+        names = list(dict.fromkeys(name.strip() for name in value.split(',') if name.strip()))
+        unknown = [name for name in names if name not in attributes]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(attributes)}")
+    if 'id' not in names:
+        names.insert(0, 'id')
+    return names
+
+
+def serialize(obj, attributes, names):
+    return {name: attributes[name](obj) for name in names}
@@ -0,0 +1,11 @@
+from django.urls import path
+from . import views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('fields/', views.field_list, name='field_list'),
+    path('fields/<int:field_id>/', views.field_detail, name='field_detail'),
+    path('fields/<int:field_id>/availability/', views.field_availability, name='field_availability'),
+    path('fields/<int:field_id>/reviews/', views.field_reviews, name='field_reviews'),
+]
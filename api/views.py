@@ -0,0 +1,201 @@
+import hashlib
+from datetime import date, timedelta
+
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.views.decorators.http import require_safe
+
+from bookings.occupancy import read_occupancy
+from fields.caching import field_cache
+from fields.facets import apply_facets
+from fields.models import Field, FieldTimeSlot
+from fields.pagination import paginate_request, parse_page_size
+from fields.search_filters import SORT_ORDERS, filtered_fields, normalize_filters
+from fields.views import REVIEW_FEED_ORDER, REVIEW_PAGE_SIZE, review_feed_queryset
+from .serializers import (
+    FIELD_DETAIL_ATTRIBUTES, FIELD_LIST_ATTRIBUTES, REVIEW_ATTRIBUTES, parse_fieldset, serialize,
+)
+
+# Part of every ETag: bump it whenever a response's shape changes so clients drop their copies
+REPRESENTATION_VERSION = 1
+
+# Keyset cursors need plain column orderings; 'rating' sorts NULLs last, which a cursor can't express
+CURSOR_SORTS = ('name', 'price_low', 'price_high', 'newest', 'distance')
+FIELD_LIST_DEFAULT = [name for name in FIELD_LIST_ATTRIBUTES if name != 'distance_km']
+
+# The detail page shows the same 8-day window
+DEFAULT_AVAILABILITY_DAYS = 8
+MAX_AVAILABILITY_DAYS = 31
+
+
+def make_etag(*parts):
+    """Strong ETag over the inputs that fully determine a response body"""
+    digest = hashlib.blake2b(repr((REPRESENTATION_VERSION, *parts)).encode(), digest_size=16).hexdigest()
+    return quote_etag(digest)
+
+
+def _finish(response, etag):
+    response.headers['ETag'] = etag
+    # Clients may keep the body but must revalidate it, which is what makes a 304 useful
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+def not_modified(request, etag):
+    """A 304 when the client's If-None-Match already names `etag`, else None"""
+    response = get_conditional_response(request, etag=etag)
+    return _finish(response, etag) if response is not None else None
+
+
+def json_response(data, etag):
+    return _finish(JsonResponse(data, json_dumps_params={'separators': (',', ':')}), etag)
+
+
+def api_error(status, message):
+    return JsonResponse({'error': message}, status=status)
+
+
+@require_safe
+def field_list(request):
+    """Active fields with the advanced-search filters, keyset-paginated
+
+    The page query runs on every request, but a revalidation only costs that query and one
+    cache round trip: the ETag covers the page's ids and their card versions, and the rows
+    are serialized only when it changed. ETags built from versions rely on the field cache
+    being shared by every process (see the fields.E001 check), so bumps made by workers,
+    the hold sweeper and imports are seen here.
+    """
+    filters = dict(normalize_filters(request.GET))
+    if not request.GET.get('sort_by') and 'near' not in filters:
+        # Same order as the fields page, served by its partial index
+        filters['sort_by'] = 'newest'
+    if filters['sort_by'] not in CURSOR_SORTS:
+        return api_error(400, f"sort_by must be one of: {', '.join(CURSOR_SORTS)}")
+    default = FIELD_LIST_DEFAULT + ['distance_km'] if 'near' in filters else FIELD_LIST_DEFAULT
+    try:
+        names = parse_fieldset(request.GET.get('fields'), FIELD_LIST_ATTRIBUTES, default)
+    except ValueError as e:
+        return api_error(400, str(e))
+
+    queryset, selected = filtered_fields(filters)
+    cards = apply_facets(queryset, selected).cards(*(['distance_km'] if 'near' in filters else []))
+    page = paginate_request(request, cards, SORT_ORDERS[filters['sort_by']])
+
+    versions = field_cache.versions([card.id for card in page], 'card')
+    etag = make_etag('fields', sorted(filters.items()), names, page.next_cursor, page.prev_cursor,
+                     [(card.id, versions[card.id]) for card in page])
+    response = not_modified(request, etag)
+    if response is not None:
+        return response
+    return json_response({
+        'results': [serialize(card, FIELD_LIST_ATTRIBUTES, names) for card in page],
+        'next_cursor': page.next_cursor,
+        'prev_cursor': page.prev_cursor,
+    }, etag)
+
+
+@require_safe
+def field_detail(request, field_id):
+    try:
+        names = parse_fieldset(request.GET.get('fields'), FIELD_DETAIL_ATTRIBUTES)
+    except ValueError as e:
+        return api_error(400, str(e))
+
+    # Looked up before its version is read: reading adds a version key for any id asked
+    # about, so unknown ids must not get that far
+    field = Field.objects.filter(id=field_id, is_active=True).first()
+    if field is None:
+        return api_error(404, 'Field not found')
+
+    # Every detail attribute changes through a field save or a rating change, and both move
+    # the card version, so a revalidation costs the lookup and nothing else
+    etag = make_etag('field', field_id, field_cache.version(field_id, 'card'), names)
+    response = not_modified(request, etag)
+    if response is not None:
+        return response
+    return json_response(serialize(field, FIELD_DETAIL_ATTRIBUTES, names), etag)
+
+
+@require_safe
+def field_availability(request, field_id):
+    """Per-date slot availability: every bookable slot with whether it is taken"""
+    try:
+        start = date.fromisoformat(request.GET['from']) if request.GET.get('from') else date.today()
+        days = int(request.GET.get('days', DEFAULT_AVAILABILITY_DAYS))
+    except ValueError:
+        return api_error(400, "from must be YYYY-MM-DD and days a whole number")
+    days = max(1, min(days, MAX_AVAILABILITY_DAYS))
+
+    # Checked before the version key is touched, like field_detail
+    if not Field.objects.filter(id=field_id, is_active=True).exists():
+        return api_error(404, 'Field not found')
+
+    # The body's own hash is the ETag, cached under the page version (slot edits, bookings,
+    # payments) until the next hold shown as booked lapses, which changes it without a write
+    key = field_cache.key('fragment', field_id, 'api_availability', start.isoformat(), days)
+    etag = field_cache.get('fragment', key)
+    if etag is not None:
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+
+    all_slots = list(FieldTimeSlot.objects.filter(field_id=field_id).order_by('id'))
+    time_slots = [slot for slot in all_slots if slot.is_available]
+    check_dates = [start + timedelta(days=i) for i in range(days)]
+    booked_by_date, hold_expires_at = read_occupancy(field_id, [slot.id for slot in all_slots], check_dates)
+
+    dates = []
+    for check_date in check_dates:
+        booked = booked_by_date[check_date]
+        slots = [
+            {
+                'id': slot.id,
+                'start_time': slot.start_time.strftime('%H:%M'),
+                'end_time': slot.end_time.strftime('%H:%M'),
+                'available': slot.id not in booked,
+            }
+            for slot in time_slots
+        ]
+        dates.append({
+            'date': check_date,
+            'available_slots': sum(slot['available'] for slot in slots),
+            'total_slots': len(slots),
+            'slots': slots,
+        })
+    data = {'field_id': field_id, 'dates': dates}
+
+    etag = make_etag('availability', data)
+    field_cache.set(key, etag, timeout=field_cache.timeout_until(hold_expires_at))
+    response = not_modified(request, etag)
+    if response is not None:
+        return response
+    return json_response(data, etag)
+
+
+@require_safe
+def field_reviews(request, field_id):
+    """The review feed, newest first, keyset-paginated like the detail page's"""
+    try:
+        names = parse_fieldset(request.GET.get('fields'), REVIEW_ATTRIBUTES)
+    except ValueError as e:
+        return api_error(400, str(e))
+
+    # Checked before the version key is touched, like field_detail
+    field = Field.objects.filter(id=field_id, is_active=True).only('id').first()
+    if field is None:
+        return api_error(404, 'Field not found')
+
+    # Reviews and their images move the page version
+    etag = make_etag('reviews', field_id, field_cache.version(field_id), names,
+                     request.GET.get('cursor'), parse_page_size(request.GET.get('page_size'), REVIEW_PAGE_SIZE))
+    response = not_modified(request, etag)
+    if response is not None:
+        return response
+
+    reviews = paginate_request(request, review_feed_queryset(field), REVIEW_FEED_ORDER, REVIEW_PAGE_SIZE)
+    return json_response({
+        'results': [serialize(review, REVIEW_ATTRIBUTES, names) for review in reviews],
+        'next_cursor': reviews.next_cursor,
+        'prev_cursor': reviews.prev_cursor,
+    }, etag)
@@ -1,6 +1,23 @@
 from django.contrib import admin
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from .exports import CONTENT_TYPES, export_filename, export_queryset, stream_export
 from .models import Booking, TeamFormation, JoinRequest, Payment
 
+
+def streaming_csv_export(kind):
+    # Streams every selected row ("select all" included) instead of rendering them as a page
+    def export_csv(modeladmin, request, queryset):
+        response = StreamingHttpResponse(
+            stream_export(kind, export_queryset(kind, queryset=queryset, staff=True), staff=True),
+            content_type=CONTENT_TYPES['csv'],
+        )
+        response['Content-Disposition'] = f'attachment; filename="{export_filename(kind, "csv", timezone.now())}"'
+        return response
+    export_csv.short_description = 'Export selected as CSV'
+    return export_csv
+
+
 @admin.register(Booking)
 class BookingAdmin(admin.ModelAdmin):
     list_display = ['user', 'field', 'booking_date', 'status', 'total_cost', 'created_at']
@@ -8,6 +25,7 @@ class BookingAdmin(admin.ModelAdmin):
     search_fields = ['user__username', 'field__name', 'user__email']
     readonly_fields = ['created_at', 'updated_at']
     date_hierarchy = 'booking_date'
+    actions = [streaming_csv_export('bookings')]
 
     def total_cost(self, obj):
         return f"${obj.total_cost}"
@@ -32,8 +50,9 @@ class JoinRequestAdmin(admin.ModelAdmin):
 class PaymentAdmin(admin.ModelAdmin):
     list_display = ['booking', 'payment_method', 'amount', 'status', 'transaction_id', 'created_at']
     list_filter = ['payment_method', 'status', 'created_at']
-    search_fields = ['booking__user__username', 'transaction_id', 'mobile_number']
-    readonly_fields = ['transaction_id', 'created_at']
+    search_fields = ['booking__user__username', 'transaction_id', 'mobile_number', 'gateway_reference']
+    readonly_fields = ['transaction_id', 'idempotency_key', 'gateway_reference', 'created_at', 'updated_at', 'completed_at']
+    actions = [streaming_csv_export('payments')]
 
     def amount(self, obj):
         return f"${obj.amount}"
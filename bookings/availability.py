@@ -0,0 +1,40 @@
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from fields.models import FieldTimeSlot
+from .models import Booking
+
+# Bookings in these states hold their slot (Pending only until its hold expires)
+ACTIVE_BOOKING_STATUSES = ('Confirmed', 'Pending')
+
+
+def active_booking_q(now=None):
+    """Confirmed bookings plus Pending ones whose hold has not run out yet"""
+    if now is None:
+        now = timezone.now()
+    return Q(status='Confirmed') | Q(status='Pending', hold_expires_at__gt=now)
+
+
+def active_bookings(booking_date):
+    return Booking.objects.filter(active_booking_q(), booking_date=booking_date)
+
+
+def free_slots_at(check_date, check_time):
+    """Open slots covering `check_time` that nobody holds on `check_date`"""
+    taken = active_bookings(check_date).filter(time_slot=OuterRef('pk'))
+    return FieldTimeSlot.objects.filter(
+        start_time__lte=check_time,
+        end_time__gt=check_time,
+        is_available=True,
+    ).exclude(Exists(taken))
+
+
+def filter_available_fields(fields_queryset, check_date, check_time):
+    """Keep fields with at least one free slot covering `check_time` on `check_date`
+
+    Compiles to one correlated EXISTS / NOT EXISTS, so the query count does not
+    grow with the number of fields.
+    """
+    return fields_queryset.filter(
+        Exists(free_slots_at(check_date, check_time).filter(field=OuterRef('pk')))
+    )
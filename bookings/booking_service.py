@@ -0,0 +1,50 @@
+import time
+
+from django.db import IntegrityError, OperationalError, transaction
+
+from .holds import release_expired_holds_for_slot
+
+
+class BookingService:
+    """Creates bookings atomically; the database constraint is the final arbiter
+
+    `unique_active_booking_per_slot` guarantees at most one Pending/Confirmed
+    booking per (field, time_slot, booking_date), so a check-then-insert race
+    between two requests ends with one IntegrityError instead of a double booking.
+    """
+
+    CONFLICT_MESSAGE = "This time slot is no longer available."
+    BUSY_MESSAGE = "The booking system is busy, please try again."
+
+    def __init__(self, busy_retries=3, busy_backoff=0.05):
+        self.busy_retries = busy_retries
+        self.busy_backoff = busy_backoff
+
+    def create_booking(self, booking, team_formation=None):
+        """Insert `booking` (and its optional team formation) or report a conflict"""
+        if booking.field.availability_type != 'Paid':
+            booking.status = 'Confirmed'
+
+        for attempt in range(self.busy_retries + 1):
+            try:
+                with transaction.atomic():
+                    release_expired_holds_for_slot(booking.field_id, booking.time_slot_id, booking.booking_date)
+                    booking.save()
+                    if team_formation is not None:
+                        team_formation.booking = booking
+                        team_formation.save()
+                return {'success': True, 'booking': booking}
+            except IntegrityError:
+                booking.pk = None
+                return {'success': False, 'conflict': True, 'message': self.CONFLICT_MESSAGE}
+            except OperationalError:
+                # SQLite raises "database is locked" once its busy timeout runs out
+                booking.pk = None
+                if attempt == self.busy_retries:
+                    break
+                time.sleep(self.busy_backoff * (2 ** attempt))
+
+        return {'success': False, 'conflict': False, 'message': self.BUSY_MESSAGE}
+
+
+booking_service = BookingService()
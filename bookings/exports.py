@@ -0,0 +1,128 @@
+import csv
+import io
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Booking, Payment
+
+EXPORT_CHUNK_SIZE = 2000
+# Rows serialized per yielded chunk: big enough to keep per-write overhead down,
+# small enough that memory stays flat however many rows there are
+ROWS_PER_WRITE = 500
+
+# Output column -> ORM path. values_list keeps every row a plain tuple, with the related
+# field, owner and user data joined in the same query instead of loaded per row.
+BOOKING_COLUMNS = {
+    'booking_id': 'id',
+    'booking_date': 'booking_date',
+    'start_time': 'time_slot__start_time',
+    'end_time': 'time_slot__end_time',
+    'status': 'status',
+    'players_count': 'players_count',
+    'field_id': 'field_id',
+    'field_name': 'field__name',
+    'field_location': 'field__location',
+    'owner': 'field__owner__username',
+    'user_id': 'user_id',
+    'username': 'user__username',
+    'email': 'user__email',
+    'payment_status': 'payment__status',
+    'amount_paid': 'payment__amount',
+    'transaction_id': 'payment__transaction_id',
+    'created_at': 'created_at',
+}
+
+PAYMENT_COLUMNS = {
+    'payment_id': 'id',
+    'transaction_id': 'transaction_id',
+    'status': 'status',
+    'payment_method': 'payment_method',
+    'amount': 'amount',
+    'created_at': 'created_at',
+    'completed_at': 'completed_at',
+    'booking_id': 'booking_id',
+    'booking_date': 'booking__booking_date',
+    'booking_status': 'booking__status',
+    'field_id': 'booking__field_id',
+    'field_name': 'booking__field__name',
+    'owner': 'booking__field__owner__username',
+    'user_id': 'booking__user_id',
+    'username': 'booking__user__username',
+}
+
+# Customer contact details only go to staff; field owners get usernames
+STAFF_ONLY_COLUMNS = {'email'}
+
+# The date range applies to the day played for bookings and to the day paid for payments
+EXPORTS = {
+    'bookings': {'model': Booking, 'columns': BOOKING_COLUMNS, 'field': 'field_id',
+                 'owner': 'field__owner_id', 'date': 'booking_date'},
+    'payments': {'model': Payment, 'columns': PAYMENT_COLUMNS, 'field': 'booking__field_id',
+                 'owner': 'booking__field__owner_id', 'date': 'created_at__date'},
+}
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+}
+
+
+def export_columns(kind, staff=False):
+    """Output column -> ORM path for an export, without the staff-only ones unless `staff`"""
+    columns = EXPORTS[kind]['columns']
+    if staff:
+        return columns
+    return {name: path for name, path in columns.items() if name not in STAFF_ONLY_COLUMNS}
+
+
+def export_queryset(kind, field=None, owner=None, date_from=None, date_to=None, status=None, queryset=None,
+                    staff=False):
+    """Rows of `kind` ('bookings' or 'payments') as tuples in export_columns(kind, staff) order"""
+    spec = EXPORTS[kind]
+    rows = spec['model'].objects.all() if queryset is None else queryset
+    filters = {}
+    if field:
+        filters[spec['field']] = field
+    if owner:
+        filters[spec['owner']] = owner
+    if date_from:
+        filters[f"{spec['date']}__gte"] = date_from
+    if date_to:
+        filters[f"{spec['date']}__lte"] = date_to
+    if status:
+        filters['status'] = status
+    return rows.filter(**filters).order_by('id').values_list(*export_columns(kind, staff).values())
+
+
+def stream_export(kind, queryset, fmt='csv', chunk_size=EXPORT_CHUNK_SIZE, staff=False):
+    """Yield the export as text chunks while reading the rows `chunk_size` at a time
+
+    `staff` must match the export_queryset() call so the header lines up with the rows.
+    """
+    columns = list(export_columns(kind, staff))
+    rows = queryset.iterator(chunk_size=chunk_size)
+    buffer = io.StringIO()
+    if fmt == 'csv':
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        write = writer.writerow
+    else:
+        def write(row):
+            buffer.write(json.dumps(dict(zip(columns, row)), cls=DjangoJSONEncoder))
+            buffer.write('\n')
+
+    pending = 0
+    for row in rows:
+        write(row)
+        pending += 1
+        if pending >= ROWS_PER_WRITE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue()
+
+
+def export_filename(kind, fmt, now):
+    return f"{kind}-{now:%Y%m%d-%H%M}.{fmt}"
@@ -47,4 +47,22 @@ class TeamFormationForm(forms.ModelForm):
                 'rows': 3,
                 'placeholder': 'Describe your team and what you are looking for...'
             }),
-        }
\ No newline at end of file
+        }
+
+
+class ExportFilterForm(forms.Form):
+    FORMAT_CHOICES = (('csv', 'CSV'), ('jsonl', 'JSON Lines'))
+
+    field = forms.IntegerField(required=False, min_value=1)
+    owner = forms.IntegerField(required=False, min_value=1)
+    date_from = forms.DateField(required=False)
+    date_to = forms.DateField(required=False)
+    status = forms.CharField(required=False, max_length=20)
+    format = forms.ChoiceField(choices=FORMAT_CHOICES, required=False)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        date_from, date_to = cleaned_data.get('date_from'), cleaned_data.get('date_to')
+        if date_from and date_to and date_from > date_to:
+            raise forms.ValidationError("date_from must not be after date_to.")
+        return cleaned_data
@@ -0,0 +1,72 @@
+import asyncio
+import random
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class GatewayError(Exception):
+    """The gateway could not be reached or did not answer; the call may be retried"""
+
+
+class PaymentGateway(ABC):
+    """What the payment processor needs from a bKash/Nagad/Upay integration
+
+    Point PAYMENT_GATEWAY at a subclass. Both calls get the payment's transaction_id as
+    the merchant reference, and the provider must treat it as an idempotency key:
+    repeating a call after a timeout or a worker crash returns the first outcome
+    rather than charging twice. Each returns {'approved': bool, 'reference': str,
+    'message': str}. A decline is an answer; raise GatewayError only when there is none.
+    """
+
+    @abstractmethod
+    async def charge(self, payment):
+        ...
+
+    @abstractmethod
+    async def refund(self, payment):
+        ...
+
+
+class StubGateway(PaymentGateway):
+    """Local stand-in that answers after PAYMENT_STUB_LATENCY seconds
+
+    Mobile numbers ending in 0000 are declined, and PAYMENT_STUB_ERROR_RATE of the
+    calls raise GatewayError, so both failure paths can be tried without a provider.
+    """
+
+    def __init__(self, latency=None, error_rate=None):
+        self.latency = latency or getattr(settings, 'PAYMENT_STUB_LATENCY', (0.5, 2.0))
+        self.error_rate = getattr(settings, 'PAYMENT_STUB_ERROR_RATE', 0.0) if error_rate is None else error_rate
+        # Outcomes by merchant reference, like the provider's own idempotency records
+        self.charges = {}
+        self.refunds = {}
+
+    async def _respond(self):
+        await asyncio.sleep(random.uniform(*self.latency))
+        if random.random() < self.error_rate:
+            raise GatewayError('Stub gateway timed out')
+
+    async def charge(self, payment):
+        await self._respond()
+        if payment.transaction_id not in self.charges:
+            if payment.mobile_number.endswith('0000'):
+                result = {'approved': False, 'reference': '', 'message': 'Insufficient balance'}
+            else:
+                result = {'approved': True, 'reference': f'STUB-{payment.transaction_id}', 'message': 'Approved'}
+            self.charges[payment.transaction_id] = result
+        return self.charges[payment.transaction_id]
+
+    async def refund(self, payment):
+        await self._respond()
+        return self.refunds.setdefault(payment.transaction_id, {
+            'approved': True, 'reference': f'STUB-REFUND-{payment.transaction_id}', 'message': 'Refunded',
+        })
+
+
+@lru_cache(maxsize=None)
+def get_gateway():
+    # One instance per process, so the stub's idempotency records survive between jobs
+    return import_string(getattr(settings, 'PAYMENT_GATEWAY', 'bookings.gateways.StubGateway'))()
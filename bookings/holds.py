@@ -0,0 +1,48 @@
+from django.db import transaction
+from django.utils import timezone
+
+from fields.caching import field_cache
+from .models import Booking
+from .occupancy import refresh_occupancy
+
+
+def expired_holds(now=None):
+    if now is None:
+        now = timezone.now()
+    return Booking.objects.filter(status='Pending', hold_expires_at__lte=now)
+
+
+def release_expired_holds(batch_size=500, now=None):
+    """Flip stale Pending bookings to Expired in batches; returns how many were released
+
+    Each batch is one UPDATE plus an occupancy refresh per touched (field, date),
+    all in one transaction, so the bitmaps never disagree with the bookings.
+    """
+    if now is None:
+        now = timezone.now()
+    released = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                expired_holds(now).order_by('hold_expires_at').values_list('id', 'field_id', 'booking_date')[:batch_size]
+            )
+            if not batch:
+                break
+            ids = [booking_id for booking_id, _, _ in batch]
+            released += Booking.objects.filter(id__in=ids, status='Pending').update(status='Expired', updated_at=now)
+            for field_id, booking_date in {(field_id, day) for _, field_id, day in batch}:
+                refresh_occupancy(field_id, booking_date)
+            for field_id in {field_id for _, field_id, _ in batch}:
+                field_cache.bump_on_commit(field_id)
+        if len(batch) < batch_size:
+            break
+    return released
+
+
+def release_expired_holds_for_slot(field_id, time_slot_id, booking_date, now=None):
+    """Expire stale holds on one slot so a new booking is not blocked by the unique constraint"""
+    if now is None:
+        now = timezone.now()
+    return expired_holds(now).filter(
+        field_id=field_id, time_slot_id=time_slot_id, booking_date=booking_date
+    ).update(status='Expired', updated_at=now)
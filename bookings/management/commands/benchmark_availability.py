@@ -0,0 +1,84 @@
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from bookings.models import Booking
+from fields.caching import field_cache
+from fields.models import Field, FieldTimeSlot
+from fields.result_cache import search_results
+from fields.slots import DEFAULT_TIME_SLOTS
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ('Show that the advanced search availability filter runs a constant number of queries '
+            'as the number of fields grows. Seeds data inside a transaction that is rolled back.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000])
+        parser.add_argument('--booked-ratio', type=float, default=0.5,
+                            help='Fraction of matching slots to book on the probe date')
+
+    def handle(self, *args, **options):
+        probe_date = date.today() + timedelta(days=1)
+        query = {'available_date': probe_date.isoformat(), 'available_time': '18:30'}
+        results = []
+
+        for size in sorted(options['sizes']):
+            try:
+                with transaction.atomic():
+                    self._seed(size, probe_date, options['booked_ratio'])
+                    # bulk_create skips the signals that would move the listing version
+                    field_cache.bump(field_cache.ALL_FIELDS, 'listing')
+                    client = Client()
+                    client.get('/fields/search/', query)  # warm template and URL caches
+                    # The warm-up stored this search's ids; measure the availability query, not a hit
+                    search_results.clear()
+
+                    with CaptureQueriesContext(connection) as ctx:
+                        started = time.perf_counter()
+                        response = client.get('/fields/search/', query)
+                        elapsed = time.perf_counter() - started
+                    results.append((size, len(ctx.captured_queries), elapsed, response.status_code))
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+        self.stdout.write(f"{'fields':>8} {'queries':>8} {'ms':>9} status")
+        for size, queries, elapsed, status in results:
+            self.stdout.write(f'{size:>8} {queries:>8} {elapsed * 1000:>9.1f} {status}')
+
+        query_counts = {queries for _, queries, _, _ in results}
+        if len(query_counts) == 1:
+            self.stdout.write(self.style.SUCCESS('Query count is constant across dataset sizes.'))
+        else:
+            self.stdout.write(self.style.ERROR('Query count grows with the number of fields.'))
+
+    def _seed(self, size, probe_date, booked_ratio):
+        owner = User.objects.create_user(username='availability-bench-owner', password='x')
+        fields = Field.objects.bulk_create([
+            Field(owner=owner, name=f'Bench field {i}', field_type='Football', location='Bench city',
+                  cost_per_hour=1000, availability_type='Paid', description='Benchmark', capacity=10)
+            for i in range(size)
+        ])
+        FieldTimeSlot.objects.bulk_create([
+            FieldTimeSlot(field=field, start_time=start, end_time=end)
+            for field in fields
+            for start, end in DEFAULT_TIME_SLOTS
+        ])
+
+        evening_slots = FieldTimeSlot.objects.filter(field__in=fields, start_time__lte='18:30', end_time__gt='18:30')
+        to_book = evening_slots[:int(size * booked_ratio)]
+        Booking.objects.bulk_create([
+            Booking(user=owner, field_id=slot.field_id, time_slot=slot, booking_date=probe_date,
+                    players_count=10, status='Confirmed')
+            for slot in to_book
+        ])
@@ -0,0 +1,88 @@
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.transaction_ids import parse_transaction_id, transaction_ids
+
+
+def setup_worker():
+    # Pool workers started with "spawn" begin without Django configured
+    import django
+    django.setup()
+
+
+def generate_batch(threads, count):
+    """Draw `count` ids on each of `threads` threads; returns (ids per thread, seconds per thread)"""
+    results = [None] * threads
+    start = threading.Barrier(threads)
+
+    def draw(index):
+        start.wait()
+        started = time.perf_counter()
+        ids = [transaction_ids.next_int() for _ in range(count)]
+        results[index] = (ids, time.perf_counter() - started)
+
+    workers = [threading.Thread(target=draw, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return results
+
+
+def legacy_transaction_id():
+    # The generator SimplePaymentGateway used before, kept here for comparison
+    timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
+    return f"BK{timestamp}{hash(timestamp) % 1000:03d}"
+
+
+class Command(BaseCommand):
+    help = ('Generate transaction ids from several processes and threads at once, check that every '
+            'id is unique and that each thread sees them strictly increasing, and report the rate.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=4)
+        parser.add_argument('--threads', type=int, default=4, help='Threads per process')
+        parser.add_argument('--count', type=int, default=50000, help='Ids per thread')
+
+    def handle(self, *args, **options):
+        processes, threads, count = options['processes'], options['threads'], options['count']
+
+        single = generate_batch(1, count)[0][1]
+        self.stdout.write(f'1 thread: {count} ids in {single * 1000:.1f}ms = {count / single:,.0f} ids/s')
+
+        started = time.perf_counter()
+        with ProcessPoolExecutor(processes, initializer=setup_worker) as pool:
+            batches = list(pool.map(generate_batch, [threads] * processes, [count] * processes))
+        elapsed = time.perf_counter() - started
+
+        all_ids = set()
+        workers = set()
+        total = 0
+        out_of_order = 0
+        for batch in batches:
+            for ids, _ in batch:
+                total += len(ids)
+                all_ids.update(ids)
+                workers.update(parse_transaction_id(value)[1] for value in (ids[0], ids[-1]))
+                out_of_order += sum(1 for a, b in zip(ids, ids[1:]) if b <= a)
+        per_worker = [len(batch) * count / max(seconds for _, seconds in batch) for batch in batches]
+
+        self.stdout.write(
+            f'{processes} processes x {threads} threads: {total} ids in {elapsed:.2f}s (pool startup included), '
+            f'worker ids {sorted(workers)}'
+        )
+        self.stdout.write(
+            f'per worker process: min {min(per_worker):,.0f} ids/s, max {max(per_worker):,.0f} ids/s; '
+            f'duplicates={total - len(all_ids)} out_of_order={out_of_order}'
+        )
+
+        legacy = [legacy_transaction_id() for _ in range(count)]
+        self.stdout.write(f'old generator: {len(set(legacy))} distinct ids out of {len(legacy)}')
+
+        if total != len(all_ids) or out_of_order:
+            raise CommandError('Transaction ids collided or went backwards')
+        self.stdout.write(self.style.SUCCESS('All transaction ids unique and increasing.'))
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from bookings.holds import release_expired_holds
+
+
+class Command(BaseCommand):
+    help = 'Release slots held by Pending bookings whose payment window has passed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--loop', action='store_true', help='Keep sweeping until interrupted')
+        parser.add_argument('--interval', type=float, default=60.0, help='Seconds between sweeps with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.perf_counter()
+            released = release_expired_holds(batch_size=options['batch_size'])
+            elapsed = time.perf_counter() - started
+            if released or not options['loop']:
+                self.stdout.write(f'Released {released} expired holds in {elapsed:.2f}s')
+            if not options['loop']:
+                break
+            try:
+                time.sleep(options['interval'])
+            except KeyboardInterrupt:
+                break
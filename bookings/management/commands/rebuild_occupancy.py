@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from bookings.availability import ACTIVE_BOOKING_STATUSES
+from bookings.models import Booking, SlotOccupancy
+from bookings.occupancy import rebuild_field_occupancy
+from fields.models import Field
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-day slot occupancy bitmaps from the Booking table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('field_ids', nargs='*', type=int, help='Only rebuild these fields')
+        parser.add_argument('--from-date', help='Only rebuild days on or after this date (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        field_ids = options['field_ids']
+        if not field_ids:
+            active = Booking.objects.filter(status__in=ACTIVE_BOOKING_STATUSES).values('field_id')
+            stored = SlotOccupancy.objects.values('field_id')
+            field_ids = Field.objects.filter(pk__in=active.union(stored)).values_list('id', flat=True)
+
+        started = time.perf_counter()
+        count = 0
+        for field_id in field_ids:
+            with transaction.atomic():
+                rebuild_field_occupancy(field_id, from_date=options['from_date'])
+            count += 1
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt occupancy for {count} fields in {elapsed:.2f}s'))
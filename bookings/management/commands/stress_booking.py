@@ -0,0 +1,101 @@
+import random
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+
+from bookings.availability import ACTIVE_BOOKING_STATUSES
+from bookings.booking_service import booking_service
+from bookings.models import Booking
+from fields.models import Field, FieldTimeSlot
+from fields.slots import DEFAULT_TIME_SLOTS
+
+
+class Command(BaseCommand):
+    help = ('Hammer the booking service from many threads at a small pool of slots and verify '
+            'that no slot ends up with two active bookings. Creates its own field and users and '
+            'deletes them afterwards; run it against a development database.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--attempts', type=int, default=200, help='Booking attempts per thread')
+        parser.add_argument('--days', type=int, default=3, help='Number of distinct dates to contend on')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        owner = User.objects.create_user(username=f'stress-owner-{rng.getrandbits(32)}', password='x')
+        field = Field.objects.create(
+            owner=owner, name='Stress test field', field_type='Football', location='Nowhere',
+            cost_per_hour=0, availability_type='Free', description='Booking stress test', capacity=10,
+        )
+        slots = FieldTimeSlot.objects.bulk_create([
+            FieldTimeSlot(field=field, start_time=start, end_time=end) for start, end in DEFAULT_TIME_SLOTS
+        ])
+        users = [
+            User.objects.create_user(username=f'{owner.username}-{i}', password='x')
+            for i in range(options['threads'])
+        ]
+        dates = [date.today() + timedelta(days=i + 1) for i in range(options['days'])]
+        targets = [(slot.id, day) for slot in slots for day in dates]
+
+        outcomes = Counter()
+        lock = threading.Lock()
+
+        def worker(user, worker_seed):
+            worker_rng = random.Random(worker_seed)
+            local = Counter()
+            try:
+                for _ in range(options['attempts']):
+                    slot_id, day = worker_rng.choice(targets)
+                    booking = Booking(user=user, field=field, time_slot_id=slot_id,
+                                      booking_date=day, players_count=5)
+                    result = booking_service.create_booking(booking)
+                    if result['success']:
+                        local['booked'] += 1
+                    elif result['conflict']:
+                        local['conflict'] += 1
+                    else:
+                        local['busy'] += 1
+            finally:
+                connection.close()
+                with lock:
+                    outcomes.update(local)
+
+        threads = [
+            threading.Thread(target=worker, args=(user, rng.getrandbits(32)))
+            for user in users
+        ]
+        try:
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+
+            double_booked = (
+                Booking.objects.filter(field=field, status__in=ACTIVE_BOOKING_STATUSES)
+                .values('time_slot_id', 'booking_date')
+                .annotate(n=Count('id'))
+                .filter(n__gt=1)
+                .count()
+            )
+            stored = Booking.objects.filter(field=field, status__in=ACTIVE_BOOKING_STATUSES).count()
+        finally:
+            field.delete()
+            User.objects.filter(pk__in=[owner.pk] + [u.pk for u in users]).delete()
+
+        attempts = sum(outcomes.values())
+        self.stdout.write(f'threads={len(threads)} attempts={attempts} targets={len(targets)} elapsed={elapsed:.2f}s')
+        self.stdout.write(f"booked={outcomes['booked']} conflicts={outcomes['conflict']} busy={outcomes['busy']} stored={stored}")
+        self.stdout.write(f"bookings/sec={outcomes['booked'] / elapsed:.1f} attempts/sec={attempts / elapsed:.1f}")
+
+        if double_booked or stored != outcomes['booked']:
+            raise CommandError(f'{double_booked} slots were double-booked')
+        self.stdout.write(self.style.SUCCESS('No double bookings.'))
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_occupancy(apps, schema_editor):
+    Booking = apps.get_model('bookings', 'Booking')
+    FieldTimeSlot = apps.get_model('fields', 'FieldTimeSlot')
+    SlotOccupancy = apps.get_model('bookings', 'SlotOccupancy')
+
+    bits = {}
+    for field_id, slot_id in FieldTimeSlot.objects.order_by('field_id', 'id').values_list('field_id', 'id'):
+        field_bits = bits.setdefault(field_id, {})
+        field_bits[slot_id] = 1 << len(field_bits)
+
+    masks = {}
+    active = Booking.objects.filter(status__in=['Confirmed', 'Pending'])
+    for field_id, booking_date, slot_id in active.values_list('field_id', 'booking_date', 'time_slot_id'):
+        field_bits = bits.get(field_id, {})
+        if len(field_bits) > 63:
+            continue
+        key = (field_id, booking_date)
+        masks[key] = masks.get(key, 0) | field_bits.get(slot_id, 0)
+
+    SlotOccupancy.objects.bulk_create([
+        SlotOccupancy(field_id=field_id, date=booking_date, booked_mask=mask)
+        for (field_id, booking_date), mask in masks.items() if mask
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fields', '0003_field_rating_aggregates'),
+        ('bookings', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotOccupancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('booked_mask', models.BigIntegerField(default=0)),
+                ('field', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupancy', to='fields.field')),
+            ],
+            options={
+                'unique_together': {('field', 'date')},
+            },
+        ),
+        migrations.RunPython(backfill_occupancy, migrations.RunPython.noop),
+    ]
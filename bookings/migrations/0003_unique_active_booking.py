@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:54
+
+from django.db import migrations, models
+
+
+def cancel_duplicate_active_bookings(apps, schema_editor):
+    # Keep the earliest active booking per slot and day so the constraint can be created
+    Booking = apps.get_model('bookings', 'Booking')
+    seen = set()
+    duplicates = []
+    active = Booking.objects.filter(status__in=['Pending', 'Confirmed']).order_by('created_at', 'id')
+    for booking_id, field_id, slot_id, booking_date in active.values_list(
+            'id', 'field_id', 'time_slot_id', 'booking_date'):
+        key = (field_id, slot_id, booking_date)
+        if key in seen:
+            duplicates.append(booking_id)
+        else:
+            seen.add(key)
+    if duplicates:
+        Booking.objects.filter(id__in=duplicates).update(status='Cancelled')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0002_slot_occupancy'),
+    ]
+
+    operations = [
+        migrations.RunPython(cancel_duplicate_active_bookings, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='booking',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['Pending', 'Confirmed'])), fields=('field', 'time_slot', 'booking_date'), name='unique_active_booking_per_slot'),
+        ),
+    ]
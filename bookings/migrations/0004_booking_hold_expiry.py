@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:55
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def start_holds_for_pending_bookings(apps, schema_editor):
+    # Existing Pendings get the same window they would have had at creation time
+    Booking = apps.get_model('bookings', 'Booking')
+    Booking.objects.filter(status='Pending', hold_expires_at__isnull=True).update(
+        hold_expires_at=F('created_at') + timedelta(minutes=settings.BOOKING_HOLD_MINUTES)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0003_unique_active_booking'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='hold_expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='booking',
+            name='status',
+            field=models.CharField(choices=[('Pending', 'Pending'), ('Confirmed', 'Confirmed'), ('Cancelled', 'Cancelled'), ('Completed', 'Completed'), ('Expired', 'Expired')], default='Pending', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['status', 'hold_expires_at'], name='booking_status_hold_idx'),
+        ),
+        migrations.RunPython(start_holds_for_pending_bookings, migrations.RunPython.noop),
+    ]
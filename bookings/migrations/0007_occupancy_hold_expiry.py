@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:40
+
+from django.db import migrations, models
+from django.db.models import Min, OuterRef, Subquery
+
+
+def record_hold_expiry(apps, schema_editor):
+    # Earliest Pending hold behind each stored mask; a lapsed one makes the row re-read on lookup
+    Booking = apps.get_model('bookings', 'Booking')
+    SlotOccupancy = apps.get_model('bookings', 'SlotOccupancy')
+    earliest = (
+        Booking.objects.filter(field_id=OuterRef('field_id'), booking_date=OuterRef('date'), status='Pending')
+        .order_by().values('field_id').annotate(expires=Min('hold_expires_at')).values('expires')
+    )
+    SlotOccupancy.objects.update(hold_expires_at=Subquery(earliest))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0006_payment_processing'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='slotoccupancy',
+            name='hold_expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(record_hold_expiry, migrations.RunPython.noop),
+    ]
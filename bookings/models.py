@@ -1,5 +1,8 @@
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
+from datetime import timedelta
 from fields.models import Field, FieldTimeSlot
 from decimal import Decimal
 
@@ -10,6 +13,7 @@ class Booking(models.Model):
         ('Confirmed', 'Confirmed'),
         ('Cancelled', 'Cancelled'),
         ('Completed', 'Completed'),
+        ('Expired', 'Expired'),
     )
 
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -20,9 +24,22 @@ class Booking(models.Model):
     special_requirements = models.TextField(blank=True)
     emergency_contact_visible = models.BooleanField(default=False)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Pending')
+    # A Pending booking only holds its slot until this moment
+    hold_expires_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    def save(self, *args, **kwargs):
+        if self.status == 'Pending' and self.hold_expires_at is None:
+            self.hold_expires_at = timezone.now() + timedelta(minutes=settings.BOOKING_HOLD_MINUTES)
+        super().save(*args, **kwargs)
+
+    @property
+    def is_hold_expired(self):
+        if self.status == 'Expired':
+            return True
+        return self.status == 'Pending' and self.hold_expires_at is not None and self.hold_expires_at <= timezone.now()
+
     @property
     def total_cost(self):
         if self.field.availability_type == 'Free':
@@ -34,6 +51,22 @@ class Booking(models.Model):
 
     class Meta:
         app_label = 'bookings'
+        indexes = [
+            # Lets the hold sweeper find expired Pendings without a table scan
+            models.Index(fields=['status', 'hold_expires_at'], name='booking_status_hold_idx'),
+            # Occupancy refreshes and per-field availability
+            models.Index(fields=['field', 'booking_date', 'status'], name='booking_field_date_status_idx'),
+            # my_bookings / user_profile
+            models.Index(fields=['user', '-created_at'], name='booking_user_recent_idx'),
+        ]
+        constraints = [
+            # A slot can only be held by one Pending/Confirmed booking per day
+            models.UniqueConstraint(
+                fields=['field', 'time_slot', 'booking_date'],
+                condition=models.Q(status__in=['Pending', 'Confirmed']),
+                name='unique_active_booking_per_slot',
+            ),
+        ]
 
 
 class TeamFormation(models.Model):
@@ -88,6 +121,7 @@ class Payment(models.Model):
         ('Pending', 'Pending'),
         ('Completed', 'Completed'),
         ('Failed', 'Failed'),
+        ('Refunded', 'Refunded'),
     )
 
     booking = models.OneToOneField(Booking, on_delete=models.CASCADE, related_name='payment')
@@ -96,10 +130,36 @@ class Payment(models.Model):
     transaction_id = models.CharField(max_length=50, unique=True)
     amount = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00')) 
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Pending')
+    # Sent with the payment form; a resubmitted form finds the payment it already started
+    idempotency_key = models.CharField(max_length=64, unique=True, null=True, blank=True)
+    gateway_reference = models.CharField(max_length=100, blank=True)
+    failure_reason = models.CharField(max_length=255, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
         return f"Payment for {self.booking} - {self.transaction_id}"
 
     class Meta:
-        app_label = 'bookings'
\ No newline at end of file
+        app_label = 'bookings'
+
+class SlotOccupancy(models.Model):
+    """Booked slots of one field on one day, one bit per FieldTimeSlot
+
+    Bit i stands for the field's i-th time slot in id order. Rows are rewritten by
+    bookings.occupancy whenever a booking for that (field, date) changes, and a
+    missing row means nothing is booked. Pending holds lapse without a write, so
+    `hold_expires_at` records the earliest one in the mask; past it the row is stale.
+    """
+    field = models.ForeignKey(Field, on_delete=models.CASCADE, related_name='occupancy')
+    date = models.DateField()
+    booked_mask = models.BigIntegerField(default=0)
+    hold_expires_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.field.name} - {self.date} - {self.booked_mask:b}"
+
+    class Meta:
+        app_label = 'bookings'
+        unique_together = ('field', 'date')
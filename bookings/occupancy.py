@@ -0,0 +1,102 @@
+from django.utils import timezone
+
+from fields.models import FieldTimeSlot
+from .availability import active_booking_q, active_bookings
+from .models import Booking, SlotOccupancy
+
+# booked_mask is a signed 64-bit column
+MAX_MASK_SLOTS = 63
+
+
+def slot_bits(slot_ids):
+    """Map each slot id to its bit, given all of a field's slot ids"""
+    return {slot_id: 1 << i for i, slot_id in enumerate(sorted(slot_ids))}
+
+
+def field_slot_ids(field_id):
+    return list(FieldTimeSlot.objects.filter(field_id=field_id).order_by('id').values_list('id', flat=True))
+
+
+def active_bookings_for_field(field_id):
+    return Booking.objects.filter(active_booking_q(), field_id=field_id)
+
+
+def refresh_occupancy(field_id, booking_date, slot_ids=None):
+    """Rewrite the (field, date) row from the active bookings; call inside the booking's transaction"""
+    if slot_ids is None:
+        slot_ids = field_slot_ids(field_id)
+    if len(slot_ids) > MAX_MASK_SLOTS:
+        return
+
+    bits = slot_bits(slot_ids)
+    mask = 0
+    hold_expires_at = None
+    rows = active_bookings(booking_date).filter(field_id=field_id).values_list('time_slot_id', 'status', 'hold_expires_at')
+    for slot_id, status, expires_at in rows:
+        mask |= bits.get(slot_id, 0)
+        if status == 'Pending' and (hold_expires_at is None or expires_at < hold_expires_at):
+            hold_expires_at = expires_at
+
+    if mask:
+        SlotOccupancy.objects.update_or_create(
+            field_id=field_id, date=booking_date, defaults={'booked_mask': mask, 'hold_expires_at': hold_expires_at}
+        )
+    else:
+        SlotOccupancy.objects.filter(field_id=field_id, date=booking_date).delete()
+
+
+def rebuild_field_occupancy(field_id, from_date=None):
+    """Recompute every stored day for a field, e.g. after its slot list changed"""
+    slot_ids = field_slot_ids(field_id)
+    bookings = active_bookings_for_field(field_id)
+    if from_date is not None:
+        bookings = bookings.filter(booking_date__gte=from_date)
+    dates = set(bookings.values_list('booking_date', flat=True).distinct())
+    stale = SlotOccupancy.objects.filter(field_id=field_id)
+    if from_date is not None:
+        stale = stale.filter(date__gte=from_date)
+    dates.update(stale.values_list('date', flat=True))
+    for booking_date in dates:
+        refresh_occupancy(field_id, booking_date, slot_ids)
+
+
+def read_occupancy(field_id, slot_ids, dates, now=None):
+    """Return ({date: set of booked slot ids}, when the earliest hold counted in them lapses)
+
+    One query while every stored row is current. Days whose earliest Pending hold has
+    already lapsed are re-read from the bookings in one more query, so the answer does
+    not wait for the expire_holds sweep. `slot_ids` must be all of the field's slot ids
+    (not only the available ones) so the bit positions line up with the stored masks.
+    """
+    if now is None:
+        now = timezone.now()
+    dates = list(dates)
+    booked = {day: set() for day in dates}
+    expiries = []
+
+    if len(slot_ids) > MAX_MASK_SLOTS:
+        stale = dates
+    else:
+        bits = slot_bits(slot_ids)
+        stale = []
+        rows = SlotOccupancy.objects.filter(field_id=field_id, date__in=dates)
+        for day, mask, expires_at in rows.values_list('date', 'booked_mask', 'hold_expires_at'):
+            if expires_at is not None and expires_at <= now:
+                stale.append(day)
+                continue
+            booked[day] = {slot_id for slot_id, bit in bits.items() if mask & bit}
+            if expires_at is not None:
+                expiries.append(expires_at)
+
+    if stale:
+        rows = Booking.objects.filter(active_booking_q(now), field_id=field_id, booking_date__in=stale)
+        for day, slot_id, status, expires_at in rows.values_list('booking_date', 'time_slot_id', 'status', 'hold_expires_at'):
+            booked[day].add(slot_id)
+            if status == 'Pending':
+                expiries.append(expires_at)
+    return booked, min(expiries, default=None)
+
+
+def booked_slots_by_date(field_id, slot_ids, dates):
+    """Return {date: set of booked slot ids} for `dates`; see read_occupancy"""
+    return read_occupancy(field_id, slot_ids, dates)[0]
@@ -1,10 +1,29 @@
+import asyncio
+import logging
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from decimal import Decimal
-from datetime import datetime
-from .models import Payment
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from fields.caching import field_cache
+from .gateways import GatewayError, get_gateway
+from .models import Booking, Payment
+from .occupancy import refresh_occupancy
+from .transaction_ids import transaction_ids
+
+logger = logging.getLogger(__name__)
+
 
 class SimplePaymentGateway:
-    
+    """Takes payments in two steps so no request waits on the provider
+
+    `submit_payment` runs in the request: it validates the form, records a Pending
+    Payment and queues `bookings.tasks.process_payment`. `settle_payment` runs on an
+    async worker, calls the gateway and confirms the booking.
+    """
+
     def __init__(self):
         self.payment_methods = {
             'bkash': {'name': 'bKash', 'color': '#E2136E'},
@@ -12,44 +31,159 @@ class SimplePaymentGateway:
             'upay': {'name': 'Upay', 'color': '#00A651'}
         }
 
-    def process_payment(self, booking, payment_method, mobile, pin):
-        
+    def submit_payment(self, booking, payment_method, mobile, idempotency_key):
+        """Start paying for `booking`, or return the payment an earlier submit already started
+
+        A booking has at most one Payment, so double clicks, resubmits and racing tabs all
+        land on the same row. Only a Failed payment can be restarted, and only with a new key.
+        No wallet PIN is asked for: the provider collects it from the payer itself.
+        """
         if not self._validate_mobile(mobile):
             return {'success': False, 'message': 'Invalid mobile number format'}
-        
-        if not self._validate_pin(pin):
-            return {'success': False, 'message': 'PIN must be 4 digits'}
-        
+
         if payment_method not in self.payment_methods:
             return {'success': False, 'message': 'Invalid payment method'}
 
+        if not idempotency_key or len(idempotency_key) > 64:
+            return {'success': False, 'message': 'Invalid payment request, please reload the page'}
+
+        existing = Payment.objects.filter(idempotency_key=idempotency_key).first()
+        if existing is not None:
+            if existing.booking_id != booking.id:
+                return {'success': False, 'message': 'Invalid payment request, please reload the page'}
+            return {'success': True, 'payment': existing, 'duplicate': True}
+
+        if booking.status != 'Pending':
+            payment = Payment.objects.filter(booking=booking).exclude(status='Failed').first()
+            if payment is not None:
+                return {'success': True, 'payment': payment, 'duplicate': True}
+            return {'success': False, 'message': 'This booking is not waiting for a payment.'}
+
+        if booking.is_hold_expired:
+            return {'success': False, 'message': 'Your hold on this slot has expired. Please book again.'}
+
+        mobile = mobile.replace(' ', '').replace('-', '')
         try:
-            transaction_id = self._generate_transaction_id(payment_method)
-                        
-            payment, created = Payment.objects.get_or_create(
-                booking=booking,
-                defaults={
-                    'payment_method': payment_method,
-                    'mobile_number': mobile,
-                    'transaction_id': transaction_id,
-                    'amount': booking.total_cost,
-                    'status': 'Completed'
-                }
-            )
-            
-            booking.status = 'Confirmed'
-            booking.save()
-            
-            return {
-                'success': True,
-                'transaction_id': transaction_id,
-                'payment_method': self.payment_methods[payment_method]['name'],
-                'amount': booking.total_cost,
-                'booking': booking
-            }
-            
-        except Exception as e:
-            return {'success': False, 'message': 'Payment processing failed'}
+            with transaction.atomic():
+                payment, created = Payment.objects.get_or_create(
+                    booking=booking,
+                    defaults=self._attempt(booking, payment_method, mobile, idempotency_key),
+                )
+                if not created:
+                    if payment.status != 'Failed':
+                        return {'success': True, 'payment': payment, 'duplicate': True}
+                    for name, value in self._attempt(booking, payment_method, mobile, idempotency_key).items():
+                        setattr(payment, name, value)
+                    payment.gateway_reference = payment.failure_reason = ''
+                    payment.save()
+
+                # Keep the slot while the gateway works, even if the hold was about to run out
+                hold_until = timezone.now() + timedelta(minutes=getattr(settings, 'PAYMENT_HOLD_MINUTES', 10))
+                Booking.objects.filter(pk=booking.pk, status='Pending', hold_expires_at__lt=hold_until).update(
+                    hold_expires_at=hold_until)
+
+                from .tasks import process_payment
+                transaction.on_commit(lambda: process_payment.enqueue(payment_id=payment.id))
+        except IntegrityError:
+            # Lost a race with a submit for the same booking or key
+            payment = Payment.objects.filter(booking=booking).first()
+            if payment is None:
+                return {'success': False, 'message': 'Payment processing failed'}
+            return {'success': True, 'payment': payment, 'duplicate': True}
+
+        return {'success': True, 'payment': payment, 'duplicate': False}
+
+    def _attempt(self, booking, payment_method, mobile, idempotency_key):
+        return {
+            'payment_method': payment_method,
+            'mobile_number': mobile,
+            'transaction_id': self._generate_transaction_id(payment_method),
+            'idempotency_key': idempotency_key,
+            'amount': booking.total_cost,
+            'status': 'Pending',
+        }
+
+    async def settle_payment(self, payment_id):
+        """Charge a Pending payment and confirm its booking; safe to run more than once
+
+        Transient gateway errors are retried here with backoff. A repeat run (after a crash
+        or an expired job lease) charges again with the same transaction_id, which the
+        gateway answers from its idempotency records, so the payer is charged once.
+        """
+        payment = await Payment.objects.filter(pk=payment_id).afirst()
+        if payment is None or payment.status != 'Pending':
+            return None
+
+        gateway = get_gateway()
+        result = await self._call(gateway.charge, payment)
+        if result is None:
+            # The charge may have gone through without an answer reaching us, so the payment
+            # stays Pending and the job retries later with the same transaction_id
+            raise GatewayError(f'No answer from the gateway for payment {payment.id}')
+        if not result['approved']:
+            await self._mark(payment, 'Failed', failure_reason=result['message'][:255])
+            return 'Failed'
+
+        if await sync_to_async(self._confirm)(payment, result['reference']):
+            return 'Completed'
+
+        # The booking was cancelled or expired while the charge was in flight
+        refund = await self._call(gateway.refund, payment)
+        if refund is None or not refund['approved']:
+            # Left Pending, so the job is retried and tries the refund again
+            raise GatewayError(f'Could not refund payment {payment.id}')
+        await self._mark(payment, 'Refunded', gateway_reference=refund['reference'],
+                         failure_reason='The booking ended before the payment went through; the charge was refunded.')
+        return 'Refunded'
+
+    def abandon_payment(self, payment_id):
+        """Fail a payment whose job ran out of attempts and release the slot it was holding
+
+        Runs once process_payment has given up, so the gateway never answered (or would not
+        refund); the payer is told to get in touch in case the charge did go through.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            payment = Payment.objects.filter(pk=payment_id).select_related('booking').first()
+            if payment is None or not Payment.objects.filter(pk=payment_id, status='Pending').update(
+                    status='Failed', updated_at=now, failure_reason=(
+                        'The payment provider did not respond. If you were charged, please contact us '
+                        f'with transaction {payment.transaction_id}.')):
+                return
+            logger.error('Gave up on payment %s after its last attempt', payment_id)
+            booking = payment.booking
+            # Conditional update: a confirmation or cancellation that got there first wins
+            if Booking.objects.filter(pk=booking.pk, status='Pending').update(status='Expired', updated_at=now):
+                refresh_occupancy(booking.field_id, booking.booking_date)
+                field_cache.bump_on_commit(booking.field_id)
+
+    async def _call(self, method, payment):
+        retries = getattr(settings, 'PAYMENT_GATEWAY_RETRIES', 3)
+        timeout = getattr(settings, 'PAYMENT_GATEWAY_TIMEOUT', 30)
+        for attempt in range(retries + 1):
+            try:
+                return await asyncio.wait_for(method(payment), timeout)
+            except (GatewayError, asyncio.TimeoutError) as exc:
+                logger.warning('Gateway call for payment %s failed (attempt %s): %s', payment.id, attempt + 1, exc)
+                if attempt < retries:
+                    await asyncio.sleep(2 ** attempt)
+        return None
+
+    async def _mark(self, payment, status, **changes):
+        await Payment.objects.filter(pk=payment.pk, status='Pending').aupdate(
+            status=status, updated_at=timezone.now(), **changes)
+
+    def _confirm(self, payment, reference):
+        now = timezone.now()
+        with transaction.atomic():
+            # Conditional update: an expiry or cancellation that got there first wins
+            if not Booking.objects.filter(pk=payment.booking_id, status='Pending').update(
+                    status='Confirmed', updated_at=now):
+                return False
+            Payment.objects.filter(pk=payment.pk, status='Pending').update(
+                status='Completed', gateway_reference=reference, completed_at=now, updated_at=now)
+            field_cache.bump_on_commit(Booking.objects.values_list('field_id', flat=True).get(pk=payment.booking_id))
+        return True
 
     def _validate_mobile(self, mobile):
         if not mobile:
@@ -57,13 +191,8 @@ class SimplePaymentGateway:
         mobile = mobile.replace(' ', '').replace('-', '')
         return len(mobile) == 11 and mobile.startswith('01') and mobile.isdigit()
 
-    def _validate_pin(self, pin):
-        return pin and len(pin) == 4 and pin.isdigit()
-
     def _generate_transaction_id(self, payment_method):
         prefixes = {'bkash': 'BK', 'nagad': 'NG', 'upay': 'UP'}
-        prefix = prefixes.get(payment_method, 'TXN')
-        timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-        return f"{prefix}{timestamp}{hash(timestamp) % 1000:03d}"
+        return transaction_ids.next_id(prefixes.get(payment_method, 'TXN'))
 
-payment_service = SimplePaymentGateway()
\ No newline at end of file
+payment_service = SimplePaymentGateway()
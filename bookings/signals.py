@@ -0,0 +1,38 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from fields.caching import field_cache
+from fields.models import FieldTimeSlot
+from .models import Booking, TeamFormation
+from .occupancy import rebuild_field_occupancy, refresh_occupancy
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def update_slot_occupancy(sender, instance, **kwargs):
+    refresh_occupancy(instance.field_id, instance.booking_date)
+
+
+@receiver(post_save, sender=FieldTimeSlot)
+def shift_occupancy_bits_on_new_slot(sender, instance, created, **kwargs):
+    if created:
+        rebuild_field_occupancy(instance.field_id)
+
+
+@receiver(post_delete, sender=FieldTimeSlot)
+def shift_occupancy_bits_on_removed_slot(sender, instance, **kwargs):
+    rebuild_field_occupancy(instance.field_id)
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def invalidate_field_cache_for_booking(sender, instance, **kwargs):
+    field_cache.bump_on_commit(instance.field_id)
+
+
+@receiver(post_save, sender=TeamFormation)
+@receiver(post_delete, sender=TeamFormation)
+def invalidate_field_cache_for_team(sender, instance, **kwargs):
+    field_id = Booking.objects.filter(pk=instance.booking_id).values_list('field_id', flat=True).first()
+    if field_id is not None:
+        field_cache.bump_on_commit(field_id)
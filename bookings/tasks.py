@@ -0,0 +1,7 @@
+from jobs.queue import task
+from .payment_service import payment_service
+
+
+@task(max_attempts=8, on_failure=payment_service.abandon_payment)
+async def process_payment(payment_id):
+    await payment_service.settle_payment(payment_id)
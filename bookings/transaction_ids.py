@@ -0,0 +1,116 @@
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# 41 bits of milliseconds since EPOCH_MS (~69 years), 10 bits of worker id, 12 bits of sequence
+EPOCH_MS = 1704067200000  # 2024-01-01T00:00:00Z
+WORKER_BITS = 10
+SEQUENCE_BITS = 12
+MAX_WORKER_ID = (1 << WORKER_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+ID_DIGITS = 19  # a 63-bit id is at most 19 decimal digits; padding keeps string order == id order
+
+
+class TransactionIdGenerator:
+    """Snowflake-style ids: time, worker id and a per-millisecond sequence packed in 63 bits
+
+    Ids from one generator strictly increase, and two generators never collide as long as
+    their worker ids differ. The worker id comes from TRANSACTION_ID_WORKER_ID when set
+    (needed once there is more than one host); otherwise each process leases a free slot
+    with an exclusive lock file, held until the process exits. A forked child drops the
+    parent's id and leases its own.
+    """
+
+    def __init__(self, worker_id=None):
+        self._configured_worker_id = worker_id
+        self._reset()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._worker_id = None
+        self._lease = None
+        self._last_ms = -1
+        self._sequence = 0
+
+    @property
+    def worker_id(self):
+        if self._worker_id is None:
+            with self._lock:
+                if self._worker_id is None:
+                    self._worker_id = self._resolve_worker_id()
+        return self._worker_id
+
+    def _resolve_worker_id(self):
+        worker_id = self._configured_worker_id
+        if worker_id is None:
+            worker_id = getattr(settings, 'TRANSACTION_ID_WORKER_ID', None)
+        if worker_id is None:
+            worker_id = self._lease_worker_id()
+        worker_id = int(worker_id)
+        if not 0 <= worker_id <= MAX_WORKER_ID:
+            raise ValueError(f'Transaction id worker id must be between 0 and {MAX_WORKER_ID}, got {worker_id}')
+        return worker_id
+
+    def _lease_worker_id(self):
+        if fcntl is None:
+            return os.getpid() & MAX_WORKER_ID
+        directory = getattr(settings, 'TRANSACTION_ID_LOCK_DIR', None) or os.path.join(
+            tempfile.gettempdir(), 'arena-finder-transaction-ids')
+        os.makedirs(directory, exist_ok=True)
+        # Start at a pid-derived slot so concurrent processes rarely probe the same files
+        start = os.getpid() & MAX_WORKER_ID
+        for offset in range(MAX_WORKER_ID + 1):
+            slot = (start + offset) & MAX_WORKER_ID
+            lease = open(os.path.join(directory, f'{slot}.lock'), 'a')
+            try:
+                fcntl.flock(lease, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lease.close()
+                continue
+            self._lease = lease  # the lock lives as long as this file stays open
+            return slot
+        raise RuntimeError(f'All {MAX_WORKER_ID + 1} transaction id worker slots in {directory} are taken')
+
+    def next_int(self):
+        worker_id = self.worker_id
+        with self._lock:
+            now = time.time_ns() // 1_000_000 - EPOCH_MS
+            if now > self._last_ms:
+                self._last_ms = now
+                self._sequence = 0
+            elif self._sequence < MAX_SEQUENCE:
+                # Same millisecond, or the clock stepped back: keep counting from the last id
+                self._sequence += 1
+            else:
+                # Sequence exhausted: borrow the next millisecond rather than sleep
+                self._last_ms += 1
+                self._sequence = 0
+            return (self._last_ms << (WORKER_BITS + SEQUENCE_BITS)) | (worker_id << SEQUENCE_BITS) | self._sequence
+
+    def next_id(self, prefix=''):
+        return f'{prefix}{self.next_int():0{ID_DIGITS}d}'
+
+
+def parse_transaction_id(value):
+    """Split an id from `next_id`/`next_int` back into (issued_at, worker_id, sequence)"""
+    number = int(str(value)[-ID_DIGITS:]) if isinstance(value, str) else value
+    millis = (number >> (WORKER_BITS + SEQUENCE_BITS)) + EPOCH_MS
+    return (
+        datetime.fromtimestamp(millis / 1000, tz=dt_timezone.utc),
+        (number >> SEQUENCE_BITS) & MAX_WORKER_ID,
+        number & MAX_SEQUENCE,
+    )
+
+
+transaction_ids = TransactionIdGenerator()
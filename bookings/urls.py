@@ -9,6 +9,8 @@ urlpatterns = [
     path('booking/<int:booking_id>/', views.booking_detail, name='booking_detail'),
     path('cancel/<int:booking_id>/', views.cancel_booking, name='cancel_booking'),
     path('payment/<int:booking_id>/', views.process_payment, name='process_payment'),
+    path('payment/<int:booking_id>/status/', views.payment_status, name='payment_status'),
     path('join-team/<int:team_id>/', views.join_team, name='join_team'),
     path('manage-team/<int:team_id>/', views.manage_join_requests, name='manage_join_requests'),
+    path('export/<str:kind>/', views.export_data, name='export_data'),
 ]
\ No newline at end of file
@@ -2,11 +2,18 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.utils import timezone
-from django.http import JsonResponse
+from django.http import Http404, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
+from django.db import transaction
+import uuid
 from datetime import date, timedelta
+from accounts.models import UserProfile
+from fields.caching import field_cache
 from fields.models import Field, FieldTimeSlot
 from .models import Booking, TeamFormation, JoinRequest, Payment
-from .forms import BookingForm, TeamFormationForm
+from .forms import BookingForm, ExportFilterForm, TeamFormationForm
+from .booking_service import booking_service
+from .exports import CONTENT_TYPES, EXPORTS, export_filename, export_queryset, stream_export
+from .occupancy import booked_slots_by_date, refresh_occupancy
 from .payment_service import payment_service
 
 
@@ -28,12 +35,9 @@ def book_field(request, field_id):
     except ValueError:
         selected_date = today
 
-    time_slots = FieldTimeSlot.objects.filter(field=field, is_available=True)
-    booked_slots = Booking.objects.filter(
-        field=field,
-        booking_date=selected_date,
-        status__in=['Confirmed', 'Pending']
-    ).values_list('time_slot_id', flat=True)
+    all_slots = list(FieldTimeSlot.objects.filter(field=field).order_by('id'))
+    time_slots = [slot for slot in all_slots if slot.is_available]
+    booked_slots = booked_slots_by_date(field.id, [slot.id for slot in all_slots], [selected_date])[selected_date]
 
     time_slots_with_status = []
     for slot in time_slots:
@@ -55,20 +59,21 @@ def book_field(request, field_id):
             booking = booking_form.save(commit=False)
             booking.user = request.user
             booking.field = field
-            booking.save()
 
             # Handle team formation
+            team_formation = None
             if team_form.is_valid() and team_form.cleaned_data.get('looking_for_players'):
                 team_formation = team_form.save(commit=False)
-                team_formation.booking = booking
-                team_formation.save()
+
+            result = booking_service.create_booking(booking, team_formation)
+            if not result['success']:
+                messages.error(request, result['message'])
+                return redirect('bookings:book_field', field_id=field_id)
 
             # Redirect to payment or confirmation
             if field.availability_type == 'Paid':
                 return redirect('bookings:process_payment', booking_id=booking.id)
             else:
-                booking.status = 'Confirmed'
-                booking.save()
                 messages.success(request, "Free field booked successfully!")
                 return redirect('bookings:booking_detail', booking_id=booking.id)
     else:
@@ -96,40 +101,76 @@ def process_payment(request, booking_id):
         return redirect('bookings:booking_detail', booking_id=booking.id)
 
     if request.method == 'POST':
-        payment_method = request.POST.get('payment_method')
-        mobile = request.POST.get('mobile')
-        pin = request.POST.get('pin')
+        result = payment_service.submit_payment(
+            booking,
+            request.POST.get('payment_method'),
+            request.POST.get('mobile'),
+            request.POST.get('idempotency_key'),
+        )
+        if result['success']:
+            # Redirect so a refresh polls the payment instead of posting it again
+            return redirect('bookings:payment_status', booking_id=booking.id)
+        messages.error(request, result['message'])
 
-        result = payment_service.process_payment(booking, payment_method, mobile, pin)
+    context = {
+        'booking': booking,
+        # One key per rendered form: every submit of this form is the same payment attempt
+        'idempotency_key': uuid.uuid4().hex,
+    }
+    return render(request, 'bookings/process_payment.html', context)
 
-        if result['success']:
-            messages.success(request, "Payment completed successfully!")
-            context = {
-                'booking': booking,
-                'transaction_id': result['transaction_id'],
-                'payment_method': result['payment_method'],
-                'amount': result['amount']
-            }
-            return render(request, 'bookings/payment_success.html', context)
-        else:
-            messages.error(request, result['message'])
 
-    return render(request, 'bookings/process_payment.html', {'booking': booking})
+@login_required
+def payment_status(request, booking_id):
+    """The payment page after submitting: HTML that polls itself, or JSON with ?format=json"""
+    booking = get_object_or_404(Booking.objects.select_related('field', 'time_slot'), id=booking_id, user=request.user)
+    payment = Payment.objects.filter(booking=booking).first()
+    if payment is None:
+        return redirect('bookings:process_payment', booking_id=booking.id)
+
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'status': payment.status,
+            'booking_status': booking.status,
+            'transaction_id': payment.transaction_id,
+            'message': payment.failure_reason,
+        })
+
+    if payment.status == 'Completed':
+        context = {
+            'booking': booking,
+            'transaction_id': payment.transaction_id,
+            'payment_method': payment.get_payment_method_display(),
+            'amount': payment.amount,
+        }
+        return render(request, 'bookings/payment_success.html', context)
+    if payment.status in ('Failed', 'Refunded'):
+        messages.error(request, payment.failure_reason or "Payment failed.")
+        if booking.status == 'Pending' and not booking.is_hold_expired:
+            return redirect('bookings:process_payment', booking_id=booking.id)
+        return redirect('bookings:booking_detail', booking_id=booking.id)
+    return render(request, 'bookings/payment_pending.html', {'booking': booking, 'payment': payment})
 
 
 @login_required
 def booking_detail(request, booking_id):
     booking = get_object_or_404(Booking, id=booking_id, user=request.user)
-    return render(request, 'bookings/booking_detail.html', {'booking': booking})
+    payment = Payment.objects.filter(booking=booking).first()
+    return render(request, 'bookings/booking_detail.html', {'booking': booking, 'payment': payment})
 
 
 @login_required
 def cancel_booking(request, booking_id):
     booking = get_object_or_404(Booking, id=booking_id, user=request.user)
 
-    if booking.status == 'Confirmed':
-        booking.status = 'Cancelled'
-        booking.save()
+    # Conditional update: of two concurrent cancels (or a cancel racing an expiry) only one applies
+    with transaction.atomic():
+        cancelled = Booking.objects.filter(pk=booking.pk, status='Confirmed').update(
+            status='Cancelled', updated_at=timezone.now())
+        if cancelled:
+            refresh_occupancy(booking.field_id, booking.booking_date)
+            field_cache.bump_on_commit(booking.field_id)
+    if cancelled:
         messages.success(request, "Booking cancelled successfully!")
     else:
         messages.error(request, "Cannot cancel this booking.")
@@ -191,4 +232,29 @@ def manage_join_requests(request, team_id):
         'team_formation': team_formation,
         'join_requests': join_requests,
     }
-    return render(request, 'bookings/manage_join_requests.html', context)
\ No newline at end of file
+    return render(request, 'bookings/manage_join_requests.html', context)
+
+
+@login_required
+def export_data(request, kind):
+    """Stream bookings or payments as CSV/JSONL; owners only ever see their own fields"""
+    if kind not in EXPORTS:
+        raise Http404
+    form = ExportFilterForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    filters = form.cleaned_data
+    fmt = filters.pop('format') or 'csv'
+
+    staff = request.user.is_staff
+    if not staff:
+        if not UserProfile.objects.filter(user=request.user, is_field_owner=True).exists():
+            return HttpResponseForbidden("Only field owners can export bookings.")
+        filters['owner'] = request.user.id
+
+    response = StreamingHttpResponse(
+        stream_export(kind, export_queryset(kind, staff=staff, **filters), fmt, staff=staff),
+        content_type=CONTENT_TYPES[fmt],
+    )
+    response['Content-Disposition'] = f'attachment; filename="{export_filename(kind, fmt, timezone.now())}"'
+    return response
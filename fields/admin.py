@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Field, FieldTimeSlot, Review, ReviewImage
+from .models import Amenity, Field, FieldTimeSlot, Review, ReviewImage
 
 
 @admin.register(Field)
@@ -7,6 +7,14 @@ class FieldAdmin(admin.ModelAdmin):
     list_display = ['name', 'field_type', 'location', 'availability_type', 'cost_per_hour', 'is_active']
     list_filter = ['field_type', 'availability_type', 'is_women_only', 'is_active']
     search_fields = ['name', 'location', 'owner__username']
+    readonly_fields = ['review_count', 'rating_sum', 'average_rating', 'rating_1_count', 'rating_2_count',
+                       'rating_3_count', 'rating_4_count', 'rating_5_count']
+
+
+@admin.register(Amenity)
+class AmenityAdmin(admin.ModelAdmin):
+    list_display = ['name', 'slug']
+    search_fields = ['name', 'slug']
 
 
 @admin.register(FieldTimeSlot)
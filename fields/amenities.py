@@ -0,0 +1,143 @@
+import re
+
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef
+from django.utils.text import slugify
+
+from .models import Amenity, Field, FieldAmenity
+
+# Owners type amenities as free text ("Parking, floodlights & showers"); each piece between
+# these separators becomes a tag. Longer pieces are prose, not an amenity name.
+AMENITY_SEPARATORS = re.compile(r'[,;\n\r|•·/&]+|\s+and\s+', re.IGNORECASE)
+MAX_AMENITY_NAME_LENGTH = 50
+
+# Plurals that name the same amenity as their singular. Folding is limited to this list:
+# dropping every trailing "s" also mangles words like "Tennis" and "Fitness"
+AMENITY_SLUG_ALIASES = {
+    'showers': 'shower',
+    'floodlights': 'floodlight',
+    'changing-rooms': 'changing-room',
+    'dressing-rooms': 'dressing-room',
+    'lockers': 'locker',
+    'toilets': 'toilet',
+    'washrooms': 'washroom',
+    'restrooms': 'restroom',
+    'benches': 'bench',
+    'seats': 'seat',
+    'nets': 'net',
+    'balls': 'ball',
+}
+
+MATCH_ALL = 'all'
+MATCH_ANY = 'any'
+
+
+def amenity_slug(name):
+    """Identity of an amenity: slugified, with known plural spellings folded ("Showers" -> "shower")"""
+    slug = slugify(name, allow_unicode=True)
+    return AMENITY_SLUG_ALIASES.get(slug, slug)
+
+
+def parse_amenities(text):
+    """{slug: display name} for the tags in an amenities text, in first-seen order"""
+    tags = {}
+    for piece in AMENITY_SEPARATORS.split(text or ''):
+        name = ' '.join(piece.strip(' \t-*.:').split())
+        slug = amenity_slug(name)
+        if slug and len(name) <= MAX_AMENITY_NAME_LENGTH and slug not in tags:
+            tags[slug] = name[0].upper() + name[1:]
+    return tags
+
+
+def amenity_ids(tags):
+    """{slug: Amenity id} for {slug: name}, creating the amenities that don't exist yet"""
+    if not tags:
+        return {}
+    ids = dict(Amenity.objects.filter(slug__in=tags).values_list('slug', 'id'))
+    missing = [Amenity(slug=slug, name=name) for slug, name in tags.items() if slug not in ids]
+    if missing:
+        # A concurrent save may create the same slug; keep whichever row won
+        Amenity.objects.bulk_create(missing, ignore_conflicts=True)
+        ids.update(Amenity.objects.filter(slug__in=[a.slug for a in missing]).values_list('slug', 'id'))
+    return ids
+
+
+def sync_field_amenities(field):
+    """Make the field's tags match its amenities text"""
+    wanted = set(amenity_ids(parse_amenities(field.amenities)).values())
+    current = set(FieldAmenity.objects.filter(field_id=field.pk).values_list('amenity_id', flat=True))
+    if current - wanted:
+        FieldAmenity.objects.filter(field_id=field.pk, amenity_id__in=current - wanted).delete()
+    if wanted - current:
+        FieldAmenity.objects.bulk_create(
+            [FieldAmenity(field_id=field.pk, amenity_id=amenity_id) for amenity_id in wanted - current],
+            ignore_conflicts=True,
+        )
+
+
+def tag_fields(fields):
+    """Tag freshly bulk-created fields (no existing tags) from their amenities text"""
+    parsed = [(field.pk, parse_amenities(field.amenities)) for field in fields]
+    ids = amenity_ids({slug: name for _, tags in parsed for slug, name in tags.items()})
+    links = [FieldAmenity(field_id=field_id, amenity_id=ids[slug]) for field_id, tags in parsed for slug in tags]
+    FieldAmenity.objects.bulk_create(links, ignore_conflicts=True)
+    return len(links)
+
+
+def rebuild_amenity_tags(batch_size=2000):
+    """Re-derive every field's tags from its amenities text; returns the number of links"""
+    total = 0
+    with transaction.atomic():
+        FieldAmenity.objects.all().delete()
+        last_id = 0
+        while True:
+            batch = list(Field.objects.filter(id__gt=last_id).order_by('id').only('id', 'amenities')[:batch_size])
+            if not batch:
+                break
+            total += tag_fields(batch)
+            last_id = batch[-1].id
+        Amenity.objects.filter(fieldamenity__isnull=True).delete()
+    return total
+
+
+def parse_amenity_filter(slugs=(), text=''):
+    """Requested amenity slugs from checkbox values plus any typed-in amenities text"""
+    requested = {amenity_slug(slug) for slug in slugs if amenity_slug(slug)}
+    requested.update(parse_amenities(text))
+    return sorted(requested)
+
+
+def filter_by_amenities(queryset, slugs, match=MATCH_ALL, per_row=False):
+    """Fields tagged with all (or, for MATCH_ANY, at least one) of the amenity slugs
+
+    Both run on the (amenity, field) unique index. By default each amenity is read as one
+    index range of field ids: ANY is their union and ALL keeps the ids found once per
+    amenity, so no field row is read until the ids are known. When other filters already
+    cut `queryset` down to a few rows (e.g. a near-me radius), `per_row` probes the index
+    once per candidate and amenity instead of reading whole ranges.
+    """
+    if not slugs:
+        return queryset
+    ids = list(Amenity.objects.filter(slug__in=slugs).values_list('id', flat=True))
+    if match != MATCH_ANY and len(ids) < len(set(slugs)):
+        # An amenity nobody has can't be matched by every field
+        return queryset.none()
+    if per_row:
+        if match == MATCH_ANY:
+            return queryset.filter(Exists(FieldAmenity.objects.filter(field_id=OuterRef('pk'), amenity_id__in=ids)))
+        for amenity_id in ids:
+            queryset = queryset.filter(Exists(FieldAmenity.objects.filter(field_id=OuterRef('pk'), amenity_id=amenity_id)))
+        return queryset
+    tagged = FieldAmenity.objects.filter(amenity_id__in=ids).values('field_id')
+    if match != MATCH_ANY:
+        tagged = tagged.annotate(matched=Count('amenity_id')).filter(matched=len(ids)).values('field_id')
+    return queryset.filter(id__in=tagged)
+
+
+def popular_amenities(limit=20):
+    """(slug, name, field count) for the most used amenities"""
+    return list(
+        Amenity.objects.annotate(field_count=Count('fieldamenity'))
+        .filter(field_count__gt=0).order_by('-field_count', 'name')
+        .values_list('slug', 'name', 'field_count')[:limit]
+    )
@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class FieldsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'fields'
\ No newline at end of file
+    name = 'fields'
+
+    def ready(self):
+        from . import checks, signals  # noqa: F401
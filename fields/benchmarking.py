@@ -0,0 +1,134 @@
+import statistics
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.urls import URLPattern, get_resolver, reverse
+
+from bookings.models import Booking, TeamFormation
+from .models import Field, ReviewImage
+
+BENCHMARKED_NAMESPACES = ('fields', 'bookings', 'accounts')
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'benchmarks' / 'views_baseline.json'
+
+# The committed baselines were measured on a fresh database seeded with exactly these, so
+# ids, paths and query counts line up whenever the same seed is used again. The small one
+# is what fields.tests seeds and checks against under manage.py test.
+BASELINE_SEED = {'fields': 2000, 'bookings': 200000, 'reviews': 20000, 'seed': 0}
+TEST_BASELINE = Path(settings.BASE_DIR) / 'benchmarks' / 'views_baseline_test.json'
+TEST_BASELINE_SEED = {'fields': 30, 'bookings': 1500, 'reviews': 200, 'seed': 0}
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def pick_sample():
+    """The user to log in as and the ids the benchmarked URLs are filled in with
+
+    Returns None when there are no bookings to benchmark against.
+    """
+    # An owner who also books: every owner-only and booking-only page then has a row to show
+    user = (
+        User.objects.filter(userprofile__is_field_owner=True, field__isnull=False, booking__isnull=False)
+        .order_by('id').first()
+        or User.objects.filter(booking__isnull=False).order_by('id').first()
+    )
+    if user is None:
+        return None
+    booking = Booking.objects.filter(user=user).order_by('id').first()
+    field = Field.objects.filter(owner=user).order_by('id').first() or booking.field
+    team = TeamFormation.objects.filter(booking__user=user).order_by('id').first()
+    image = ReviewImage.objects.filter(review__user=user).order_by('id').first()
+    sample = {
+        'field_id': field.id,
+        'booking_id': booking.id,
+        'team_id': team.id if team else None,
+        'image_id': image.id if image else None,
+    }
+    return user, sample
+
+
+def benchmark_urls(sample):
+    """(name, path, skipped) for every URL in the benchmarked apps; skipped when no sample row fits"""
+    resolver = get_resolver()
+    for namespace in BENCHMARKED_NAMESPACES:
+        app_resolver = resolver.namespace_dict[namespace][1]
+        for pattern in app_resolver.url_patterns:
+            if not isinstance(pattern, URLPattern):
+                continue
+            name = f'{namespace}:{pattern.name}'
+            kwargs = {converter_name: sample.get(converter_name) for converter_name in pattern.pattern.converters}
+            if any(value is None for value in kwargs.values()):
+                yield name, None, True
+                continue
+            yield name, reverse(name, kwargs=kwargs), False
+
+
+def measure(client, user, url, runs, warmup):
+    """Query count, p50/p95 latency and response size of GET `url`, each request rolled back"""
+    timings = []
+    queries = None
+    status = None
+    size = None
+
+    def count(execute, sql, params, many, context):
+        executed[0] += 1
+        return execute(sql, params, many, context)
+
+    for i in range(warmup + runs):
+        # Counted with a wrapper: connection.queries stops growing after 9000 entries, which
+        # made every URL measured late in a long run report 0 queries
+        executed = [0]
+        # Some GET views have side effects (logout, cancel, delete image); undo each request
+        try:
+            with transaction.atomic():
+                with connection.execute_wrapper(count):
+                    started = time.perf_counter()
+                    response = client.get(url)
+                    elapsed = time.perf_counter() - started
+                raise _Rollback
+        except _Rollback:
+            pass
+        if i >= warmup:
+            timings.append(elapsed * 1000)
+            queries = executed[0]
+            status = response.status_code
+            size = len(response.content)
+        client.force_login(user)
+
+    return {
+        'path': url,
+        'status': status,
+        'queries': queries,
+        'p50_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(_percentile(timings, 95), 2),
+        'bytes': size,
+    }
+
+
+def compare(baseline, results, latency_tolerance=0.5, size_tolerance=0.1):
+    """(regressions, warnings) of `results` against `baseline`; a None tolerance skips that check"""
+    regressions = []
+    warnings = []
+    for name, row in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if base['path'] != row['path']:
+            warnings.append(f"{name}: baseline measured {base['path']}, now {row['path']}; dataset changed?")
+        if row['queries'] > base['queries']:
+            regressions.append(f"{name}: queries {base['queries']} -> {row['queries']}")
+        if latency_tolerance is not None and row['p95_ms'] > base['p95_ms'] * (1 + latency_tolerance):
+            regressions.append(f"{name}: p95 {base['p95_ms']}ms -> {row['p95_ms']}ms")
+        if size_tolerance is not None and row['bytes'] > base['bytes'] * (1 + size_tolerance):
+            regressions.append(f"{name}: size {base['bytes']}B -> {row['bytes']}B")
+    return regressions, warnings
@@ -0,0 +1,171 @@
+import math
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+
+
+class FieldPageCache:
+    """Versioned cache for per-field renders
+
+    Every key embeds the field's current version. Invalidation never deletes anything:
+    bumping the version makes the old entries unreachable and the backend evicts them in
+    its own time, so a bump is one SET however many renders exist. A version is a fresh
+    random token rather than a counter, because FileBasedCache.incr is a read and a write
+    that two processes can interleave, and a lost bump would leave stale entries reachable.
+    """
+
+    STATS_KINDS = ('page', 'fragment', 'card', 'listing')
+
+    # Hit/miss counts are kept per process and added to the shared totals at most this often,
+    # so a cache read doesn't also cost a counter write
+    STATS_FLUSH_SECONDS = 10
+
+    # Version scopes: 'page' moves with anything shown on the detail page, 'card' only with
+    # what a listing card shows, and 'listing' (for ALL_FIELDS) with any field or review change
+    ALL_FIELDS = 'all'
+
+    def __init__(self, alias=None):
+        self.alias = alias
+        self._stats_lock = threading.Lock()
+        self._pending_stats = Counter()
+        self._stats_flushed_at = time.monotonic()
+
+    @property
+    def cache(self):
+        return caches[self.alias or getattr(settings, 'FIELD_CACHE_ALIAS', 'default')]
+
+    @property
+    def timeout(self):
+        return getattr(settings, 'FIELD_CACHE_TIMEOUT', 300)
+
+    def _version_key(self, field_id, scope):
+        return f'field:{field_id}:{scope}:version'
+
+    def version(self, field_id, scope='page'):
+        return self.versions([field_id], scope)[field_id]
+
+    def versions(self, field_ids, scope='page'):
+        keys = {field_id: self._version_key(field_id, scope) for field_id in field_ids}
+        found = self.cache.get_many(keys.values())
+        missing = [key for key in keys.values() if key not in found]
+        if missing:
+            # A fresh token, so an evicted version can never come back at an old value
+            start = self._new_version()
+            for key in missing:
+                self.cache.add(key, start, timeout=None)
+            found.update(self.cache.get_many(missing))
+        return {field_id: found[key] for field_id, key in keys.items()}
+
+    def _new_version(self):
+        return uuid.uuid4().hex
+
+    def bump(self, field_id, scope='page'):
+        self.cache.set(self._version_key(field_id, scope), self._new_version(), timeout=None)
+
+    def bump_on_commit(self, field_id, *scopes):
+        # Bumping before commit would let a concurrent request cache the old rows under the new version
+        for scope in scopes or ('page',):
+            transaction.on_commit(lambda scope=scope: self.bump(field_id, scope))
+
+    def key(self, kind, field_id, *parts, scope='page', version=None):
+        if version is None:
+            version = self.version(field_id, scope)
+        suffix = ':'.join(str(part) for part in parts)
+        return f'field:{field_id}:v{version}:{kind}:{suffix}'
+
+    def get(self, kind, key):
+        value = self.cache.get(key)
+        self._count(kind, 'hits' if value is not None else 'misses')
+        return value
+
+    def get_many(self, kind, keys):
+        found = self.cache.get_many(keys)
+        if found:
+            self._count(kind, 'hits', len(found))
+        if len(found) < len(keys):
+            self._count(kind, 'misses', len(keys) - len(found))
+        return found
+
+    def set(self, key, value, timeout=None):
+        self.cache.set(key, value, timeout=self.timeout if timeout is None else timeout)
+
+    def timeout_until(self, deadline):
+        """The usual timeout, cut short so an entry is gone by `deadline` (e.g. a hold lapsing)"""
+        if deadline is None:
+            return self.timeout
+        return max(1, min(self.timeout, math.ceil((deadline - timezone.now()).total_seconds())))
+
+    def set_many(self, values):
+        self.cache.set_many(values, timeout=self.timeout)
+
+    def _count(self, kind, outcome, delta=1):
+        with self._stats_lock:
+            self._pending_stats[f'cache_stats:{kind}:{outcome}'] += delta
+            if time.monotonic() - self._stats_flushed_at < self.STATS_FLUSH_SECONDS:
+                return
+        self.flush_stats()
+
+    def flush_stats(self):
+        """Add this process's pending hit/miss counts to the shared totals"""
+        with self._stats_lock:
+            pending, self._pending_stats = self._pending_stats, Counter()
+            self._stats_flushed_at = time.monotonic()
+        for key, delta in pending.items():
+            try:
+                self.cache.incr(key, delta)
+            except ValueError:
+                if not self.cache.add(key, delta, timeout=None):
+                    self.cache.incr(key, delta)
+
+    def stats(self):
+        """Shared hit/miss totals; other processes' last few seconds of counts may be missing"""
+        self.flush_stats()
+        keys = [f'cache_stats:{kind}:{outcome}' for kind in self.STATS_KINDS for outcome in ('hits', 'misses')]
+        values = self.cache.get_many(keys)
+        stats = {}
+        for kind in self.STATS_KINDS:
+            hits = values.get(f'cache_stats:{kind}:hits', 0)
+            misses = values.get(f'cache_stats:{kind}:misses', 0)
+            stats[kind] = {
+                'hits': hits,
+                'misses': misses,
+                'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else None,
+            }
+        return stats
+
+
+field_cache = FieldPageCache()
+
+
+def render_field_cards(fields, template_name, user=None):
+    """Render one card per field through `template_name`, reusing cached cards
+
+    Cards are keyed on the field's 'card' version, so an edit re-renders only that
+    card. Lookups are batched: two cache round trips for the whole page on a warm cache.
+    """
+    fields = list(fields)
+    variant = 'member' if user is not None and user.is_authenticated else 'guest'
+    versions = field_cache.versions([field.pk for field in fields], 'card')
+    keys = [
+        field_cache.key('card', field.pk, template_name, variant, version=versions[field.pk])
+        for field in fields
+    ]
+    cached = field_cache.get_many('card', keys)
+    rendered = {}
+    cards = []
+    for field, key in zip(fields, keys):
+        html = cached.get(key)
+        if html is None:
+            html = rendered[key] = render_to_string(template_name, {'field': field, 'user': user})
+        cards.append(mark_safe(html))
+    if rendered:
+        field_cache.set_many(rendered)
+    return cards
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+# Backends whose contents live in one process; version bumps made elsewhere never reach them
+PER_PROCESS_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register()
+def check_field_cache_backend(app_configs, **kwargs):
+    alias = getattr(settings, 'FIELD_CACHE_ALIAS', 'default')
+    backend = settings.CACHES.get(alias, {}).get('BACKEND')
+    if backend not in PER_PROCESS_CACHE_BACKENDS:
+        return []
+    return [Error(
+        f"The field cache ('{alias}') uses {backend}, which is not shared between processes.",
+        hint="Workers, the hold sweeper and imports bump field versions from other processes; "
+             "configure a shared backend such as FileBasedCache, DatabaseCache, Memcached or Redis.",
+        id='fields.E001',
+    )]
@@ -0,0 +1,118 @@
+from collections import Counter
+from decimal import Decimal
+
+from django.db.models import Case, CharField, Count, IntegerField, Value, When
+from django.db.models.functions import Cast
+
+from .models import Field
+
+# (key, label, exclusive upper bound); the last band is open-ended
+PRICE_BUCKETS = (
+    ('free', 'Free', Decimal('0.01')),
+    ('under-1000', 'Under ৳1,000', Decimal('1000')),
+    ('1000-2000', '৳1,000 - ৳2,000', Decimal('2000')),
+    ('2000-3500', '৳2,000 - ৳3,500', Decimal('3500')),
+    ('3500-plus', '৳3,500 and up', None),
+)
+PRICE_BUCKET_LABELS = {key: label for key, label, _ in PRICE_BUCKETS}
+MIN_RATING_CHOICES = (4, 3, 2)
+
+FACETS = ('field_type', 'availability_type', 'is_women_only', 'price_bucket', 'rating_bucket')
+
+
+def price_bucket_expression():
+    # Bands are tested in order, so each When only needs its upper bound
+    return Case(
+        *[When(cost_per_hour__lt=upper, then=Value(key)) for key, _, upper in PRICE_BUCKETS if upper is not None],
+        default=Value(PRICE_BUCKETS[-1][0]),
+        output_field=CharField(),
+    )
+
+
+def rating_bucket_expression():
+    # Whole stars: CAST truncates, so 3.9 lands in 3 and "4+ stars" is buckets 4 and 5
+    return Cast('average_rating', IntegerField())
+
+
+def filter_price_bucket(queryset, key):
+    if key not in PRICE_BUCKET_LABELS:
+        return queryset
+    return queryset.alias(price_bucket=price_bucket_expression()).filter(price_bucket=key)
+
+
+def parse_facets(params):
+    """The facet selections in request parameters; unknown values select nothing"""
+    selected = {}
+    if params.get('field_type') in dict(Field.FIELD_TYPES):
+        selected['field_type'] = params['field_type']
+    if params.get('availability') in dict(Field.AVAILABILITY):
+        selected['availability_type'] = params['availability']
+    if params.get('women_only') == 'on':
+        selected['is_women_only'] = True
+    if params.get('price') in PRICE_BUCKET_LABELS:
+        selected['price_bucket'] = params['price']
+    try:
+        min_rating = int(params.get('min_rating', ''))
+    except ValueError:
+        min_rating = None
+    if min_rating is not None and 1 <= min_rating <= 5:
+        selected['rating_bucket'] = min_rating
+    return selected
+
+
+def apply_facets(queryset, selected):
+    for facet in ('field_type', 'availability_type', 'is_women_only'):
+        if facet in selected:
+            queryset = queryset.filter(**{facet: selected[facet]})
+    if 'rating_bucket' in selected:
+        queryset = queryset.filter(average_rating__gte=selected['rating_bucket'])
+    if 'price_bucket' in selected:
+        queryset = filter_price_bucket(queryset, selected['price_bucket'])
+    return queryset
+
+
+def _matches(facet, value, selected):
+    wanted = selected.get(facet)
+    if wanted is None:
+        return True
+    if facet == 'rating_bucket':
+        return value is not None and value >= wanted
+    return value == wanted
+
+
+def facet_counts(queryset, selected):
+    """Counts per facet value for `queryset` (every filter except the facet ones applied)
+
+    `selected` maps facet names to the chosen value (`rating_bucket` to a minimum).
+    One GROUP BY over all facet columns returns a row per combination, at most a few
+    hundred, and each facet is totalled from those rows with every selection but its
+    own applied, so picking "Football" still shows how many Cricket fields there are.
+    """
+    rows = (
+        queryset.order_by()
+        .values('field_type', 'availability_type', 'is_women_only',
+                price_bucket=price_bucket_expression(), rating_bucket=rating_bucket_expression())
+        .annotate(count=Count('id'))
+    )
+    counts = {facet: Counter() for facet in FACETS}
+    total = 0
+    for row in rows:
+        matched = {facet: _matches(facet, row[facet], selected) for facet in FACETS}
+        for facet in FACETS:
+            if all(ok for other, ok in matched.items() if other != facet):
+                counts[facet][row[facet]] += row['count']
+        if all(matched.values()):
+            total += row['count']
+
+    ratings = counts['rating_bucket']
+    return {
+        'total': total,
+        'field_type': [(value, label, counts['field_type'][value]) for value, label in Field.FIELD_TYPES],
+        'availability_type': [(value, label, counts['availability_type'][value]) for value, label in Field.AVAILABILITY],
+        'women_only': counts['is_women_only'][True],
+        'price': [(key, label, counts['price_bucket'][key]) for key, label, _ in PRICE_BUCKETS],
+        'min_rating': [
+            (stars, sum(n for bucket, n in ratings.items() if bucket is not None and bucket >= stars))
+            for stars in MIN_RATING_CHOICES
+        ],
+    }
@@ -6,7 +6,7 @@ class FieldForm(forms.ModelForm):
     class Meta:
         model = Field
         fields = ['name', 'field_type', 'location', 'cost_per_hour', 'availability_type',
-                 'description', 'image', 'is_women_only', 'capacity', 'amenities']
+                 'description', 'image', 'is_women_only', 'capacity', 'amenities', 'latitude', 'longitude']
         widgets = {
             'name': forms.TextInput(attrs={'class': 'form-control'}),
             'field_type': forms.Select(attrs={'class': 'form-control'}),
@@ -17,8 +17,17 @@ class FieldForm(forms.ModelForm):
             'image': forms.FileInput(attrs={'class': 'form-control'}),
             'capacity': forms.NumberInput(attrs={'class': 'form-control'}),
             'amenities': forms.Textarea(attrs={'class': 'form-control', 'rows': 3}),
+            'latitude': forms.NumberInput(attrs={'class': 'form-control', 'step': 'any', 'placeholder': '23.8103'}),
+            'longitude': forms.NumberInput(attrs={'class': 'form-control', 'step': 'any', 'placeholder': '90.4125'}),
         }
 
+    def clean(self):
+        cleaned_data = super().clean()
+        latitude, longitude = cleaned_data.get('latitude'), cleaned_data.get('longitude')
+        if (latitude is None) != (longitude is None) and not self.has_error('latitude') and not self.has_error('longitude'):
+            raise forms.ValidationError("Enter both latitude and longitude, or leave both empty.")
+        return cleaned_data
+
 
 class ReviewForm(forms.ModelForm):
     class Meta:
@@ -0,0 +1,128 @@
+import math
+
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Fields are bucketed on a fixed latitude/longitude grid. A cell is ~5.5 km north-south
+# (less east-west away from the equator), so a few-km radius covers a handful of cells.
+CELL_DEGREES = 0.05
+GRID_ROWS = round(180 / CELL_DEGREES)
+GRID_COLUMNS = round(360 / CELL_DEGREES)
+
+DEFAULT_RADIUS_KM = 10
+MAX_RADIUS_KM = 100
+
+
+def cell_row(latitude):
+    return min(int((latitude + 90) // CELL_DEGREES), GRID_ROWS - 1)
+
+
+def cell_column(longitude):
+    return int((longitude + 180) // CELL_DEGREES) % GRID_COLUMNS
+
+
+def cell_id(latitude, longitude):
+    """Grid cell for a coordinate, or None when either part is missing
+
+    Cells are numbered row by row, so the cells of one row between two longitudes are a
+    contiguous id range and a bounding box is one index range scan per row.
+    """
+    if latitude is None or longitude is None:
+        return None
+    return cell_row(latitude) * GRID_COLUMNS + cell_column(longitude)
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """(min_lat, max_lat, [(min_lng, max_lng), ...]) enclosing the circle
+
+    Longitude spans are split at the antimeridian; a circle reaching a pole spans every longitude.
+    """
+    angle = radius_km / EARTH_RADIUS_KM
+    min_lat = latitude - math.degrees(angle)
+    max_lat = latitude + math.degrees(angle)
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90), min(max_lat, 90), [(-180, 180)]
+
+    delta = math.degrees(math.asin(min(1, math.sin(angle) / math.cos(math.radians(latitude)))))
+    min_lng, max_lng = longitude - delta, longitude + delta
+    if max_lng - min_lng >= 360:
+        return min_lat, max_lat, [(-180, 180)]
+    if min_lng < -180:
+        return min_lat, max_lat, [(min_lng + 360, 180), (-180, max_lng)]
+    if max_lng > 180:
+        return min_lat, max_lat, [(min_lng, 180), (-180, max_lng - 360)]
+    return min_lat, max_lat, [(min_lng, max_lng)]
+
+
+def cell_ranges(min_lat, max_lat, longitude_spans):
+    """Inclusive (first, last) cell id ranges covering the box, one per grid row and span"""
+    ranges = []
+    for row in range(cell_row(min_lat), cell_row(max_lat) + 1):
+        for min_lng, max_lng in longitude_spans:
+            first, last = cell_column(min_lng), cell_column(max_lng)
+            if last < first:
+                # 180 itself wraps to column 0; clamp it to the last column of the row
+                last = GRID_COLUMNS - 1
+            ranges.append((row * GRID_COLUMNS + first, row * GRID_COLUMNS + last))
+    return ranges
+
+
+def within_box(latitude, longitude, radius_km):
+    """Q that prefilters fields to the circle's bounding box through the geo_cell index
+
+    The cell ranges drive the index lookup; the latitude/longitude bounds then trim the
+    part of the edge cells that lies outside the box.
+    """
+    min_lat, max_lat, spans = bounding_box(latitude, longitude, radius_km)
+    cells = Q()
+    for first, last in cell_ranges(min_lat, max_lat, spans):
+        cells |= Q(geo_cell__range=(first, last))
+    longitudes = Q()
+    for min_lng, max_lng in spans:
+        longitudes |= Q(longitude__range=(min_lng, max_lng))
+    return cells & Q(latitude__range=(min_lat, max_lat)) & longitudes
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def distance_expression(latitude, longitude):
+    """Great-circle distance in km from the point to each row, as an ORM expression"""
+    lat0 = Value(math.radians(latitude), output_field=FloatField())
+    lng0 = Value(math.radians(longitude), output_field=FloatField())
+    lat = Radians(F('latitude'))
+    a = (
+        Power(Sin((lat - lat0) / 2), 2)
+        + Value(math.cos(math.radians(latitude)), output_field=FloatField()) * Cos(lat)
+        * Power(Sin((Radians(F('longitude')) - lng0) / 2), 2)
+    )
+    # Rounding can push `a` a hair past 1 for antipodal points, which ASIN rejects
+    return Value(2 * EARTH_RADIUS_KM, output_field=FloatField()) * ASin(
+        Least(Sqrt(a), Value(1.0, output_field=FloatField()))
+    )
+
+
+def parse_point(latitude, longitude):
+    """(lat, lng) floats from request strings, or None if either is missing or out of range"""
+    try:
+        latitude, longitude = float(latitude), float(longitude)
+    except (TypeError, ValueError):
+        return None
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return None
+    return latitude, longitude
+
+
+def parse_radius(value, default=DEFAULT_RADIUS_KM, maximum=MAX_RADIUS_KM):
+    try:
+        radius = float(value)
+    except (TypeError, ValueError):
+        return default
+    if not math.isfinite(radius) or radius <= 0:
+        return default
+    return min(radius, maximum)
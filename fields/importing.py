@@ -0,0 +1,233 @@
+import csv
+import itertools
+import json
+import time
+
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+
+from . import geo
+from .amenities import tag_fields
+from .caching import field_cache
+from .forms import FieldForm
+from .models import Field, FieldTimeSlot
+from .search import index_new_fields
+from .slots import default_time_slots
+from .tasks import queue_thumbnails
+
+FALSE_STRINGS = {'', '0', 'false', 'no', 'off', 'n'}
+BOOLEAN_COLUMNS = ('is_women_only',)
+SLOT_COLUMNS = ('field_id', 'start_time', 'end_time', 'is_available')
+
+
+def iter_csv(stream):
+    """(line number, row dict) for each CSV record; the header is line 1"""
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def iter_json_lines(stream):
+    """(line number, object) per non-blank line; a line that isn't JSON comes back as its JSONDecodeError"""
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError as exc:
+            # FieldImporter.build records it against the line and the import goes on
+            item = exc
+        yield number, item
+
+
+def _element_end(buffer):
+    """Where the array element at the start of `buffer` ends (its ',' or ']'); None if past the end
+
+    Only brackets and strings are tracked, which is enough to step over an element that
+    raw_decode rejected.
+    """
+    depth = 0
+    in_string = escaped = False
+    for index, char in enumerate(buffer):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in '[{':
+            depth += 1
+        elif char in ']}':
+            if depth == 0:
+                return index
+            depth -= 1
+        elif char == ',' and depth == 0:
+            return index
+    return None
+
+
+def iter_json_array(stream, chunk_size=65536):
+    """(position, object) for each element of a top-level JSON array, read chunk by chunk
+
+    The stdlib has no incremental parser, so objects are cut out of a rolling buffer
+    with raw_decode; only one chunk plus the object being parsed is in memory. A malformed
+    element comes back as its JSONDecodeError and the elements after it are still read;
+    only an array that is never closed raises.
+    """
+    decoder = json.JSONDecoder()
+    buffer = stream.read(chunk_size).lstrip()
+    if not buffer.startswith('['):
+        raise ValueError('Expected a JSON array of field objects')
+    buffer = buffer[1:]
+    position = 0
+    eof = False
+    while True:
+        buffer = buffer.lstrip().lstrip(',').lstrip()
+        if buffer.startswith(']'):
+            return
+        try:
+            item, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError as exc:
+            end = _element_end(buffer)
+            if end is None:
+                # The element continues in the next chunk
+                if eof:
+                    raise ValueError('The JSON array is not closed') from exc
+                more = stream.read(chunk_size)
+                eof = not more
+                buffer += more
+                continue
+            item = exc
+        position += 1
+        yield position, item
+        buffer = buffer[end:]
+
+
+READERS = {'csv': iter_csv, 'jsonl': iter_json_lines, 'json': iter_json_array}
+
+
+class FieldImporter:
+    """Validates field rows with FieldForm and bulk-inserts them with their default slots
+
+    Rows are read lazily and written every `batch_size`: one INSERT for the fields, one
+    for their time slots, one for their amenity tags and one executemany into the search
+    index, all in one transaction per batch. Bulk inserts skip model signals, so the side
+    effects of `add_field` are done here in bulk instead: the listing cache is bumped once
+    at the end and thumbnails are queued for rows that name an existing image. Rating
+    aggregates start at zero, which is right for a field without reviews.
+    """
+
+    def __init__(self, default_owner=None, batch_size=1000, dry_run=False, stdout=None):
+        self.default_owner = default_owner
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.stdout = stdout
+        self.owners = {}
+        self.created = {'fields': 0, 'slots': 0}
+        self.errors = []
+
+    def log(self, message):
+        if self.stdout is not None:
+            self.stdout.write(message)
+
+    def run(self, rows):
+        """Import (row number, dict) pairs; returns the created counts, errors in `self.errors`"""
+        started = time.perf_counter()
+        valid = (field for field in map(self.build, rows) if field is not None)
+        while True:
+            batch = list(itertools.islice(valid, self.batch_size))
+            if not batch:
+                break
+            if not self.dry_run:
+                self._save(batch)
+            else:
+                self.created['fields'] += len(batch)
+            self.log(f"  {self.created['fields']} fields ({len(self.errors)} rejected rows) "
+                     f"after {time.perf_counter() - started:.1f}s")
+        if self.created['fields'] and not self.dry_run:
+            field_cache.bump(field_cache.ALL_FIELDS, 'listing')
+        return self.created
+
+    def build(self, numbered_row):
+        """A validated, unsaved Field for the row, or None with the problems recorded"""
+        number, row = numbered_row
+        if isinstance(row, json.JSONDecodeError):
+            self.errors.append((number, {'__all__': [f'Invalid JSON: {row.msg}']}))
+            return None
+        if not isinstance(row, dict):
+            self.errors.append((number, {'__all__': ['Expected an object with field columns']}))
+            return None
+        data = {key.strip(): self._clean_value(key.strip(), value) for key, value in row.items() if key}
+        for column in BOOLEAN_COLUMNS:
+            if column in data and str(data[column]).strip().lower() in FALSE_STRINGS:
+                # An unchecked checkbox is a missing key, not "false"
+                del data[column]
+
+        problems = {}
+        owner = self._owner(data.pop('owner', None) or self.default_owner)
+        if owner is None:
+            problems['owner'] = ['Unknown owner; pass --owner or give an existing username per row']
+        image = data.pop('image', None)
+        if image and not default_storage.exists(image):
+            problems['image'] = [f'{image} is not in media storage']
+
+        form = FieldForm(data=data)
+        if not form.is_valid():
+            problems.update({name: list(messages) for name, messages in form.errors.items()})
+        if problems:
+            self.errors.append((number, problems))
+            return None
+
+        field = form.save(commit=False)
+        field.owner = owner
+        # bulk_create bypasses Field.save, which normally keeps the cell in step
+        field.geo_cell = geo.cell_id(field.latitude, field.longitude)
+        if image:
+            field.image.name = image
+        return field
+
+    def _clean_value(self, key, value):
+        if isinstance(value, str):
+            return value.strip()
+        if isinstance(value, bool) and key in BOOLEAN_COLUMNS:
+            return 'on' if value else ''
+        return value
+
+    def _owner(self, username):
+        if not username:
+            return None
+        if username not in self.owners:
+            self.owners[username] = User.objects.filter(username=username).first()
+        return self.owners[username]
+
+    def _save(self, batch):
+        with transaction.atomic():
+            fields = Field.objects.bulk_create(batch)
+            slots = self._insert_slots([field.id for field in fields])
+            index_new_fields(fields)
+            tag_fields(fields)
+            for field in fields:
+                if field.image:
+                    transaction.on_commit(lambda image=field.image: queue_thumbnails(image))
+        self.created['fields'] += len(fields)
+        self.created['slots'] += slots
+
+    def _insert_slots(self, field_ids):
+        # Every field gets the same 11 rows, so skip building ~11 model instances per field
+        # and hand the driver plain tuples. Per field, ids still follow DEFAULT_TIME_SLOTS,
+        # which is the order the occupancy bitmaps assume.
+        template = [
+            tuple(FieldTimeSlot._meta.get_field(name).get_db_prep_save(getattr(slot, name), connection)
+                  for name in SLOT_COLUMNS[1:])
+            for slot in default_time_slots(None)
+        ]
+        rows = [(field_id,) + values for field_id in field_ids for values in template]
+        table = FieldTimeSlot._meta.db_table
+        placeholders = ', '.join(['%s'] * len(SLOT_COLUMNS))
+        with connection.cursor() as cursor:
+            cursor.executemany(f'INSERT INTO {table} ({", ".join(SLOT_COLUMNS)}) VALUES ({placeholders})', rows)
+        return len(rows)
@@ -0,0 +1,93 @@
+import statistics
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models.functions import Substr
+from django.template.loader import render_to_string
+
+from fields.models import AMENITIES_PREVIEW_LENGTH, Field
+
+CARD_TEMPLATES = ('fields/field_card.html', 'fields/search_field_card.html')
+
+
+class Command(BaseCommand):
+    help = ('Compare loading and rendering listing cards from full Field rows against the '
+            'Field.objects.cards() projection: fetch time, render time, peak Python memory and bytes read.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=2000, help='Active fields per run')
+        parser.add_argument('--runs', type=int, default=5)
+
+    def handle(self, *args, **options):
+        limit = options['limit']
+        base = Field.objects.filter(is_active=True).order_by('-created_at', '-id')
+        if not base.exists():
+            raise CommandError('No active fields; seed data first (seed_arena).')
+
+        variants = [
+            # Same annotation as cards() so both variants render identical HTML
+            ('full rows', lambda: base.annotate(
+                amenities_preview=Substr('amenities', 1, AMENITIES_PREVIEW_LENGTH))[:limit]),
+            ('card projection', lambda: base.cards()[:limit]),
+        ]
+        results = {}
+        for name, queryset in variants:
+            results[name] = self._measure(queryset, options['runs'])
+            row = results[name]
+            self.stdout.write(
+                f"{name:<16} rows={row['rows']:<6} fetch={row['fetch_ms']:>8.1f}ms render={row['render_ms']:>8.1f}ms "
+                f"peak={row['peak_kib']:>9.1f}KiB ({row['bytes_per_row']:.0f}B/row) read={row['read_kib']:>9.1f}KiB"
+            )
+
+        full, cards = results['full rows'], results['card projection']
+        self.stdout.write(self.style.SUCCESS(
+            f"Projection: {self._change(full['peak_kib'], cards['peak_kib'])} peak memory, "
+            f"{self._change(full['fetch_ms'] + full['render_ms'], cards['fetch_ms'] + cards['render_ms'])} "
+            f"fetch+render time, {self._change(full['read_kib'], cards['read_kib'])} data read"
+        ))
+
+    def _measure(self, make_queryset, runs):
+        fetch_times, render_times = [], []
+        rows = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            rows = list(make_queryset())
+            fetched = time.perf_counter()
+            self._render(rows)
+            rendered = time.perf_counter()
+            fetch_times.append((fetched - started) * 1000)
+            render_times.append((rendered - fetched) * 1000)
+
+        # Memory gets its own pass: tracemalloc slows everything it watches
+        tracemalloc.start()
+        self._render(list(make_queryset()))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        return {
+            'rows': len(rows),
+            'fetch_ms': statistics.median(fetch_times),
+            'render_ms': statistics.median(render_times),
+            'peak_kib': peak / 1024,
+            'bytes_per_row': peak / max(len(rows), 1),
+            'read_kib': self._bytes_read(make_queryset()) / 1024,
+        }
+
+    def _render(self, rows):
+        for template_name in CARD_TEMPLATES:
+            for field in rows:
+                render_to_string(template_name, {'field': field})
+
+    def _bytes_read(self, queryset):
+        # Sum of the raw column values the database hands back for this query
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return sum(len(str(value)) for row in cursor.fetchall() for value in row if value is not None)
+
+    def _change(self, before, after):
+        if not before:
+            return 'n/a'
+        return f'{(after - before) / before * 100:+.0f}%'
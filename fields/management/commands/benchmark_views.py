@@ -0,0 +1,84 @@
+import json
+import logging
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from fields.benchmarking import BASELINE_SEED, DEFAULT_BASELINE, benchmark_urls, compare, measure, pick_sample
+from fields.seeding import Seeder
+
+
+class Command(BaseCommand):
+    help = ('Measure query count, p50/p95 latency and response size of every URL in the fields, '
+            'bookings and accounts apps through the test client, and compare against a JSON baseline. '
+            'The committed baseline was taken on a fresh database with --seed and the default seed '
+            'options; benchmarks/views_baseline_test.json, which fields.tests checks under manage.py test, '
+            'with --seed-fields 30 --seed-bookings 1500 --seed-reviews 200.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=20, help='Timed requests per URL')
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE))
+        parser.add_argument('--write-baseline', action='store_true',
+                            help='Store this run as the new baseline instead of comparing')
+        parser.add_argument('--latency-tolerance', type=float, default=0.5,
+                            help='Allowed p95 slowdown as a fraction of the baseline (0.5 = +50%%)')
+        parser.add_argument('--size-tolerance', type=float, default=0.1)
+        parser.add_argument('--seed', action='store_true',
+                            help='Seed a large dataset first (same generator as seed_arena)')
+        parser.add_argument('--seed-fields', type=int, default=BASELINE_SEED['fields'])
+        parser.add_argument('--seed-bookings', type=int, default=BASELINE_SEED['bookings'])
+        parser.add_argument('--seed-reviews', type=int, default=BASELINE_SEED['reviews'])
+        parser.add_argument('--random-seed', type=int, default=BASELINE_SEED['seed'],
+                            help='Seed for the data generator; the same value reproduces the same rows')
+        parser.add_argument('--only', nargs='*', default=None, help='Only benchmark these URL names')
+
+    def handle(self, *args, **options):
+        baseline_path = Path(options['baseline'])
+        if not options['write_baseline'] and not baseline_path.exists():
+            raise CommandError(f'No baseline at {baseline_path}; run with --write-baseline to create one.')
+
+        if options['seed']:
+            Seeder(fields=options['seed_fields'], bookings=options['seed_bookings'],
+                   reviews=options['seed_reviews'], seed=options['random_seed'], stdout=self.stdout).run()
+
+        picked = pick_sample()
+        if picked is None:
+            raise CommandError('No bookings to benchmark against; seed data first (--seed).')
+        user, sample = picked
+        client = Client()
+        client.force_login(user)
+
+        # 404s and 403s are expected for some sample rows; keep them out of the report
+        logging.getLogger('django.request').setLevel(logging.ERROR)
+
+        results = {}
+        for name, url, skipped in benchmark_urls(sample):
+            if options['only'] and name not in options['only']:
+                continue
+            if skipped:
+                self.stdout.write(self.style.WARNING(f'Skipping {name}; no sample row'))
+                continue
+            results[name] = measure(client, user, url, options['runs'], options['warmup'])
+            row = results[name]
+            self.stdout.write(
+                f"{name:<32} {row['status']:>3} q={row['queries']:<4} "
+                f"p50={row['p50_ms']:>8.1f}ms p95={row['p95_ms']:>8.1f}ms size={row['bytes']:>8}B"
+            )
+
+        if options['write_baseline']:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps(results, indent=2, sort_keys=True) + '\n')
+            self.stdout.write(self.style.SUCCESS(f'Wrote baseline for {len(results)} URLs to {baseline_path}'))
+            return
+
+        regressions, warnings = compare(json.loads(baseline_path.read_text()), results,
+                                        options['latency_tolerance'], options['size_tolerance'])
+        for message in warnings:
+            self.stdout.write(self.style.WARNING(message))
+        for message in regressions:
+            self.stdout.write(self.style.ERROR(message))
+        if regressions:
+            raise CommandError(f'{len(regressions)} performance regressions against {baseline_path}')
+        self.stdout.write(self.style.SUCCESS('No regressions against the baseline.'))
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import override_settings
+
+from fields.query_plans import ISOLATED_CACHES, capture, explain, full_scans, hot_pages, seed_plan_data
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ('Run EXPLAIN QUERY PLAN over every query issued by the hot pages '
+            '(home, fields, field_detail, book_field, my_bookings, near-me search) and fail if any of them '
+            'falls back to a full table scan. Seed data is rolled back afterwards. '
+            'fields.tests runs the same check under manage.py test.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every plan, not only failures')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('EXPLAIN QUERY PLAN checks are written for SQLite.')
+
+        failures = []
+        checked = 0
+        try:
+            with override_settings(CACHES=ISOLATED_CACHES), transaction.atomic():
+                user, field = seed_plan_data()
+                client = Client()
+                client.force_login(user)
+                for name, url in hot_pages(field):
+                    try:
+                        queries = capture(client, url)
+                    except AssertionError as e:
+                        raise CommandError(str(e))
+                    for sql, params in queries:
+                        plan = explain(sql, params)
+                        checked += 1
+                        scans = full_scans(plan)
+                        if scans:
+                            failures.append((name, sql, plan, scans))
+                        elif options['verbose_plans']:
+                            self.stdout.write(f'[{name}] {sql}\n    ' + '\n    '.join(plan))
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        for name, sql, plan, scans in failures:
+            self.stdout.write(self.style.ERROR(f"[{name}] full scan of {', '.join(scans)}"))
+            self.stdout.write(f'    {sql}')
+            for line in plan:
+                self.stdout.write(f'        {line}')
+
+        if failures:
+            raise CommandError(f'{len(failures)} of {checked} queries regressed to a table scan')
+        self.stdout.write(self.style.SUCCESS(f'All {checked} queries use an index.'))
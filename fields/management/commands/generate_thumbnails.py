@@ -0,0 +1,51 @@
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from fields.tasks import THUMBNAIL_SOURCES, record_thumbnails
+from fields.thumbnails import backfill_one, setup_backfill_worker, thumbnail_widths
+
+
+class Command(BaseCommand):
+    help = ('Generate WebP/JPEG thumbnails for every field, review and profile image whose widths are '
+            'not recorded yet, spreading the decoding over a process pool.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--chunksize', type=int, default=4)
+        parser.add_argument('--force', action='store_true', help='Rebuild thumbnails that already exist')
+
+    def handle(self, *args, **options):
+        # Image name -> the rows showing it, whose thumbnails column gets the widths
+        rows = defaultdict(list)
+        for model, column in THUMBNAIL_SOURCES.items():
+            queryset = (apps.get_model(model).objects.exclude(**{column: ''})
+                        .exclude(**{f'{column}__isnull': True}).values_list('pk', column, 'thumbnails'))
+            for pk, name, record in queryset:
+                if options['force'] or not record or record.get('name') != name:
+                    rows[name].append((model, pk))
+        names = sorted(rows)
+        self.stdout.write(f'{len(names)} images, widths {", ".join(map(str, thumbnail_widths()))}, '
+                          f'{options["workers"]} workers')
+
+        # Forked workers must not share the parent's database connections
+        connections.close_all()
+        started = time.perf_counter()
+        written = 0
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=setup_backfill_worker) as pool:
+            jobs = ((name, options['force']) for name in names)
+            for name, widths, created in pool.map(backfill_one, jobs, chunksize=options['chunksize']):
+                written += len(created)
+                for model, pk in rows[name]:
+                    record_thumbnails(model, pk, name, widths)
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'  {name}: {len(created)} thumbnails')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {written} thumbnails for {len(names)} images in {time.perf_counter() - started:.1f}s'
+        ))
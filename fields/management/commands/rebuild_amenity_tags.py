@@ -0,0 +1,18 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from fields.amenities import rebuild_amenity_tags
+
+
+class Command(BaseCommand):
+    help = 'Re-derive the amenity tags of every field from its amenities text'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        total = rebuild_amenity_tags(batch_size=options['batch_size'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'Linked {total} field amenities in {elapsed:.2f}s'))
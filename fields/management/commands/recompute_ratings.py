@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from fields.ratings import recompute_ratings
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized review count, rating sum, histogram and average on every field'
+
+    def add_arguments(self, parser):
+        parser.add_argument('field_ids', nargs='*', type=int, help='Only repair these fields')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        with transaction.atomic():
+            touched = recompute_ratings(
+                field_ids=options['field_ids'] or None,
+                batch_size=options['batch_size'],
+            )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'Recomputed ratings for {touched} fields in {elapsed:.2f}s'))
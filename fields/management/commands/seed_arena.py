@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from fields.seeding import Seeder
+
+
+class Command(BaseCommand):
+    help = ('Generate a deterministic synthetic dataset for load testing: users with profiles, fields '
+            'with default time slots, bookings, payments, team formations, join requests, reviews and '
+            'review images. Rows are bulk-inserted in streamed batches.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--fields', type=int, default=2000)
+        parser.add_argument('--bookings', type=int, default=200000, help='Approximate total bookings')
+        parser.add_argument('--reviews', type=int, default=20000, help='Approximate total reviews')
+        parser.add_argument('--days', type=int, default=60,
+                            help='Bookings span this many days either side of today')
+        parser.add_argument('--skew', type=float, default=0.8,
+                            help='Popularity exponent: 0 = uniform, 1 = Zipf-like long tail')
+        parser.add_argument('--owner-ratio', type=float, default=0.1)
+        parser.add_argument('--review-image-ratio', type=float, default=0.3)
+        parser.add_argument('--team-ratio', type=float, default=0.1,
+                            help='Share of Confirmed bookings that look for players')
+        parser.add_argument('--max-join-requests', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=0, help='Random seed; same seed, same data')
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        seeder = Seeder(
+            users=options['users'],
+            fields=options['fields'],
+            bookings=options['bookings'],
+            reviews=options['reviews'],
+            days=options['days'],
+            skew=options['skew'],
+            owner_ratio=options['owner_ratio'],
+            review_image_ratio=options['review_image_ratio'],
+            team_ratio=options['team_ratio'],
+            max_join_requests=options['max_join_requests'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            stdout=self.stdout,
+        )
+        started = time.perf_counter()
+        created = seeder.run()
+        elapsed = time.perf_counter() - started
+
+        total = sum(created.values())
+        summary = ', '.join(f'{name}={count}' for name, count in created.items())
+        self.stdout.write(self.style.SUCCESS(
+            f'Inserted {total} rows in {elapsed:.1f}s ({total / elapsed:.0f} rows/s): {summary}'
+        ))
@@ -0,0 +1,69 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:51
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def backfill_rating_aggregates(apps, schema_editor):
+    Field = apps.get_model('fields', 'Field')
+    Review = apps.get_model('fields', 'Review')
+
+    star_counts = {f'rating_{stars}_count': Count('id', filter=Q(rating=stars)) for stars in range(1, 6)}
+    rows = Review.objects.values('field_id').annotate(
+        review_count=Count('id'), rating_sum=Sum('rating'), **star_counts
+    ).order_by()
+    for row in rows:
+        field_id = row.pop('field_id')
+        row['average_rating'] = row['rating_sum'] / row['review_count']
+        Field.objects.filter(pk=field_id).update(**row)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fields', '0002_field_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='field',
+            name='average_rating',
+            field=models.FloatField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='field',
+            name='rating_1_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='field',
+            name='rating_2_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='field',
+            name='rating_3_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='field',
+            name='rating_4_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='field',
+            name='rating_5_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='field',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='field',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_rating_aggregates, migrations.RunPython.noop),
+    ]
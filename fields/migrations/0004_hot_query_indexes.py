@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fields', '0003_field_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='field',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at', '-id'], name='field_active_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fieldtimeslot',
+            index=models.Index(fields=['field', 'is_available', 'start_time'], name='slot_field_avail_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['field', '-created_at'], name='review_field_recent_idx'),
+        ),
+    ]
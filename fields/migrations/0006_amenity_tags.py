@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fields', '0005_field_coordinates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Amenity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50)),
+                ('slug', models.SlugField(max_length=60, unique=True)),
+            ],
+            options={
+                'verbose_name_plural': 'amenities',
+            },
+        ),
+        migrations.CreateModel(
+            name='FieldAmenity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amenity', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='fields.amenity')),
+                ('field', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='fields.field')),
+            ],
+            options={
+                'unique_together': {('amenity', 'field')},
+            },
+        ),
+        migrations.AddField(
+            model_name='field',
+            name='amenity_tags',
+            field=models.ManyToManyField(blank=True, related_name='fields', through='fields.FieldAmenity', to='fields.amenity'),
+        ),
+    ]
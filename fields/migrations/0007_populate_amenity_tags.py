@@ -0,0 +1,77 @@
+import re
+
+from django.db import migrations
+from django.utils.text import slugify
+
+# Frozen copies of fields.amenities.amenity_slug/parse_amenities as of this migration
+SEPARATORS = re.compile(r'[,;\n\r|•·/&]+|\s+and\s+', re.IGNORECASE)
+MAX_NAME_LENGTH = 50
+BATCH_SIZE = 2000
+SLUG_ALIASES = {
+    'showers': 'shower',
+    'floodlights': 'floodlight',
+    'changing-rooms': 'changing-room',
+    'dressing-rooms': 'dressing-room',
+    'lockers': 'locker',
+    'toilets': 'toilet',
+    'washrooms': 'washroom',
+    'restrooms': 'restroom',
+    'benches': 'bench',
+    'seats': 'seat',
+    'nets': 'net',
+    'balls': 'ball',
+}
+
+
+def tag_slug(name):
+    slug = slugify(name, allow_unicode=True)
+    return SLUG_ALIASES.get(slug, slug)
+
+
+def parse(text):
+    tags = {}
+    for piece in SEPARATORS.split(text or ''):
+        name = ' '.join(piece.strip(' \t-*.:').split())
+        slug = tag_slug(name)
+        if slug and len(name) <= MAX_NAME_LENGTH and slug not in tags:
+            tags[slug] = name[0].upper() + name[1:]
+    return tags
+
+
+def populate_amenity_tags(apps, schema_editor):
+    Field = apps.get_model('fields', 'Field')
+    Amenity = apps.get_model('fields', 'Amenity')
+    FieldAmenity = apps.get_model('fields', 'FieldAmenity')
+
+    amenity_ids = dict(Amenity.objects.values_list('slug', 'id'))
+    last_id = 0
+    while True:
+        batch = list(Field.objects.filter(id__gt=last_id).order_by('id').values_list('id', 'amenities')[:BATCH_SIZE])
+        if not batch:
+            break
+        parsed = [(field_id, parse(text)) for field_id, text in batch]
+        new = {slug: name for _, tags in parsed for slug, name in tags.items() if slug not in amenity_ids}
+        if new:
+            Amenity.objects.bulk_create([Amenity(slug=slug, name=name) for slug, name in new.items()])
+            amenity_ids.update(Amenity.objects.filter(slug__in=new).values_list('slug', 'id'))
+        FieldAmenity.objects.bulk_create(
+            [FieldAmenity(field_id=field_id, amenity_id=amenity_ids[slug]) for field_id, tags in parsed for slug in tags],
+            ignore_conflicts=True,
+        )
+        last_id = batch[-1][0]
+
+
+def clear_amenity_tags(apps, schema_editor):
+    apps.get_model('fields', 'FieldAmenity').objects.all().delete()
+    apps.get_model('fields', 'Amenity').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fields', '0006_amenity_tags'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_amenity_tags, clear_amenity_tags),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fields', '0007_populate_amenity_tags'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='field',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fields', '0008_field_deleted_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='amenity',
+            name='slug',
+            field=models.SlugField(allow_unicode=True, max_length=60, unique=True),
+        ),
+    ]
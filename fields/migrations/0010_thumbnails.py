@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fields', '0009_amenity_unicode_slug'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='field',
+            name='thumbnails',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='reviewimage',
+            name='thumbnails',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
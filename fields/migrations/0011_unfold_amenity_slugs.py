@@ -0,0 +1,23 @@
+from importlib import import_module
+
+from django.db import migrations
+
+# Same parsing as 0007 now uses: only listed plurals are folded into their singular
+populate = import_module('fields.migrations.0007_populate_amenity_tags')
+
+
+def retag_amenities(apps, schema_editor):
+    # Tags made by the old parser had any trailing "s" dropped ("tenni"); derive them again
+    populate.clear_amenity_tags(apps, schema_editor)
+    populate.populate_amenity_tags(apps, schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fields', '0010_thumbnails'),
+    ]
+
+    operations = [
+        migrations.RunPython(retag_amenities, migrations.RunPython.noop),
+    ]
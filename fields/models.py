@@ -1,7 +1,51 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models.functions import Substr
+from django.db.models.query import ValuesIterable
 from django.contrib.auth.models import User
 from decimal import Decimal
 
+from . import geo
+
+# What a listing card renders; description and the full amenities text stay on the detail page
+FIELD_CARD_COLUMNS = (
+    'id', 'name', 'field_type', 'location', 'cost_per_hour', 'availability_type', 'image',
+    'is_women_only', 'capacity', 'is_active', 'created_at', 'review_count', 'average_rating',
+    'latitude', 'longitude', 'thumbnails',
+)
+AMENITIES_PREVIEW_LENGTH = 100
+
+
+class FieldQuerySet(models.QuerySet):
+    def cards(self, *annotations):
+        """Listing rows as FieldCard objects: only the card columns, no model instances
+
+        Filters, ordering, slicing and annotations (e.g. `search_rank`) still chain as usual.
+        `annotations` names ones made earlier (e.g. `distance_km` from near()) to keep on the cards.
+        """
+        clone = self.values(
+            *FIELD_CARD_COLUMNS, *annotations, amenities_preview=Substr('amenities', 1, AMENITIES_PREVIEW_LENGTH)
+        )
+        clone._iterable_class = FieldCardIterable
+        return clone
+
+    def owned_by(self, user):
+        """The user's fields, minus those deleted and waiting for purge_field"""
+        return self.filter(owner=user, deleted_at__isnull=True)
+
+    def near(self, latitude, longitude, radius_km):
+        """Fields within `radius_km` of the point, annotated with `distance_km`
+
+        The geo_cell index narrows the rows to the grid cells under the circle's bounding
+        box; only those get the exact haversine distance. Order by `distance_km` to rank.
+        """
+        return self.filter(geo.within_box(latitude, longitude, radius_km)).annotate(
+            distance_km=geo.distance_expression(latitude, longitude)
+        ).filter(distance_km__lte=radius_km)
+
 
 class Field(models.Model):
     def __str__(self):
@@ -27,11 +71,58 @@ class Field(models.Model):
     availability_type = models.CharField(max_length=10, choices=AVAILABILITY)
     description = models.TextField(max_length=1000)
     image = models.ImageField(upload_to='fields/', blank=True, null=True)
+    # {'name': image, 'widths': [...]} once generate_thumbnails has run for that image; widths is
+    # empty when the source is narrower than every thumbnail width or can't be read
+    thumbnails = models.JSONField(null=True, blank=True, editable=False)
     is_women_only = models.BooleanField(default=False)
     capacity = models.PositiveIntegerField()
     amenities = models.TextField(max_length=500, blank=True)
+    # Tags parsed from `amenities` by fields.amenities, for indexed filtering
+    amenity_tags = models.ManyToManyField('Amenity', through='FieldAmenity', related_name='fields', blank=True)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the owner deletes the field; the row stays until the purge_field job runs
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    latitude = models.FloatField(null=True, blank=True,
+                                 validators=[MinValueValidator(-90), MaxValueValidator(90)])
+    longitude = models.FloatField(null=True, blank=True,
+                                  validators=[MinValueValidator(-180), MaxValueValidator(180)])
+    # Grid cell of (latitude, longitude), see fields.geo; kept in step by save()
+    geo_cell = models.PositiveIntegerField(null=True, blank=True, editable=False, db_index=True)
+
+    # Denormalized review aggregates, maintained by fields.ratings
+    review_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_1_count = models.PositiveIntegerField(default=0)
+    rating_2_count = models.PositiveIntegerField(default=0)
+    rating_3_count = models.PositiveIntegerField(default=0)
+    rating_4_count = models.PositiveIntegerField(default=0)
+    rating_5_count = models.PositiveIntegerField(default=0)
+    average_rating = models.FloatField(null=True, blank=True, db_index=True)
+
+    objects = FieldQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Listing pages: active fields, newest first (matches FIELD_LISTING_ORDER)
+            models.Index(fields=['-created_at', '-id'], condition=models.Q(is_active=True),
+                         name='field_active_recent_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.geo_cell = geo.cell_id(self.latitude, self.longitude)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'geo_cell'}
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored text so a save only re-tags when the amenities changed
+        instance._loaded_amenities = getattr(instance, 'amenities', None) if 'amenities' in field_names else None
+        return instance
 
     def get_90min_cost(self):
         """Get cost for 90 minutes (1.5 hours)"""
@@ -44,6 +135,80 @@ class Field(models.Model):
         cost = self.get_90min_cost()
         return f"${cost:.2f}"
 
+    def get_rating_histogram(self):
+        """Review counts per star, highest first"""
+        return [(stars, getattr(self, f'rating_{stars}_count')) for stars in range(5, 0, -1)]
+
+
+@dataclass(slots=True)
+class FieldCard:
+    """The slice of a Field a listing card renders
+
+    Built straight from a values() row, so a page of cards skips model instantiation and
+    never reads `description`. Templates use it like a Field (`image.url`, `get_90min_cost`).
+    """
+    id: int
+    name: str
+    field_type: str
+    location: str
+    cost_per_hour: Decimal
+    availability_type: str
+    image: models.fields.files.FieldFile
+    is_women_only: bool
+    capacity: int
+    is_active: bool
+    created_at: datetime
+    review_count: int
+    average_rating: float
+    latitude: float
+    longitude: float
+    thumbnails: dict
+    amenities_preview: str
+    search_rank: float = None
+    distance_km: float = None
+    time_slots: list = None
+
+    get_90min_cost = Field.get_90min_cost
+    get_formatted_90min_cost = Field.get_formatted_90min_cost
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def pk(self):
+        return self.id
+
+
+class FieldCardIterable(ValuesIterable):
+    def __iter__(self):
+        image_field = Field._meta.get_field('image')
+        for row in super().__iter__():
+            row['image'] = image_field.attr_class(None, image_field, row['image'])
+            card = FieldCard(**row)
+            # The srcset filter reads the recorded thumbnail widths off the file's instance
+            card.image.instance = card
+            yield card
+
+
+class Amenity(models.Model):
+    def __str__(self):
+        return self.name
+
+    name = models.CharField(max_length=50)
+    slug = models.SlugField(max_length=60, unique=True, allow_unicode=True)
+
+    class Meta:
+        verbose_name_plural = 'amenities'
+
+
+class FieldAmenity(models.Model):
+    field = models.ForeignKey(Field, on_delete=models.CASCADE)
+    amenity = models.ForeignKey(Amenity, on_delete=models.CASCADE)
+
+    class Meta:
+        # Also the index amenity filters scan: one range of field ids per amenity
+        unique_together = ('amenity', 'field')
+
 
 class FieldTimeSlot(models.Model):
     def __str__(self):
@@ -54,6 +219,11 @@ class FieldTimeSlot(models.Model):
     end_time = models.TimeField()
     is_available = models.BooleanField(default=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['field', 'is_available', 'start_time'], name='slot_field_avail_start_idx'),
+        ]
+
 
 class Review(models.Model):
     def __str__(self):
@@ -69,6 +239,16 @@ class Review(models.Model):
 
     class Meta:
         unique_together = ('user', 'field')
+        indexes = [
+            models.Index(fields=['field', '-created_at'], name='review_field_recent_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored rating so an edit can move the field's aggregates
+        instance._loaded_rating = getattr(instance, 'rating', None) if 'rating' in field_names else None
+        return instance
 
 
 class ReviewImage(models.Model):
@@ -77,5 +257,7 @@ class ReviewImage(models.Model):
 
     review = models.ForeignKey(Review, on_delete=models.CASCADE, related_name='images')
     image = models.ImageField(upload_to='review_images/')
+    # Recorded by generate_thumbnails, like Field.thumbnails
+    thumbnails = models.JSONField(null=True, blank=True, editable=False)
     caption = models.CharField(max_length=200, blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
\ No newline at end of file
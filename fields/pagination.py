@@ -0,0 +1,164 @@
+import base64
+import binascii
+import datetime
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 12
+MAX_PAGE_SIZE = 48
+
+
+class KeysetPage:
+    """One page of a keyset-paginated queryset plus the cursors around it"""
+
+    def __init__(self, items, next_cursor=None, prev_cursor=None, page_size=DEFAULT_PAGE_SIZE):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.page_size = page_size
+        self.next_query = ''
+        self.prev_query = ''
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.prev_cursor is not None
+
+
+class _CursorEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        # DjangoJSONEncoder truncates to milliseconds; keys must round-trip exactly
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(direction, values):
+    payload = json.dumps({'d': direction, 'k': values}, cls=_CursorEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return (direction, raw key values); raises ValueError on anything malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        direction, values = payload['d'], payload['k']
+    except (TypeError, KeyError, UnicodeDecodeError, json.JSONDecodeError, binascii.Error):
+        raise ValueError('Invalid cursor')
+    if direction not in ('n', 'p') or not isinstance(values, list):
+        raise ValueError('Invalid cursor')
+    return direction, values
+
+
+def parse_page_size(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(size, maximum))
+
+
+def _split_ordering(ordering):
+    return [(name.lstrip('-'), name.startswith('-')) for name in ordering]
+
+
+def _to_python(model, name, value):
+    try:
+        return model._meta.get_field(name).to_python(value)
+    except FieldDoesNotExist:
+        # Annotations (e.g. a rank expression) round-trip as plain JSON values
+        return value
+    except ValidationError:
+        raise ValueError('Invalid cursor')
+
+
+def _after(keys, values, forward):
+    """Build the row-value comparison `(k1, k2, ...) > (v1, v2, ...)` as a Q
+
+    Comparisons follow each key's sort direction, flipped when walking backwards.
+    """
+    condition = Q()
+    for i, (name, descending) in enumerate(keys):
+        lookup = 'lt' if descending == forward else 'gt'
+        branch = Q(**{f'{name}__{lookup}': values[i]})
+        for j, (prev_name, _) in enumerate(keys[:i]):
+            branch &= Q(**{prev_name: values[j]})
+        condition |= branch
+    return condition
+
+
+def paginate(queryset, ordering, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """Keyset-paginate `queryset` on `ordering`
+
+    `ordering` must end in a unique column (usually `id`/`-id`) so that every row has
+    a distinct position. Each page is a single `WHERE key > cursor ORDER BY key LIMIT n`
+    query, so page 500 costs the same as page 1.
+    """
+    keys = _split_ordering(ordering)
+    forward = True
+    values = None
+
+    if cursor:
+        try:
+            direction, raw_values = decode_cursor(cursor)
+            if len(raw_values) != len(keys):
+                raise ValueError('Invalid cursor')
+            values = [_to_python(queryset.model, name, raw) for (name, _), raw in zip(keys, raw_values)]
+            forward = direction == 'n'
+        except ValueError:
+            values = None
+            forward = True
+
+    if forward:
+        queryset = queryset.order_by(*ordering)
+    else:
+        queryset = queryset.order_by(*[('' if desc else '-') + name for name, desc in keys])
+
+    if values is not None:
+        queryset = queryset.filter(_after(keys, values, forward))
+
+    rows = list(queryset[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    if forward:
+        has_next, has_prev = has_more, values is not None
+    else:
+        rows.reverse()
+        has_next, has_prev = True, has_more
+
+    def key_of(obj):
+        return [getattr(obj, name) for name, _ in keys]
+
+    next_cursor = encode_cursor('n', key_of(rows[-1])) if rows and has_next else None
+    prev_cursor = encode_cursor('p', key_of(rows[0])) if rows and has_prev else None
+    return KeysetPage(rows, next_cursor, prev_cursor, page_size)
+
+
+def paginate_request(request, queryset, ordering, default_page_size=DEFAULT_PAGE_SIZE):
+    """Paginate from `?cursor=` / `?page_size=` and attach ready-made next/prev query strings"""
+    page_size = parse_page_size(request.GET.get('page_size'), default=default_page_size)
+    page = paginate(queryset, ordering, request.GET.get('cursor'), page_size)
+
+    params = request.GET.copy()
+    params.pop('cursor', None)
+    if page.next_cursor:
+        params['cursor'] = page.next_cursor
+        page.next_query = params.urlencode()
+    if page.prev_cursor:
+        params['cursor'] = page.prev_cursor
+        page.prev_query = params.urlencode()
+    return page
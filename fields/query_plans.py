@@ -0,0 +1,96 @@
+import re
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+
+from accounts.models import UserProfile
+from bookings.models import Booking
+from . import geo
+from .caching import field_cache
+from .models import Field, FieldTimeSlot, Review
+from .result_cache import search_results
+from .slots import DEFAULT_TIME_SLOTS
+
+# Only our own tables are held to the no-full-scan rule
+APP_TABLE_PREFIXES = ('fields_', 'bookings_', 'accounts_')
+
+# "SCAN fields_field" with no index after it is a full table scan;
+# "SCAN ... USING [COVERING] INDEX" walks an index and "VIRTUAL TABLE" is FTS5
+_SCAN_RE = re.compile(r'^SCAN (?P<table>\w+)(?: AS \w+)?$')
+
+# A private cache for the checks: clearing it between pages exposes the queries a cached
+# fragment would hide, without wiping the cache the running site shares
+ISOLATED_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'query-plan-check',
+    }
+}
+
+
+def hot_pages(field):
+    """(name, url) of every page whose queries must stay on an index"""
+    return [
+        ('home', '/'),
+        ('fields', '/fields/'),
+        ('field_detail', f'/fields/{field.id}/'),
+        ('book_field', f'/bookings/book/{field.id}/'),
+        ('my_bookings', '/bookings/my-bookings/'),
+        ('near_me', '/fields/search/?lat=23.81&lng=90.41&radius=5'),
+    ]
+
+
+def capture(client, url):
+    """The SELECTs a GET of `url` runs, as (sql, params); call under ISOLATED_CACHES"""
+    queries = []
+
+    def record(execute, sql, params, many, context):
+        if sql.lstrip().upper().startswith('SELECT'):
+            queries.append((sql, params))
+        return execute(sql, params, many, context)
+
+    field_cache.cache.clear()
+    search_results.clear()
+    with connection.execute_wrapper(record):
+        response = client.get(url)
+    if response.status_code != 200:
+        raise AssertionError(f'{url} returned {response.status_code}')
+    return queries
+
+
+def explain(sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def full_scans(plan):
+    """Our tables that `plan` reads with a full table scan"""
+    scans = []
+    for line in plan:
+        match = _SCAN_RE.match(line.strip())
+        if match and match.group('table').startswith(APP_TABLE_PREFIXES):
+            scans.append(match.group('table'))
+    return scans
+
+
+def seed_plan_data():
+    """A user and the field the hot pages are fetched for, with bookings and a review"""
+    user = User.objects.create_user(username='query-plan-check', password='x')
+    UserProfile.objects.create(user=user)
+    fields = Field.objects.bulk_create([
+        Field(owner=user, name=f'Plan field {i}', field_type='Football', location='Plan city',
+              cost_per_hour=500, availability_type='Paid', description='Plan check', capacity=10,
+              latitude=23.8 + i * 0.01, longitude=90.4, geo_cell=geo.cell_id(23.8 + i * 0.01, 90.4))
+        for i in range(20)
+    ])
+    field = fields[0]
+    slots = FieldTimeSlot.objects.bulk_create([
+        FieldTimeSlot(field=field, start_time=start, end_time=end) for start, end in DEFAULT_TIME_SLOTS
+    ])
+    for i, slot in enumerate(slots[:5]):
+        Booking.objects.create(user=user, field=field, time_slot=slot, players_count=5,
+                               booking_date=date.today() + timedelta(days=i), status='Confirmed')
+    Review.objects.create(user=user, field=field, rating=4, comment='Plan check')
+    return user, field
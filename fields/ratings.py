@@ -0,0 +1,76 @@
+from django.db.models import Case, Count, F, FloatField, Q, Sum, Value, When
+from django.db.models.functions import Cast
+
+from .models import Field
+
+STARS = range(1, 6)
+
+
+def apply_rating_change(field_id, old_rating=None, new_rating=None):
+    """Move one review's contribution on a field's aggregates in a single UPDATE
+
+    Pass only `new_rating` for a new review, only `old_rating` for a deleted one,
+    and both for an edit. Every right-hand side is evaluated against the row's
+    pre-update values, so the new average is derived from the same snapshot.
+    """
+    if old_rating == new_rating:
+        return
+
+    count_delta = (new_rating is not None) - (old_rating is not None)
+    sum_delta = (new_rating or 0) - (old_rating or 0)
+    updates = {
+        'review_count': F('review_count') + count_delta,
+        'rating_sum': F('rating_sum') + sum_delta,
+    }
+    if old_rating is not None:
+        updates[f'rating_{old_rating}_count'] = F(f'rating_{old_rating}_count') - 1
+    if new_rating is not None:
+        updates[f'rating_{new_rating}_count'] = F(f'rating_{new_rating}_count') + 1
+
+    new_count = F('review_count') + count_delta
+    updates['average_rating'] = Case(
+        When(Q(review_count=-count_delta), then=Value(None)),
+        default=Cast(F('rating_sum') + sum_delta, FloatField()) / new_count,
+        output_field=FloatField(),
+    )
+    Field.objects.filter(pk=field_id).update(**updates)
+
+
+def recompute_ratings(field_ids=None, batch_size=500, field_model=Field, review_model=None):
+    """Rebuild the aggregates from the Review table with one GROUP BY; returns fields touched"""
+    if review_model is None:
+        from .models import Review
+        review_model = Review
+
+    reviews = review_model.objects.all()
+    fields = field_model.objects.all()
+    if field_ids is not None:
+        reviews = reviews.filter(field_id__in=field_ids)
+        fields = fields.filter(pk__in=field_ids)
+
+    star_counts = {f'rating_{stars}_count': Count('id', filter=Q(rating=stars)) for stars in STARS}
+    totals = {
+        row['field_id']: row
+        for row in reviews.values('field_id').annotate(
+            review_count=Count('id'), rating_sum=Sum('rating'), **star_counts
+        ).order_by()
+    }
+
+    columns = ['review_count', 'rating_sum', 'average_rating'] + list(star_counts)
+    empty = dict.fromkeys(['review_count', 'rating_sum'] + list(star_counts), 0)
+    touched = 0
+    batch = []
+    for field in fields.only('id').iterator(chunk_size=batch_size):
+        row = totals.get(field.id, empty)
+        for column in empty:
+            setattr(field, column, row[column] or 0)
+        field.average_rating = field.rating_sum / field.review_count if field.review_count else None
+        batch.append(field)
+        if len(batch) >= batch_size:
+            field_model.objects.bulk_update(batch, columns)
+            touched += len(batch)
+            batch = []
+    if batch:
+        field_model.objects.bulk_update(batch, columns)
+        touched += len(batch)
+    return touched
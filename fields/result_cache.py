@@ -0,0 +1,103 @@
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from django.conf import settings
+
+# Budget charged per entry on top of its ids, for the facet counts and bookkeeping
+ENTRY_OVERHEAD_IDS = 256
+
+
+@dataclass
+class SearchResult:
+    """What one advanced search resolves to, minus the cards themselves"""
+    ids: array
+    facets: dict
+    distances: array = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def weight(self):
+        return len(self.ids) + ENTRY_OVERHEAD_IDS
+
+    def distance_of(self, index):
+        return self.distances[index] if self.distances is not None else None
+
+
+class SearchResultCache:
+    """In-process LRU of search results, keyed by a canonical filter tuple
+
+    Ids are kept as C arrays (8 bytes each), and the budget counts ids plus a fixed
+    overhead per entry rather than entries, so one huge result can't pin hundreds of
+    megabytes and thousands of empty ones still add up. Entries expire after a short
+    TTL: the key carries the listing version, which field edits move, but bookings and
+    reviews also change results (availability, rating) without it.
+    """
+
+    def __init__(self, timeout=None, max_ids=None):
+        self._timeout = timeout
+        self._max_ids = max_ids
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def timeout(self):
+        return self._timeout if self._timeout is not None else getattr(settings, 'SEARCH_RESULT_CACHE_TIMEOUT', 30)
+
+    @property
+    def max_ids(self):
+        return self._max_ids if self._max_ids is not None else getattr(settings, 'SEARCH_RESULT_CACHE_MAX_IDS', 500000)
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                self._discard(key)
+            self.misses += 1
+            return None
+
+    def set(self, key, result):
+        if result.weight > self.max_ids:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._discard(key)
+            self._entries[key] = (time.monotonic() + self.timeout, result)
+            self._size += result.weight
+            while self._size > self.max_ids:
+                self._discard(next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _discard(self, key):
+        _, result = self._entries.pop(key)
+        self._size -= result.weight
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'weight': self._size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / total, 4) if total else None,
+            }
+
+
+search_results = SearchResultCache()
@@ -0,0 +1,119 @@
+import re
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'fields_field_fts'
+FTS_COLUMNS = ('name', 'location', 'field_type', 'description')
+
+# bm25 column weights, in FTS_COLUMNS order: a hit in the name beats one in the description
+FTS_WEIGHTS = (10.0, 5.0, 3.0, 1.0)
+
+# Lower bm25 is a better match, id breaks ties so keyset cursors stay stable
+SEARCH_ORDER = ('search_rank', 'id')
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def fts_available():
+    return connection.vendor == 'sqlite'
+
+
+def build_match_expression(query):
+    """Turn free text into an FTS5 query: every word must match, each as a prefix
+
+    Quoting each token keeps user input from being parsed as FTS5 syntax
+    (AND/OR/NEAR, column filters, stray quotes).
+    """
+    tokens = _TOKEN_RE.findall(query.lower())
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def search_fields_queryset(queryset, query):
+    """Restrict a Field queryset to rows matching `query`, annotated with `search_rank`"""
+    if not fts_available():
+        return queryset.filter(
+            Q(name__icontains=query) |
+            Q(location__icontains=query) |
+            Q(field_type__icontains=query) |
+            Q(description__icontains=query)
+        ).annotate(search_rank=RawSQL('0', ()))
+
+    match = build_match_expression(query)
+    if not match:
+        # Still annotated, so callers can order and paginate on search_rank
+        return queryset.none().annotate(search_rank=RawSQL('0', ()))
+
+    table = queryset.model._meta.db_table
+    weights = ', '.join(str(w) for w in FTS_WEIGHTS)
+    return queryset.extra(
+        tables=[FTS_TABLE],
+        where=[f'{FTS_TABLE}.rowid = {table}.id', f'{FTS_TABLE} MATCH %s'],
+        params=[match],
+    ).annotate(search_rank=RawSQL(f'bm25({FTS_TABLE}, {weights})', ()))
+
+
+def _row_values(field):
+    return [field.id] + [getattr(field, column) or '' for column in FTS_COLUMNS]
+
+
+def index_field(field):
+    if not fts_available():
+        return
+    placeholders = ', '.join(['%s'] * (len(FTS_COLUMNS) + 1))
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [field.id])
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, {", ".join(FTS_COLUMNS)}) VALUES ({placeholders})',
+            _row_values(field),
+        )
+
+
+def index_new_fields(fields):
+    """Index fields inserted without signals (bulk_create) in one executemany"""
+    if not fts_available() or not fields:
+        return
+    placeholders = ', '.join(['%s'] * (len(FTS_COLUMNS) + 1))
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, {", ".join(FTS_COLUMNS)}) VALUES ({placeholders})',
+            [_row_values(field) for field in fields],
+        )
+
+
+def unindex_field(field_id):
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [field_id])
+
+
+def rebuild_index(batch_size=1000):
+    """Repopulate the whole index from the Field table; returns the number of rows indexed"""
+    from .models import Field
+
+    if not fts_available():
+        return 0
+
+    placeholders = ', '.join(['%s'] * (len(FTS_COLUMNS) + 1))
+    insert_sql = f'INSERT INTO {FTS_TABLE} (rowid, {", ".join(FTS_COLUMNS)}) VALUES ({placeholders})'
+    total = 0
+    rows = Field.objects.only('id', *FTS_COLUMNS).order_by('id').iterator(chunk_size=batch_size)
+
+    # One transaction: searches keep seeing the old index until the new one is complete,
+    # and a crash part way leaves the old one in place
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        batch = []
+        for field in rows:
+            batch.append(_row_values(field))
+            if len(batch) >= batch_size:
+                cursor.executemany(insert_sql, batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(insert_sql, batch)
+            total += len(batch)
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+    return total
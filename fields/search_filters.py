@@ -0,0 +1,142 @@
+from array import array
+from datetime import date, datetime, time
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import F
+
+from bookings.availability import filter_available_fields
+from . import geo
+from .amenities import MATCH_ALL, MATCH_ANY, filter_by_amenities, parse_amenity_filter
+from .caching import field_cache
+from .facets import apply_facets, facet_counts, parse_facets
+from .models import Field
+from .result_cache import SearchResult, search_results
+
+# Every order ends in id so equal keys keep a stable position across pages
+SORT_ORDERS = {
+    'name': ('name', 'id'),
+    'price_low': ('cost_per_hour', 'id'),
+    'price_high': ('-cost_per_hour', 'id'),
+    'rating': (F('average_rating').desc(nulls_last=True), '-review_count', 'id'),
+    'newest': ('-created_at', '-id'),
+    'distance': ('distance_km', 'id'),
+}
+
+# Coordinates are rounded (~11 m) before they are used, so nearby visitors share entries
+POINT_DECIMALS = 4
+
+
+def _decimal(value):
+    try:
+        number = Decimal(value)
+    except (TypeError, ValueError, InvalidOperation):
+        return None
+    return number.normalize() if number.is_finite() else None
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def normalize_filters(params):
+    """Canonical advanced-search filters from request parameters, as a hashable tuple
+
+    Two requests that would run the same query produce the same tuple: blank and
+    invalid values are dropped (the view ignores them anyway), text is trimmed,
+    numbers are parsed and amenities are reduced to sorted slugs. Sorting the items
+    makes parameter order irrelevant.
+    """
+    filters = {}
+    location = ' '.join(params.get('location', '').split())
+    if location:
+        # icontains folds ASCII case only, so only ASCII text may be folded here
+        filters['location'] = location.lower() if location.isascii() else location
+    for name in ('min_price', 'max_price'):
+        value = _decimal(params.get(name))
+        if value is not None:
+            filters[name] = format(value, 'f')
+    capacity = _int(params.get('capacity'))
+    if capacity is not None:
+        filters['capacity'] = capacity
+
+    amenities = parse_amenity_filter(params.getlist('amenity'), params.get('amenities', ''))
+    if amenities:
+        filters['amenities'] = tuple(amenities)
+        filters['amenity_match'] = MATCH_ANY if params.get('amenity_match') == MATCH_ANY else MATCH_ALL
+
+    try:
+        check_date = datetime.strptime(params.get('available_date', ''), '%Y-%m-%d').date()
+        check_time = datetime.strptime(params.get('available_time', ''), '%H:%M').time()
+    except ValueError:
+        pass
+    else:
+        filters['available_at'] = (check_date.isoformat(), check_time.isoformat())
+
+    point = geo.parse_point(params.get('lat'), params.get('lng'))
+    if point:
+        filters['near'] = tuple(round(part, POINT_DECIMALS) for part in point)
+        filters['radius'] = geo.parse_radius(params.get('radius'))
+
+    for facet, value in parse_facets(params).items():
+        filters[f'facet:{facet}'] = value
+
+    sort_by = params.get('sort_by') or ('distance' if point else 'name')
+    if sort_by not in SORT_ORDERS or (sort_by == 'distance' and not point):
+        sort_by = 'name'
+    filters['sort_by'] = sort_by
+    return tuple(sorted(filters.items()))
+
+
+def filtered_fields(filters):
+    """(queryset, facet selections) for canonical filters; the facet filters are left to the caller"""
+    filters = dict(filters)
+    queryset = Field.objects.filter(is_active=True)
+    if 'near' in filters:
+        queryset = queryset.near(*filters['near'], filters['radius'])
+    if 'location' in filters:
+        queryset = queryset.filter(location__icontains=filters['location'])
+    if 'min_price' in filters:
+        queryset = queryset.filter(cost_per_hour__gte=Decimal(filters['min_price']))
+    if 'max_price' in filters:
+        queryset = queryset.filter(cost_per_hour__lte=Decimal(filters['max_price']))
+    if 'amenities' in filters:
+        queryset = filter_by_amenities(queryset, filters['amenities'], filters['amenity_match'],
+                                       per_row='near' in filters)
+    if 'capacity' in filters:
+        queryset = queryset.filter(capacity__gte=filters['capacity'])
+    if 'available_at' in filters:
+        check_date, check_time = filters['available_at']
+        queryset = filter_available_fields(queryset, date.fromisoformat(check_date), time.fromisoformat(check_time))
+
+    selected = {name.split(':', 1)[1]: value for name, value in filters.items() if name.startswith('facet:')}
+    return queryset, selected
+
+
+def run_search(filters):
+    """Resolve canonical filters to ordered result ids (and distances) plus facet counts"""
+    filters = dict(filters)
+    queryset, selected = filtered_fields(filters)
+    # Facet counts are taken before the facet filters so each one can show its alternatives
+    facets = facet_counts(queryset, selected)
+    queryset = apply_facets(queryset, selected).order_by(*SORT_ORDERS[filters['sort_by']])
+
+    if 'near' in filters:
+        ids, distances = array('q'), array('d')
+        for field_id, distance in queryset.values_list('id', 'distance_km').iterator():
+            ids.append(field_id)
+            distances.append(distance)
+        return SearchResult(ids, facets, distances)
+    return SearchResult(array('q', queryset.values_list('id', flat=True).iterator()), facets)
+
+
+def cached_search(filters):
+    """run_search through the result cache; field edits start a new generation of keys"""
+    key = (field_cache.version(field_cache.ALL_FIELDS, 'listing'), filters)
+    result = search_results.get(key)
+    if result is None:
+        result = run_search(filters)
+        search_results.set(key, result)
+    return result
@@ -0,0 +1,334 @@
+import itertools
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image
+
+from accounts.models import UserProfile
+from bookings.models import Booking, JoinRequest, Payment, SlotOccupancy, TeamFormation
+from . import geo
+from .amenities import rebuild_amenity_tags
+from .models import Field, FieldTimeSlot, Review, ReviewImage
+from .ratings import recompute_ratings
+from .search import rebuild_index
+from .slots import DEFAULT_TIME_SLOTS
+
+SEED_USERNAME_PREFIX = 'seed-user-'
+
+# Rough centre of each area; seeded fields are scattered a few km around it
+LOCATION_COORDINATES = {
+    'Mirpur': (23.8223, 90.3654), 'Dhanmondi': (23.7461, 90.3742), 'Gulshan': (23.7925, 90.4078),
+    'Banani': (23.7937, 90.4066), 'Uttara': (23.8759, 90.3795), 'Mohammadpur': (23.7662, 90.3589),
+    'Motijheel': (23.7330, 90.4172), 'Bashundhara': (23.8193, 90.4526), 'Mymensingh': (24.7471, 90.4203),
+    'Chattogram': (22.3569, 91.7832), 'Sylhet': (24.8949, 91.8687), 'Rajshahi': (24.3745, 88.6042),
+    'Khulna': (22.8456, 89.5403), 'Barishal': (22.7010, 90.3535),
+}
+LOCATIONS = list(LOCATION_COORDINATES)
+LOCATION_SPREAD_DEGREES = 0.04
+NAME_WORDS = ['Turf', 'Arena', 'Ground', 'Club', 'Park', 'Stadium', 'Court', 'Field', 'Dome', 'Kickoff']
+AMENITIES = ['Parking', 'Floodlights', 'Changing rooms', 'Showers', 'Cafeteria', 'Drinking water',
+             'First aid', 'Seating', 'Wi-Fi', 'Lockers']
+PAYMENT_METHODS = [method for method, _ in Payment.PAYMENT_METHODS]
+# Review photos are small plain JPEGs, so pages that open or resize them work on seeded data
+SEED_IMAGE_SIZE = (160, 120)
+SEED_IMAGE_COLOURS = ['#2e7d32', '#1565c0', '#f9a825', '#6d4c41', '#c62828', '#546e7a']
+
+
+class Seeder:
+    """Bulk-inserts a synthetic but realistic dataset in streamed batches
+
+    Everything is drawn from one `random.Random(seed)`, so two runs with the same
+    arguments against the same starting database produce the same rows. Rows are
+    generated lazily and flushed every `batch_size`, and bookings and reviews are
+    produced one field at a time, so memory stays flat however many rows are asked for.
+
+    `skew` shapes popularity: field i (in creation order) gets weight 1 / (i + 1) ** skew,
+    so 0 spreads bookings and reviews evenly and ~1 gives a Zipf-like long tail.
+
+    bulk_create skips model signals, so the denormalized tables (slot occupancy,
+    rating aggregates, search index) are filled in directly.
+    """
+
+    def __init__(self, users=1000, fields=2000, bookings=200000, reviews=20000, days=60, skew=0.8,
+                 owner_ratio=0.1, review_image_ratio=0.3, team_ratio=0.1, max_join_requests=3,
+                 seed=0, batch_size=5000, stdout=None):
+        self.counts = {'users': users, 'fields': fields, 'bookings': bookings, 'reviews': reviews}
+        self.days = days
+        self.skew = skew
+        self.owner_ratio = owner_ratio
+        self.review_image_ratio = review_image_ratio
+        self.team_ratio = team_ratio
+        self.max_join_requests = max_join_requests
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.stdout = stdout
+        self.paid_field_ids = set()
+        self._image_bytes = {}
+        self.created = dict.fromkeys(
+            ['users', 'profiles', 'fields', 'slots', 'bookings', 'payments', 'teams', 'join_requests', 'reviews',
+             'review_images', 'occupancy'], 0)
+
+    def log(self, message):
+        if self.stdout is not None:
+            self.stdout.write(message)
+
+    def run(self):
+        with transaction.atomic():
+            user_ids = self.seed_users()
+            field_ids = self.seed_fields(user_ids)
+            weights = self._popularity(len(field_ids))
+            self.seed_bookings(user_ids, field_ids, weights)
+            self.seed_reviews(user_ids, field_ids, weights)
+            self.log('Refreshing rating aggregates, search index and amenity tags...')
+            recompute_ratings()
+            rebuild_index()
+            rebuild_amenity_tags()
+        return self.created
+
+    def _popularity(self, n):
+        weights = [1 / (i + 1) ** self.skew for i in range(n)]
+        total = sum(weights)
+        return [w / total for w in weights]
+
+    def _flush(self, model, rows, key, returning=False):
+        """bulk_create `rows` in batches; yields the created objects when `returning`"""
+        iterator = iter(rows)
+        while True:
+            batch = list(itertools.islice(iterator, self.batch_size))
+            if not batch:
+                return
+            created = model.objects.bulk_create(batch)
+            self.created[key] += len(created)
+            if returning:
+                yield from created
+
+    def _save(self, model, rows, key):
+        for _ in self._flush(model, rows, key):
+            pass
+
+    def _allocate(self, total, share):
+        """Deterministically round an expected count to an integer"""
+        expected = total * share
+        count = int(expected)
+        return count + (1 if self.rng.random() < expected - count else 0)
+
+    def seed_users(self):
+        rng = self.rng
+        password = make_password('password123')
+        start = User.objects.filter(username__startswith=SEED_USERNAME_PREFIX).count()
+        users = (
+            User(username=f'{SEED_USERNAME_PREFIX}{start + i}', email=f'seed{start + i}@example.com',
+                 password=password, first_name='Seed', last_name=str(start + i))
+            for i in range(self.counts['users'])
+        )
+        user_ids = [user.id for user in self._flush(User, users, 'users', returning=True)]
+
+        owners = max(1, int(len(user_ids) * self.owner_ratio))
+        profiles = (
+            UserProfile(user_id=user_id, age=rng.randint(16, 50), gender=rng.choice(['Male', 'Female']),
+                        mobile=f'01{rng.randint(300000000, 999999999)}', is_field_owner=i < owners)
+            for i, user_id in enumerate(user_ids)
+        )
+        self._save(UserProfile, profiles, 'profiles')
+        self.log(f'Created {len(user_ids)} users ({owners} field owners)')
+        return user_ids
+
+    def seed_fields(self, user_ids):
+        rng = self.rng
+        owners = user_ids[:max(1, int(len(user_ids) * self.owner_ratio))]
+        now = timezone.now()
+
+        def build():
+            for i in range(self.counts['fields']):
+                paid = rng.random() < 0.7
+                area = rng.choice(LOCATIONS)
+                area_lat, area_lng = LOCATION_COORDINATES[area]
+                latitude = round(area_lat + rng.uniform(-LOCATION_SPREAD_DEGREES, LOCATION_SPREAD_DEGREES), 6)
+                longitude = round(area_lng + rng.uniform(-LOCATION_SPREAD_DEGREES, LOCATION_SPREAD_DEGREES), 6)
+                yield Field(
+                    owner_id=rng.choice(owners),
+                    name=f'{area} {rng.choice(NAME_WORDS)} {i}',
+                    field_type=rng.choice(Field.FIELD_TYPES)[0],
+                    location=f'Road {rng.randint(1, 120)}, {area}',
+                    latitude=latitude,
+                    longitude=longitude,
+                    geo_cell=geo.cell_id(latitude, longitude),
+                    cost_per_hour=Decimal(rng.randrange(500, 5000, 50)) if paid else Decimal('0.00'),
+                    availability_type='Paid' if paid else 'Free',
+                    description=' '.join(rng.choice(NAME_WORDS + AMENITIES).lower() for _ in range(60)),
+                    is_women_only=rng.random() < 0.1,
+                    capacity=rng.choice([10, 14, 22, 30]),
+                    amenities=', '.join(rng.sample(AMENITIES, rng.randint(0, 5))),
+                    is_active=rng.random() < 0.95,
+                )
+
+        field_ids = []
+        for field in self._flush(Field, build(), 'fields', returning=True):
+            field_ids.append(field.id)
+            if field.availability_type == 'Paid':
+                self.paid_field_ids.add(field.id)
+
+        # auto_now_add overrides created_at on insert; spread it back out for realistic ordering
+        for start in range(0, len(field_ids), self.batch_size):
+            Field.objects.bulk_update(
+                [Field(id=field_id, created_at=now - timedelta(minutes=start + i))
+                 for i, field_id in enumerate(field_ids[start:start + self.batch_size])],
+                ['created_at'],
+            )
+
+        slots = (
+            FieldTimeSlot(field_id=field_id, start_time=start, end_time=end)
+            for field_id in field_ids
+            for start, end in DEFAULT_TIME_SLOTS
+        )
+        self._save(FieldTimeSlot, slots, 'slots')
+        self.log(f"Created {len(field_ids)} fields with {self.created['slots']} time slots")
+        return field_ids
+
+    def _field_slots(self, field_ids):
+        """Yield (field_id, [slot ids in id order]) streaming through the slot table"""
+        rows = (
+            FieldTimeSlot.objects.filter(field_id__gte=field_ids[0], field_id__lte=field_ids[-1])
+            .order_by('field_id', 'id').values_list('field_id', 'id').iterator(chunk_size=self.batch_size)
+        )
+        for field_id, group in itertools.groupby(rows, key=lambda row: row[0]):
+            yield field_id, [slot_id for _, slot_id in group]
+
+    def seed_bookings(self, user_ids, field_ids, weights):
+        rng = self.rng
+        today = date.today()
+        hold_until = timezone.now() + timedelta(minutes=settings.BOOKING_HOLD_MINUTES)
+        day_offsets = range(-self.days, self.days + 1)
+        per_day_share = 1 / len(day_offsets)
+        occupancy = []
+        payable = []
+        teams = []
+        next_report = self.batch_size * 20
+
+        def build():
+            for (field_id, slots), weight in zip(self._field_slots(field_ids), weights):
+                for offset in day_offsets:
+                    count = self._allocate(self.counts['bookings'], weight * per_day_share)
+                    if not count:
+                        continue
+                    booking_date = today + timedelta(days=offset)
+                    # Distinct slots for the bookings that hold one; overflow is cancelled
+                    active_slots = rng.sample(range(len(slots)), min(count, len(slots)))
+                    mask = 0
+                    held = False
+                    for n in range(count):
+                        if n < len(active_slots):
+                            slot_index = active_slots[n]
+                            if booking_date < today:
+                                status = rng.choices(['Completed', 'Cancelled'], weights=[85, 15])[0]
+                            else:
+                                status = rng.choices(['Confirmed', 'Pending', 'Cancelled'], weights=[75, 10, 15])[0]
+                        else:
+                            slot_index = rng.randrange(len(slots))
+                            status = 'Cancelled'
+                        if status in ('Confirmed', 'Pending'):
+                            mask |= 1 << slot_index
+                            held = held or status == 'Pending'
+                        yield Booking(
+                            user_id=rng.choice(user_ids), field_id=field_id, time_slot_id=slots[slot_index],
+                            booking_date=booking_date, players_count=rng.randint(2, 22), status=status,
+                            hold_expires_at=hold_until if status == 'Pending' else None,
+                        )
+                    if mask:
+                        occupancy.append(SlotOccupancy(field_id=field_id, date=booking_date, booked_mask=mask,
+                                                       hold_expires_at=hold_until if held else None))
+
+        for booking in self._flush(Booking, build(), 'bookings', returning=True):
+            if booking.field_id in self.paid_field_ids and booking.status in ('Confirmed', 'Completed'):
+                payable.append(booking.id)
+            if booking.status == 'Confirmed' and rng.random() < self.team_ratio:
+                teams.append(booking.id)
+            if len(payable) >= self.batch_size:
+                self._seed_payments(payable)
+                payable.clear()
+            if len(teams) >= self.batch_size:
+                self._seed_teams(teams, user_ids)
+                teams.clear()
+            if len(occupancy) >= self.batch_size:
+                self._save(SlotOccupancy, occupancy, 'occupancy')
+                occupancy.clear()
+            if self.created['bookings'] >= next_report:
+                self.log(f"  {self.created['bookings']} bookings")
+                next_report += self.batch_size * 20
+        self._seed_payments(payable)
+        self._seed_teams(teams, user_ids)
+        self._save(SlotOccupancy, occupancy, 'occupancy')
+        self.log(f"Created {self.created['bookings']} bookings, {self.created['payments']} payments, "
+                 f"{self.created['teams']} teams, {self.created['join_requests']} join requests")
+
+    def _seed_payments(self, booking_ids):
+        rng = self.rng
+        payments = (
+            Payment(booking_id=booking_id, payment_method=rng.choice(PAYMENT_METHODS),
+                    mobile_number=f'01{rng.randint(300000000, 999999999)}',
+                    transaction_id=f'SEED{booking_id:012d}', amount=Decimal(rng.randrange(750, 7500, 75)),
+                    status='Completed')
+            for booking_id in booking_ids
+        )
+        self._save(Payment, payments, 'payments')
+
+    def _seed_teams(self, booking_ids, user_ids):
+        rng = self.rng
+        teams = (
+            TeamFormation(booking_id=booking_id, looking_for_players=True, required_players=rng.randint(1, 6),
+                          skill_level=rng.choice(TeamFormation.SKILL_LEVELS)[0],
+                          description='Looking for a few more players')
+            for booking_id in booking_ids
+        )
+        requests = (
+            JoinRequest(team_formation_id=team.id, user_id=user_id, message='Count me in!',
+                        status=rng.choices(['Pending', 'Accepted', 'Rejected'], weights=[60, 30, 10])[0])
+            for team in self._flush(TeamFormation, teams, 'teams', returning=True)
+            for user_id in rng.sample(user_ids, min(len(user_ids), rng.randint(0, self.max_join_requests)))
+        )
+        self._save(JoinRequest, requests, 'join_requests')
+
+    def seed_reviews(self, user_ids, field_ids, weights):
+        rng = self.rng
+        image_ratio = self.review_image_ratio
+
+        def build():
+            for field_id, weight in zip(field_ids, weights):
+                count = min(len(user_ids), self._allocate(self.counts['reviews'], weight))
+                for user_id in rng.sample(user_ids, count):
+                    yield Review(
+                        user_id=user_id, field_id=field_id,
+                        rating=rng.choices([1, 2, 3, 4, 5], weights=[5, 7, 15, 35, 38])[0],
+                        experience_title=f'{rng.choice(["Great", "Decent", "Okay", "Superb"])} game',
+                        comment=' '.join(rng.choice(NAME_WORDS + AMENITIES).lower() for _ in range(30)),
+                    )
+
+        def images(reviews):
+            for review in reviews:
+                if rng.random() < image_ratio:
+                    for n in range(rng.randint(1, 3)):
+                        name = self._write_image(f'review_images/seed-{review.id}-{n}.jpg',
+                                                 rng.choice(SEED_IMAGE_COLOURS))
+                        yield ReviewImage(review_id=review.id, caption=f'Photo {n + 1}', image=name)
+
+        self._save(ReviewImage, images(self._flush(Review, build(), 'reviews', returning=True)), 'review_images')
+        self.log(f"Created {self.created['reviews']} reviews with {self.created['review_images']} images")
+
+    def _write_image(self, name, colour):
+        """Store a small JPEG at `name` unless a file is already there; returns the name"""
+        if default_storage.exists(name):
+            return name
+        if colour not in self._image_bytes:
+            buffer = BytesIO()
+            Image.new('RGB', SEED_IMAGE_SIZE, colour).save(buffer, 'JPEG', quality=70)
+            self._image_bytes[colour] = buffer.getvalue()
+        return default_storage.save(name, ContentFile(self._image_bytes[colour]))
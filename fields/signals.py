@@ -0,0 +1,77 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .amenities import sync_field_amenities
+from .caching import field_cache
+from .models import Field, FieldTimeSlot, Review, ReviewImage
+from .ratings import apply_rating_change
+from .search import index_field, unindex_field
+from .tasks import queue_thumbnails
+
+
+@receiver(post_save, sender=Field)
+def update_search_index(sender, instance, **kwargs):
+    index_field(instance)
+
+
+@receiver(post_save, sender=Field)
+def update_amenity_tags(sender, instance, created, **kwargs):
+    if created or instance.amenities != getattr(instance, '_loaded_amenities', None):
+        sync_field_amenities(instance)
+        instance._loaded_amenities = instance.amenities
+
+
+@receiver(post_delete, sender=Field)
+def remove_from_search_index(sender, instance, **kwargs):
+    unindex_field(instance.id)
+
+
+@receiver(post_save, sender=Review)
+def add_review_to_ratings(sender, instance, created, **kwargs):
+    old_rating = None if created else getattr(instance, '_loaded_rating', None)
+    apply_rating_change(instance.field_id, old_rating, instance.rating)
+    instance._loaded_rating = instance.rating
+
+
+@receiver(post_delete, sender=Review)
+def remove_review_from_ratings(sender, instance, **kwargs):
+    apply_rating_change(instance.field_id, getattr(instance, '_loaded_rating', instance.rating), None)
+
+
+@receiver(post_save, sender=Field)
+@receiver(post_delete, sender=Field)
+def invalidate_field_cards(sender, instance, **kwargs):
+    field_cache.bump_on_commit(instance.pk, 'page', 'card')
+    field_cache.bump_on_commit(field_cache.ALL_FIELDS, 'listing')
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_field_cards_for_rating(sender, instance, **kwargs):
+    # Search cards show the average rating, and listing facets and search results group by it
+    field_cache.bump_on_commit(instance.field_id, 'page', 'card')
+    field_cache.bump_on_commit(field_cache.ALL_FIELDS, 'listing')
+
+
+@receiver(post_save, sender=FieldTimeSlot)
+@receiver(post_delete, sender=FieldTimeSlot)
+def invalidate_field_cache(sender, instance, **kwargs):
+    field_cache.bump_on_commit(instance.field_id)
+
+
+@receiver(post_save, sender=ReviewImage)
+@receiver(post_delete, sender=ReviewImage)
+def invalidate_field_cache_for_review_image(sender, instance, **kwargs):
+    field_id = Review.objects.filter(pk=instance.review_id).values_list('field_id', flat=True).first()
+    if field_id is not None:
+        field_cache.bump_on_commit(field_id)
+
+
+@receiver(post_save, sender=Field)
+def make_field_thumbnails(sender, instance, **kwargs):
+    queue_thumbnails(instance.image)
+
+
+@receiver(post_save, sender=ReviewImage)
+def make_review_image_thumbnails(sender, instance, **kwargs):
+    queue_thumbnails(instance.image)
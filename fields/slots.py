@@ -0,0 +1,33 @@
+from datetime import time
+
+from .caching import field_cache
+from .models import FieldTimeSlot
+
+# The slots every new field starts with: 90-minute sessions from 6:00 to 22:30
+DEFAULT_TIME_SLOTS = [
+    (time(6, 0), time(7, 30)),
+    (time(7, 30), time(9, 0)),
+    (time(9, 0), time(10, 30)),
+    (time(10, 30), time(12, 0)),
+    (time(12, 0), time(13, 30)),
+    (time(13, 30), time(15, 0)),
+    (time(15, 0), time(16, 30)),
+    (time(16, 30), time(18, 0)),
+    (time(18, 0), time(19, 30)),
+    (time(19, 30), time(21, 0)),
+    (time(21, 0), time(22, 30)),
+]
+
+
+def default_time_slots(field_id):
+    return [
+        FieldTimeSlot(field_id=field_id, start_time=start_time, end_time=end_time, is_available=True)
+        for start_time, end_time in DEFAULT_TIME_SLOTS
+    ]
+
+
+def create_default_time_slots(field):
+    # One INSERT. bulk_create skips the slot signals: a new field has no bookings to re-map,
+    # but its page may already be cached without slots
+    FieldTimeSlot.objects.bulk_create(default_time_slots(field.id))
+    field_cache.bump_on_commit(field.id)
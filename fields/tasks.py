@@ -0,0 +1,50 @@
+from django.apps import apps
+
+from jobs.queue import task
+from .caching import field_cache
+from .models import Field, Review
+from .thumbnails import generate_derivatives, recorded_widths, thumbnail_record
+
+# Models whose image gets thumbnails, by label, and the ImageField holding it
+THUMBNAIL_SOURCES = {
+    'fields.Field': 'image',
+    'fields.ReviewImage': 'image',
+    'accounts.UserProfile': 'profile_picture',
+}
+
+
+@task
+def generate_thumbnails(name, model=None, pk=None):
+    widths, _ = generate_derivatives(name)
+    if model is not None:
+        record_thumbnails(model, pk, name, widths)
+
+
+@task
+def purge_field(field_id):
+    # Cascades to slots, bookings, payments, teams and reviews; the view already hid the field
+    Field.objects.filter(pk=field_id).delete()
+
+
+def queue_thumbnails(file):
+    """Have a worker make thumbnails for a just-saved ImageField value, unless that's been done"""
+    if file and recorded_widths(file) is None:
+        generate_thumbnails.enqueue(name=file.name, model=file.instance._meta.label, pk=file.instance.pk)
+
+
+def record_thumbnails(model, pk, name, widths):
+    """Store the thumbnail widths of image `name` on its row, unless the image was replaced meanwhile"""
+    column = THUMBNAIL_SOURCES[model]
+    # update() skips post_save, which would queue the same image again
+    recorded = apps.get_model(model).objects.filter(pk=pk, **{column: name}).update(
+        thumbnails=thumbnail_record(name, widths))
+    if not (recorded and widths):
+        return bool(recorded)
+    # Renders cached before now were built with an empty srcset
+    if model == 'fields.Field':
+        field_cache.bump_on_commit(pk, 'page', 'card')
+    elif model == 'fields.ReviewImage':
+        field_id = Review.objects.filter(images__pk=pk).values_list('field_id', flat=True).first()
+        if field_id is not None:
+            field_cache.bump_on_commit(field_id)
+    return True
@@ -0,0 +1,11 @@
+from django import template
+
+from fields.thumbnails import srcset as build_srcset
+
+register = template.Library()
+
+
+@register.filter
+def srcset(file, fmt='jpeg'):
+    """`{{ field.image|srcset }}` / `{{ field.image|srcset:'webp' }}`: derivative URLs with their widths"""
+    return build_srcset(file, fmt)
@@ -0,0 +1,63 @@
+import json
+import shutil
+import tempfile
+
+from django.test import Client, TestCase, override_settings
+
+from .benchmarking import TEST_BASELINE, TEST_BASELINE_SEED, benchmark_urls, compare, measure, pick_sample
+from .query_plans import ISOLATED_CACHES, capture, explain, full_scans, hot_pages, seed_plan_data
+from .seeding import Seeder
+
+
+@override_settings(CACHES=ISOLATED_CACHES)
+class QueryPlanTests(TestCase):
+    """The check_query_plans command, as a test: hot pages never fall back to a table scan"""
+
+    def test_hot_pages_use_an_index(self):
+        user, field = seed_plan_data()
+        self.client.force_login(user)
+        for name, url in hot_pages(field):
+            for sql, params in capture(self.client, url):
+                plan = explain(sql, params)
+                with self.subTest(page=name, sql=sql):
+                    self.assertEqual(full_scans(plan), [], '\n'.join(plan))
+
+
+@override_settings(CACHES=ISOLATED_CACHES)
+class ViewBenchmarkTests(TestCase):
+    """The benchmark_views command on the small seeded dataset its test baseline was taken from
+
+    Latency depends on the machine, so only query counts and response sizes are held to the
+    baseline here; benchmark_views checks all three.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.media = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.media.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.media.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_views_match_the_baseline(self):
+        baseline = json.loads(TEST_BASELINE.read_text())
+        Seeder(**TEST_BASELINE_SEED).run()
+        user, sample = pick_sample()
+        client = Client()
+        client.force_login(user)
+
+        results = {}
+        for name, url, skipped in benchmark_urls(sample):
+            if skipped:
+                continue
+            results[name] = measure(client, user, url, runs=1, warmup=1)
+            with self.subTest(url=name):
+                self.assertLess(results[name]['status'], 500)
+        # A path warning means the seeded rows no longer match the ones the baseline saw
+        regressions, warnings = compare(baseline, results, latency_tolerance=None)
+        self.assertEqual(warnings + regressions, [])
@@ -0,0 +1,127 @@
+import logging
+import posixpath
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THUMBNAIL_WIDTHS = (200, 400, 800)
+ORIENTATION_TAG = 0x0112
+
+# Pillow format name, file extension, save options
+DERIVATIVE_FORMATS = {
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def thumbnail_widths():
+    return tuple(sorted(getattr(settings, 'THUMBNAIL_WIDTHS', DEFAULT_THUMBNAIL_WIDTHS)))
+
+
+def derivative_name(name, width, fmt):
+    """`fields/turf.jpg` -> `fields/turf.400w.webp`, next to the original"""
+    root, _ = posixpath.splitext(name)
+    return f'{root}.{width}w.{DERIVATIVE_FORMATS[fmt][1]}'
+
+
+def _display_width(image):
+    # EXIF orientations 5-8 are rotated a quarter turn, so the stored height is what is shown
+    if image.getexif().get(ORIENTATION_TAG) in (5, 6, 7, 8):
+        return image.height
+    return image.width
+
+
+def _prepare_for_resize(image):
+    largest = max(thumbnail_widths())
+    image.draft('RGB', (largest, largest))  # JPEGs decode at a reduced scale when that is still big enough
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'L'):
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.convert('RGBA').getchannel('A'))
+        image = background
+    return image.convert('RGB')
+
+
+def generate_derivatives(name, storage=None, overwrite=False):
+    """Write WebP and JPEG copies of image `name` at every configured width below its own
+
+    Returns (widths, written): the widths `name` now has derivatives at, and the names
+    written. Only the header is read when every derivative already exists. Unreadable or
+    missing files are logged and skipped, with no widths, so a bad upload never fails the
+    request that saved it.
+    """
+    storage = storage or default_storage
+    if not name:
+        return [], []
+    try:
+        with storage.open(name, 'rb') as original:
+            image = Image.open(original)
+            widths = [width for width in thumbnail_widths() if width < _display_width(image)]
+            targets = {
+                (width, fmt): derivative_name(name, width, fmt)
+                for width in widths for fmt in DERIVATIVE_FORMATS
+            }
+            if not overwrite:
+                targets = {key: target for key, target in targets.items() if not storage.exists(target)}
+            if not targets:
+                return widths, []
+            image = _prepare_for_resize(image)
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError) as exc:
+        logger.warning('Cannot make thumbnails for %s: %s', name, exc)
+        return [], []
+
+    written = []
+    for width in widths:
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.LANCZOS)
+        for fmt, (pil_format, _, options) in DERIVATIVE_FORMATS.items():
+            target = targets.get((width, fmt))
+            if target is None:
+                continue
+            buffer = BytesIO()
+            resized.save(buffer, pil_format, **options)
+            if storage.exists(target):
+                storage.delete(target)
+            written.append(storage.save(target, ContentFile(buffer.getvalue())))
+    return widths, written
+
+
+def thumbnail_record(name, widths):
+    """The value stored in a model's `thumbnails` column once `name` has been processed"""
+    return {'name': name, 'widths': list(widths)}
+
+
+def recorded_widths(file):
+    """Widths recorded for an ImageField file's current image, or None if not processed yet
+
+    Read from the owning row's `thumbnails` column, so building a srcset touches no storage.
+    """
+    record = getattr(file.instance, 'thumbnails', None) if file else None
+    if not record or record.get('name') != file.name:
+        return None
+    return record['widths']
+
+
+def srcset(file, fmt='jpeg'):
+    """`srcset` value for an ImageField file; empty until its thumbnails are recorded"""
+    widths = recorded_widths(file)
+    if not widths:
+        return ''
+    storage = getattr(file, 'storage', None) or default_storage
+    return ', '.join(f'{storage.url(derivative_name(file.name, width, fmt))} {width}w' for width in widths)
+
+
+def setup_backfill_worker():
+    # Pool workers started with "spawn" begin without Django configured
+    import django
+    django.setup()
+
+
+def backfill_one(args):
+    name, overwrite = args
+    return (name, *generate_derivatives(name, overwrite=overwrite))
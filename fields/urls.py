@@ -8,6 +8,8 @@ urlpatterns = [
     path('search/', views.advanced_search, name='advanced_search'),
     path('search/basic/', views.search_fields, name='search_fields'),
     path('<int:field_id>/', views.field_detail, name='field_detail'),
+    path('<int:field_id>/reviews/', views.field_reviews, name='field_reviews'),
+    path('cache-stats/', views.cache_stats, name='cache_stats'),
     path('add/', views.add_field, name='add_field'),
     path('manage/', views.manage_fields, name='manage_fields'),
     path('<int:field_id>/edit/', views.edit_field, name='edit_field'),
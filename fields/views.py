@@ -1,44 +1,113 @@
+import hashlib
+
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q, Avg, Count, Min, Max
+from django.db import transaction
+from django.db.models import Min, Max, Prefetch
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
-from datetime import date, time, timedelta, datetime
-from decimal import Decimal
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+from datetime import date, timedelta
+from . import geo
+from .amenities import MATCH_ALL, popular_amenities
+from .caching import field_cache, render_field_cards
+from .facets import apply_facets, facet_counts, parse_facets
 from .forms import FieldForm, ReviewForm
-from .models import Field, FieldTimeSlot, Review, ReviewImage
+from .models import Amenity, Field, FieldTimeSlot, Review, ReviewImage
+from .pagination import DEFAULT_PAGE_SIZE, KeysetPage, paginate_request, parse_page_size
+from .result_cache import search_results
+from .search import SEARCH_ORDER, search_fields_queryset
+from .search_filters import cached_search, normalize_filters
+from .slots import create_default_time_slots
+from .tasks import purge_field
 from datetime import date
 from bookings.models import TeamFormation, Booking
+from bookings.occupancy import read_occupancy
 from accounts.models import UserProfile
 
+# Newest first, with id as the tie-breaker so every row has a unique keyset position
+FIELD_LISTING_ORDER = ('-created_at', '-id')
+
+def render_recent_fields():
+    # Keyed on the listing version, which any Field save or delete moves on
+    key = field_cache.key('listing', field_cache.ALL_FIELDS, 'home_recent', scope='listing')
+    html = field_cache.get('listing', key)
+    if html is None:
+        recent_fields = Field.objects.filter(is_active=True).cards().order_by('-created_at')[:6]
+        html = render_to_string('fields/recent_fields.html', {'recent_fields': recent_fields})
+        field_cache.set(key, html)
+    return mark_safe(html)
+
+
+def amenity_choices(selected=()):
+    """(slug, name) for the amenity checkboxes: the most used ones, plus any already selected"""
+    key = field_cache.key('listing', field_cache.ALL_FIELDS, 'amenity_choices', scope='listing')
+    choices = field_cache.get('listing', key)
+    if choices is None:
+        choices = [(slug, name) for slug, name, _ in popular_amenities()]
+        field_cache.set(key, choices)
+    shown = {slug for slug, _ in choices}
+    extra = [slug for slug in selected if slug not in shown]
+    if extra:
+        choices = choices + list(Amenity.objects.filter(slug__in=extra).values_list('slug', 'name'))
+    return choices
+
+
+def active_price_range():
+    # Keyed on the listing version, so it is recomputed only after a field changes
+    key = field_cache.key('listing', field_cache.ALL_FIELDS, 'price_range', scope='listing')
+    price_range = field_cache.get('listing', key)
+    if price_range is None:
+        price_range = Field.objects.filter(is_active=True).aggregate(
+            min_price=Min('cost_per_hour'),
+            max_price=Max('cost_per_hour')
+        )
+        field_cache.set(key, price_range)
+    return price_range
+
+
+def listing_facet_counts(queryset, selected, *filters):
+    """facet_counts for a listing, cached under the listing version by its other filters"""
+    digest = hashlib.md5(repr((filters, sorted(selected.items()))).encode()).hexdigest()
+    key = field_cache.key('listing', field_cache.ALL_FIELDS, 'facets', digest, scope='listing')
+    facets = field_cache.get('listing', key)
+    if facets is None:
+        facets = facet_counts(queryset, selected)
+        field_cache.set(key, facets)
+    return facets
+
+
 def home(request):
-    recent_fields = Field.objects.filter(is_active=True).order_by('-created_at')[:6]
     context = {
-        'recent_fields': recent_fields,
+        'recent_fields_html': render_recent_fields(),
     }
     return render(request, "home.html", context)
 
 
 def fields(request):
-    fields_list = Field.objects.filter(is_active=True)
+    fields_list = Field.objects.filter(is_active=True).cards()
 
-    field_type = request.GET.get('field_type')
-    availability = request.GET.get('availability')
-    women_only = request.GET.get('women_only')
     location = request.GET.get('location')
 
-    if field_type and field_type != 'All':
-        fields_list = fields_list.filter(field_type=field_type)
-    if availability and availability != 'All':
-        fields_list = fields_list.filter(availability_type=availability)
-    if women_only == 'on':
-        fields_list = fields_list.filter(is_women_only=True)
     if location:
         fields_list = fields_list.filter(location__icontains=location)
 
+    selected = parse_facets(request.GET)
+    facets = listing_facet_counts(fields_list, selected, 'fields', location or '')
+    fields_list = apply_facets(fields_list, selected)
+
+    page = paginate_request(request, fields_list, FIELD_LISTING_ORDER)
+
     context = {
-        'fields': fields_list,
+        'fields': page,
+        'page': page,
+        'field_cards': render_field_cards(page, 'fields/field_card.html', request.user),
         'field_types': Field.FIELD_TYPES,
         'availability_types': Field.AVAILABILITY,
+        'facets': facets,
         'today': date.today(),
     }
     return render(request, 'fields/fields.html', context)
@@ -82,9 +151,16 @@ def add_field(request):
 
 @login_required
 def delete_field(request, field_id):
-    field = get_object_or_404(Field, id=field_id, owner=request.user)
+    field = get_object_or_404(Field.objects.owned_by(request.user), id=field_id)
     if request.method == 'POST':
-        field.delete()
+        # Hide it now; the cascade through bookings and reviews runs on a worker. The update is
+        # conditional, so of two concurrent deletes only the one that changed the row enqueues
+        with transaction.atomic():
+            if Field.objects.filter(pk=field.pk, deleted_at__isnull=True).update(
+                    is_active=False, deleted_at=timezone.now()):
+                field_cache.bump_on_commit(field.pk, 'page', 'card')
+                field_cache.bump_on_commit(field_cache.ALL_FIELDS, 'listing')
+                purge_field.enqueue(field_id=field.pk)
         messages.success(request, 'Field deleted successfully.')
         return redirect('fields:manage_fields')
     return render(request, 'fields/confirm_delete_field.html', {'field': field})
@@ -133,24 +209,26 @@ def add_review(request, field_id):
         review_form = ReviewForm(request.POST, instance=existing_review)
 
         if review_form.is_valid():
-            review = review_form.save(commit=False)
-            review.user = request.user
-            review.field = field
-            review.save()
-
             uploaded_files = request.FILES.getlist('review_images')
             image_captions = request.POST.getlist('image_captions')
 
-            if existing_review:
-                ReviewImage.objects.filter(review=review).delete()
+            # The review row and the field's rating aggregates move together
+            with transaction.atomic():
+                review = review_form.save(commit=False)
+                review.user = request.user
+                review.field = field
+                review.save()
+
+                if existing_review:
+                    ReviewImage.objects.filter(review=review).delete()
 
-            for i, uploaded_file in enumerate(uploaded_files[:5]):
-                caption = image_captions[i] if i < len(image_captions) else ''
-                ReviewImage.objects.create(
-                    review=review,
-                    image=uploaded_file,
-                    caption=caption
-                )
+                for i, uploaded_file in enumerate(uploaded_files[:5]):
+                    caption = image_captions[i] if i < len(image_captions) else ''
+                    ReviewImage.objects.create(
+                        review=review,
+                        image=uploaded_file,
+                        caption=caption
+                    )
 
             if existing_review:
                 messages.success(request, "Review updated successfully!")
@@ -200,7 +278,8 @@ def delete_review(request, field_id):
         return redirect('fields:field_detail', field_id=field.id)
 
     if request.method == 'POST':
-        review.delete()
+        with transaction.atomic():
+            review.delete()
         messages.success(request, 'Review deleted successfully.')
         return redirect('fields:field_detail', field_id=field.id)
 
@@ -209,31 +288,39 @@ def delete_review(request, field_id):
 
 
 
-def field_detail(request, field_id):
-    field = get_object_or_404(Field, id=field_id, is_active=True)
-    time_slots = FieldTimeSlot.objects.filter(field=field, is_available=True)
-    reviews = Review.objects.filter(field=field).order_by('-created_at')
-    avg_rating = reviews.aggregate(Avg('rating'))['rating__avg']
+REVIEW_FEED_ORDER = ('-created_at', '-id')
+REVIEW_PAGE_SIZE = 5
 
-    today = date.today()
-    available_dates = []
 
-    for i in range(8):
-        check_date = today + timedelta(days=i)
+def review_feed_queryset(field):
+    # One query for reviews with author and profile, one for all their images: two per page
+    return (
+        Review.objects.filter(field=field)
+        .select_related('user__userprofile')
+        .prefetch_related(Prefetch('images', queryset=ReviewImage.objects.order_by('id')))
+    )
+
 
-        booked_slots = set()
-        try:
-            bookings = Booking.objects.filter(
-                field=field,
-                booking_date=check_date,
-                status__in=['Confirmed', 'Pending']
-            ).values_list('time_slot_id', flat=True)
-            booked_slots.update(bookings)
-        except ImportError:
-            pass
+def render_field_availability(field, today):
+    """The 8-day availability strip and slot list, identical for every visitor
 
-        total_slots = time_slots.count()
-        available_slots = total_slots - len(booked_slots)
+    Returns (html, when a hold shown as booked lapses); the cached copy expires by then.
+    """
+    key = field_cache.key('fragment', field.id, 'availability_strip', today.isoformat())
+    cached = field_cache.get('fragment', key)
+    if cached is not None:
+        return cached
+
+    all_slots = list(FieldTimeSlot.objects.filter(field=field).order_by('id'))
+    time_slots = [slot for slot in all_slots if slot.is_available]
+    check_dates = [today + timedelta(days=i) for i in range(8)]
+    booked_by_date, hold_expires_at = read_occupancy(field.id, [slot.id for slot in all_slots], check_dates)
+    total_slots = len(time_slots)
+    available_dates = []
+
+    for check_date in check_dates:
+        booked_slots = booked_by_date[check_date]
+        available_slots = sum(1 for slot in time_slots if slot.id not in booked_slots)
 
         available_dates.append({
             'date': check_date,
@@ -242,27 +329,75 @@ def field_detail(request, field_id):
             'is_fully_booked': available_slots == 0
         })
 
+    html = render_to_string('fields/field_availability.html', {
+        'field': field,
+        'time_slots': time_slots,
+        'available_dates': available_dates,
+    })
+    field_cache.set(key, (html, hold_expires_at), timeout=field_cache.timeout_until(hold_expires_at))
+    return html, hold_expires_at
+
+
+def field_detail(request, field_id):
+    today = date.today()
+    # Anonymous visitors all see the same page; skip it when there is a flash message or a review cursor
+    cache_page = not request.user.is_authenticated and not request.GET and not len(messages.get_messages(request))
+    if cache_page:
+        page_key = field_cache.key('page', field_id, today.isoformat())
+        content = field_cache.get('page', page_key)
+        if content is not None:
+            return HttpResponse(content)
+
+    field = get_object_or_404(Field.objects.select_related('owner'), id=field_id, is_active=True)
+    reviews = paginate_request(request, review_feed_queryset(field), REVIEW_FEED_ORDER, REVIEW_PAGE_SIZE)
+    avg_rating = field.average_rating
+    availability_html, hold_expires_at = render_field_availability(field, today)
+    availability_html = mark_safe(availability_html)
+
     team_formations = []
     try:
         team_formations = TeamFormation.objects.filter(
             booking__field=field,
             looking_for_players=True,
-            booking__booking_date__gte=date.today(),
+            booking__booking_date__gte=today,
             booking__status='Confirmed'
-        )
+        ).select_related('booking__user', 'booking__time_slot')
     except ImportError:
         pass
 
     context = {
         'field': field,
-        'time_slots': time_slots,
         'reviews': reviews,
         'avg_rating': avg_rating,
         'team_formations': team_formations,
-        'available_dates': available_dates,
+        'availability_html': availability_html,
         'today': today,
     }
-    return render(request, 'fields/field_detail.html', context)
+    response = render(request, 'fields/field_detail.html', context)
+    if cache_page:
+        field_cache.set(page_key, response.content, timeout=field_cache.timeout_until(hold_expires_at))
+    return response
+
+
+@staff_member_required
+def cache_stats(request):
+    return JsonResponse({**field_cache.stats(), 'search_results': search_results.stats()})
+
+
+def field_reviews(request, field_id):
+    """Next page of the review feed as rendered cards, for the detail page's load-more button"""
+    field = get_object_or_404(Field, id=field_id, is_active=True)
+    reviews = paginate_request(request, review_feed_queryset(field), REVIEW_FEED_ORDER, REVIEW_PAGE_SIZE)
+    html = ''.join(
+        render_to_string('fields/review_card.html', {'review': review, 'field': field}, request=request)
+        for review in reviews
+    )
+    return JsonResponse({
+        'html': html,
+        'count': len(reviews),
+        'has_next': reviews.has_next,
+        'next_cursor': reviews.next_cursor,
+    })
 
 
 @login_required
@@ -285,40 +420,18 @@ def manage_fields(request):
         messages.error(request, "You need to be a field owner to access this page.")
         return redirect('accounts:user_profile')
 
-    owned_fields = Field.objects.filter(owner=request.user)
+    owned_fields = list(Field.objects.owned_by(request.user).cards())
+    slots_by_field = {field.id: [] for field in owned_fields}
+    for slot in FieldTimeSlot.objects.filter(field__owner=request.user, field__deleted_at__isnull=True).order_by('id'):
+        slots_by_field[slot.field_id].append(slot)
+    for field in owned_fields:
+        field.time_slots = slots_by_field[field.id]
     return render(request, 'fields/manage_fields.html', {'owned_fields': owned_fields})
 
 
-
-
-
-def create_default_time_slots(field):
-    time_slots = [
-        (time(6, 0), time(7, 30)),  
-        (time(7, 30), time(9, 0)),  
-        (time(9, 0), time(10, 30)),  
-        (time(10, 30), time(12, 0)),  
-        (time(12, 0), time(13, 30)),  
-        (time(13, 30), time(15, 0)),  
-        (time(15, 0), time(16, 30)),  
-        (time(16, 30), time(18, 0)),  
-        (time(18, 0), time(19, 30)),  
-        (time(19, 30), time(21, 0)),  
-        (time(21, 0), time(22, 30)),  
-    ]
-
-    for start_time, end_time in time_slots:
-        FieldTimeSlot.objects.create(
-            field=field,
-            start_time=start_time,
-            end_time=end_time,
-            is_available=True
-        )
-
-
 @login_required
 def edit_field(request, field_id):
-    field = get_object_or_404(Field, id=field_id, owner=request.user)
+    field = get_object_or_404(Field.objects.owned_by(request.user), id=field_id)
 
     if request.method == 'POST':
         field_form = FieldForm(request.POST, request.FILES, instance=field)
@@ -335,7 +448,7 @@ def edit_field(request, field_id):
 
 @login_required
 def manage_time_slots(request, field_id):
-    field = get_object_or_404(Field, id=field_id, owner=request.user)
+    field = get_object_or_404(Field.objects.owned_by(request.user), id=field_id)
     time_slots = FieldTimeSlot.objects.filter(field=field).order_by('start_time')
 
     context = {
@@ -345,147 +458,92 @@ def manage_time_slots(request, field_id):
     return render(request, 'fields/manage_time_slots.html', context)
 
 def advanced_search(request):
-    fields_list = Field.objects.filter(is_active=True)
-
-    field_type = request.GET.get('field_type')
-    availability = request.GET.get('availability')
-    location = request.GET.get('location')
-
-    min_price = request.GET.get('min_price')
-    max_price = request.GET.get('max_price')
-    min_rating = request.GET.get('min_rating')
-    amenities = request.GET.get('amenities')
-    capacity = request.GET.get('capacity')
-    women_only = request.GET.get('women_only')
-
-    available_date = request.GET.get('available_date')
-    available_time = request.GET.get('available_time')
-
-    if field_type and field_type != 'All':
-        fields_list = fields_list.filter(field_type=field_type)
-
-    if availability and availability != 'All':
-        fields_list = fields_list.filter(availability_type=availability)
-
-    if location:
-        fields_list = fields_list.filter(location__icontains=location)
-
-    if min_price:
-        try:
-            fields_list = fields_list.filter(cost_per_hour__gte=Decimal(min_price))
-        except:
-            pass
-
-    if max_price:
-        try:
-            fields_list = fields_list.filter(cost_per_hour__lte=Decimal(max_price))
-        except:
-            pass
-
-    if min_rating:
-        try:
-            fields_list = fields_list.annotate(
-                avg_rating=Avg('review__rating')
-            ).filter(avg_rating__gte=float(min_rating))
-        except:
-            pass
-
-    if amenities:
-        fields_list = fields_list.filter(amenities__icontains=amenities)
-
-    if capacity:
-        try:
-            fields_list = fields_list.filter(capacity__gte=int(capacity))
-        except:
-            pass
-
-    if women_only == 'on':
-        fields_list = fields_list.filter(is_women_only=True)
-
-    if available_date and available_time:
-        try:
-            check_date = datetime.strptime(available_date, '%Y-%m-%d').date()
-            check_time = datetime.strptime(available_time, '%H:%M').time()
-
-
-            matching_slots = FieldTimeSlot.objects.filter(
-                start_time__lte=check_time,
-                end_time__gt=check_time,
-                is_available=True
-            )
-
-            booked_slots = Booking.objects.filter(
-                booking_date=check_date,
-                time_slot__in=matching_slots,
-                status__in=['Confirmed', 'Pending']
-            ).values_list('time_slot_id', 'field_id')
-
-            booked_field_slot_pairs = set(booked_slots)
-            available_fields = []
-
-            for field in fields_list:
-                field_slots = matching_slots.filter(field=field)
-                has_available_slot = False
-
-                for slot in field_slots:
-                    if (slot.id, field.id) not in booked_field_slot_pairs:
-                        has_available_slot = True
-                        break
-
-                if has_available_slot:
-                    available_fields.append(field.id)
-
-            fields_list = fields_list.filter(id__in=available_fields)
-
-        except ValueError:
-            pass
-
-    sort_by = request.GET.get('sort_by', 'name')
-    if sort_by == 'price_low':
-        fields_list = fields_list.order_by('cost_per_hour')
-    elif sort_by == 'price_high':
-        fields_list = fields_list.order_by('-cost_per_hour')
-    elif sort_by == 'rating':
-        fields_list = fields_list.annotate(
-            avg_rating=Avg('review__rating')
-        ).order_by('-avg_rating')
-    elif sort_by == 'newest':
-        fields_list = fields_list.order_by('-created_at')
-    else:
-        fields_list = fields_list.order_by('name')
-
-    price_range = Field.objects.filter(is_active=True).aggregate(
-        min_price=Min('cost_per_hour'),
-        max_price=Max('cost_per_hour')
-    )
+    filters = normalize_filters(request.GET)
+    result = cached_search(filters)
+    page = paginate_result(request, result)
 
+    selected = dict(filters)
+    field_cards = render_field_cards(page, 'fields/search_field_card.html', request.user)
     context = {
-        'fields': fields_list,
+        'fields': page,
+        'page': page,
+        'result_count': len(result),
+        'field_cards': field_cards,
+        # Cards are cached per field, so the per-visitor distance is rendered next to them
+        'results': list(zip(field_cards, page)),
         'field_types': Field.FIELD_TYPES,
         'availability_types': Field.AVAILABILITY,
-        'price_range': price_range,
+        'price_range': active_price_range(),
+        'facets': result.facets,
         'current_filters': request.GET,
+        'amenity_choices': amenity_choices(selected.get('amenities', ())),
+        'selected_amenities': selected.get('amenities', ()),
+        'amenity_match': selected.get('amenity_match', MATCH_ALL),
+        'near': selected.get('near'),
+        'radius': selected.get('radius', geo.DEFAULT_RADIUS_KM),
+        'radius_choices': (2, 5, 10, 25, 50),
         'today': date.today(),
     }
     return render(request, 'fields/advanced_search.html', context)
 
+
+def paginate_result(request, result, default_page_size=DEFAULT_PAGE_SIZE):
+    """The requested `?page=` of a cached result as cards, with next/prev query strings
+
+    The ids are already ordered, so a page is a slice of them and the only query is
+    loading those cards.
+    """
+    page_size = parse_page_size(request.GET.get('page_size'), default=default_page_size)
+    last_page = max(1, -(-len(result) // page_size))
+    try:
+        number = min(max(int(request.GET.get('page', 1)), 1), last_page)
+    except ValueError:
+        number = 1
+    start = (number - 1) * page_size
+    ids = result.ids[start:start + page_size]
+
+    cards = {card.id: card for card in Field.objects.filter(id__in=list(ids), is_active=True).cards()}
+    items = []
+    for offset, field_id in enumerate(ids):
+        card = cards.get(field_id)
+        if card is not None:
+            card.distance_km = result.distance_of(start + offset)
+            items.append(card)
+
+    page = KeysetPage(
+        items,
+        next_cursor=number + 1 if number < last_page else None,
+        prev_cursor=number - 1 if number > 1 else None,
+        page_size=page_size,
+    )
+    params = request.GET.copy()
+    if page.next_cursor:
+        params['page'] = page.next_cursor
+        page.next_query = params.urlencode()
+    if page.prev_cursor:
+        params['page'] = page.prev_cursor
+        page.prev_query = params.urlencode()
+    return page
+
+
 def search_fields(request):
     query = request.GET.get('q', '')
 
+    fields_list = Field.objects.filter(is_active=True).cards()
     if query:
-        fields_list = Field.objects.filter(
-            Q(name__icontains=query) |
-            Q(location__icontains=query) |
-            Q(field_type__icontains=query) |
-            Q(description__icontains=query),
-            is_active=True
-        )
-    else:
-        fields_list = Field.objects.filter(is_active=True)
+        fields_list = search_fields_queryset(fields_list, query)
+
+    selected = parse_facets(request.GET)
+    facets = listing_facet_counts(fields_list, selected, 'search', query)
+    fields_list = apply_facets(fields_list, selected)
+    page = paginate_request(request, fields_list, SEARCH_ORDER if query else FIELD_LISTING_ORDER)
 
     context = {
-        'fields': fields_list,
+        'fields': page,
+        'page': page,
+        'field_cards': render_field_cards(page, 'fields/field_card.html', request.user),
         'query': query,
+        'facets': facets,
     }
     return render(request, 'fields/fields.html', context)
 
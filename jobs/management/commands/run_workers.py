@@ -0,0 +1,113 @@
+import asyncio
+import multiprocessing
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs.worker import AsyncWorker, process_main, run_in_thread
+
+
+class Command(BaseCommand):
+    help = ('Run background job workers against the jobs table. Workers lease due jobs, retry failures '
+            'with exponential backoff and pick up jobs whose lease (visibility timeout) ran out.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=2,
+                            help='Number of worker threads or processes, or of jobs in flight with --mode async')
+        parser.add_argument('--mode', choices=('thread', 'process', 'async'), default='thread',
+                            help='Threads for I/O-bound tasks, processes for CPU-bound ones such as thumbnails, '
+                                 'async for async tasks that mostly wait on the network, such as payments')
+        parser.add_argument('--task', action='append', dest='tasks',
+                            help='Only run jobs of this task (dotted path); repeatable')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds to sleep when the queue is empty')
+        parser.add_argument('--batch-size', type=int, default=1, help='Jobs leased per poll')
+        parser.add_argument('--visibility-timeout', type=int,
+                            default=getattr(settings, 'JOBS_VISIBILITY_TIMEOUT', 300),
+                            help='Seconds a leased job stays invisible to other workers')
+        parser.add_argument('--burst', action='store_true', help='Exit once the queue is empty')
+        parser.add_argument('--max-jobs', type=int, default=None, help='Stop each worker after this many jobs')
+
+    def handle(self, *args, **options):
+        worker_options = {
+            'poll_interval': options['poll_interval'],
+            'batch_size': options['batch_size'],
+            'visibility_timeout': options['visibility_timeout'],
+            'burst': options['burst'],
+            'max_jobs': options['max_jobs'],
+            'tasks': options['tasks'],
+        }
+        self.stdout.write(f"Starting {options['concurrency']} {options['mode']} workers")
+        if options['mode'] == 'thread':
+            self._run_threads(options['concurrency'], worker_options)
+        elif options['mode'] == 'async':
+            self._run_async(options['concurrency'], worker_options)
+        else:
+            self._run_processes(options['concurrency'], worker_options)
+
+    def _run_threads(self, concurrency, worker_options):
+        stop = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *args: stop.set())
+        results = {}
+        threads = [
+            threading.Thread(target=run_in_thread, args=(stop, results, f'thread-{i}', worker_options))
+            for i in range(concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(0.5)
+        except KeyboardInterrupt:
+            self.stdout.write('Stopping after the current jobs...')
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+        self._report(results.values())
+
+    def _run_async(self, concurrency, worker_options):
+        worker_options.pop('batch_size')
+        stop = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *args: stop.set())
+        worker = AsyncWorker('async', stop, concurrency=concurrency, **worker_options)
+        try:
+            processed = asyncio.run(worker.run())
+        except KeyboardInterrupt:
+            # asyncio.run cancels the jobs in flight; their leases run out and they are retried
+            self.stdout.write('Interrupted; unfinished jobs will be retried.')
+            processed = worker.processed
+        self._report([processed])
+
+    def _report(self, results):
+        totals = {}
+        for processed in results:
+            for status, count in processed.items():
+                totals[status] = totals.get(status, 0) + count
+        self.stdout.write(self.style.SUCCESS(
+            f"Workers stopped: {totals.get('Done', 0)} done, {totals.get('Queued', 0)} requeued, "
+            f"{totals.get('Failed', 0)} failed"
+        ))
+
+    def _run_processes(self, concurrency, worker_options):
+        # Children must open their own database connections
+        connections.close_all()
+        processes = [
+            multiprocessing.Process(target=process_main, args=(f'process-{i}', worker_options))
+            for i in range(concurrency)
+        ]
+        for process in processes:
+            process.start()
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            self.stdout.write('Stopping after the current jobs...')
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.join()
+        self.stdout.write(self.style.SUCCESS('Workers stopped.'))
@@ -0,0 +1,177 @@
+import asyncio
+import inspect
+import logging
+import random
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import OperationalError
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from asgiref.sync import sync_to_async
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+TASKS = {}
+
+
+def task(func=None, *, max_attempts=5, on_failure=None):
+    """Register `func` as a job; call `func.enqueue(**kwargs)` to run it on a worker
+
+    Jobs are delivered at least once (a worker can die after the work but before
+    marking it done), so task bodies must be safe to repeat. `async def` tasks work
+    too: thread and process workers run them to completion one at a time, while
+    `run_workers --mode async` overlaps many of them on one event loop.
+
+    `on_failure`, a plain function, is called with the job's kwargs once the job has
+    failed its last attempt, to settle whatever the task left half done.
+    """
+    def register(func):
+        name = f'{func.__module__}.{func.__name__}'
+        TASKS[name] = func
+        func.task_name = name
+        func.on_failure = on_failure
+        func.enqueue = lambda run_at=None, **kwargs: enqueue(name, kwargs, run_at=run_at, max_attempts=max_attempts)
+        return func
+
+    return register(func) if func is not None else register
+
+
+def enqueue(task_name, payload=None, run_at=None, max_attempts=5):
+    """Insert a Queued job; inside a transaction it only becomes visible on commit"""
+    return Job.objects.create(
+        task=task_name,
+        payload=payload or {},
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts,
+    )
+
+
+def resolve_task(name):
+    if name not in TASKS:
+        # Importing the module runs its @task decorators
+        import_string(name)
+    return TASKS[name]
+
+
+def retry_delay(attempts):
+    base = getattr(settings, 'JOBS_RETRY_BACKOFF', 10)
+    cap = getattr(settings, 'JOBS_RETRY_BACKOFF_MAX', 3600)
+    delay = min(cap, base * 2 ** max(attempts - 1, 0))
+    # Jitter keeps a burst of failures from retrying in lockstep
+    return delay * random.uniform(1, 1.25)
+
+
+def due_jobs(now, tasks=None):
+    jobs = Job.objects.filter(
+        Q(status='Queued', run_at__lte=now) | Q(status='Running', locked_until__lt=now)
+    )
+    if tasks:
+        jobs = jobs.filter(task__in=tasks)
+    return jobs
+
+
+def claim(worker_id, limit=1, visibility_timeout=None, now=None, tasks=None):
+    """Lease up to `limit` due jobs to `worker_id`
+
+    SQLite has no SELECT ... FOR UPDATE SKIP LOCKED, so each candidate is taken with a
+    conditional UPDATE that only succeeds if the job is still due: two workers racing
+    for the same row see one winner and one zero-row update. `tasks` restricts the
+    claim to those task names.
+    """
+    if now is None:
+        now = timezone.now()
+    if visibility_timeout is None:
+        visibility_timeout = getattr(settings, 'JOBS_VISIBILITY_TIMEOUT', 300)
+    lease = now + timedelta(seconds=visibility_timeout)
+
+    claimed = []
+    candidates = list(due_jobs(now, tasks).order_by('run_at', 'id').values_list('id', flat=True)[:limit * 4])
+    for job_id in candidates:
+        try:
+            taken = due_jobs(now).filter(id=job_id).update(
+                status='Running', locked_by=worker_id, locked_until=lease,
+                attempts=F('attempts') + 1, updated_at=now,
+            )
+        except OperationalError:
+            # "database is locked": another worker is writing; try again next poll
+            break
+        if taken:
+            claimed.append(Job.objects.get(id=job_id))
+            if len(claimed) >= limit:
+                break
+    return claimed
+
+
+def _finish(job, worker_id, **changes):
+    # Only the current lease holder may settle the job; a timed-out worker's result is dropped
+    return Job.objects.filter(id=job.id, status='Running', locked_by=worker_id).update(
+        locked_until=None, updated_at=timezone.now(), **changes
+    )
+
+
+def _give_up(job):
+    handler = getattr(resolve_task(job.task), 'on_failure', None)
+    if handler is None:
+        return
+    try:
+        handler(**job.payload)
+    except Exception:
+        logger.exception('on_failure handler of job %s (%s) failed', job.id, job.task)
+
+
+def _record_outcome(job, worker_id, error=None):
+    if error is None:
+        _finish(job, worker_id, status='Done', finished_at=timezone.now())
+        return 'Done'
+    if job.attempts >= job.max_attempts:
+        logger.error('Job %s (%s) failed for good after %s attempts', job.id, job.task, job.attempts)
+        if _finish(job, worker_id, status='Failed', finished_at=timezone.now(), last_error=error):
+            _give_up(job)
+        return 'Failed'
+    delay = retry_delay(job.attempts)
+    logger.warning('Job %s (%s) failed, retrying in %.0fs', job.id, job.task, delay)
+    _finish(job, worker_id, status='Queued', last_error=error,
+            run_at=timezone.now() + timedelta(seconds=delay))
+    return 'Queued'
+
+
+def _lease_expired_on_last_attempt(job, worker_id):
+    if job.attempts <= job.max_attempts:
+        return False
+    if _finish(job, worker_id, status='Failed', finished_at=timezone.now(),
+               last_error=job.last_error or 'Lease expired on the final attempt'):
+        _give_up(job)
+    return True
+
+
+def run_job(job, worker_id):
+    """Run a claimed job; returns its new status"""
+    if _lease_expired_on_last_attempt(job, worker_id):
+        return 'Failed'
+    try:
+        result = resolve_task(job.task)(**job.payload)
+        if inspect.isawaitable(result):
+            asyncio.run(result)
+    except Exception:
+        return _record_outcome(job, worker_id, traceback.format_exc())
+    return _record_outcome(job, worker_id)
+
+
+async def arun_job(job, worker_id):
+    """`run_job` for an event loop: async tasks are awaited, sync ones run in a thread"""
+    if await sync_to_async(_lease_expired_on_last_attempt)(job, worker_id):
+        return 'Failed'
+    try:
+        func = resolve_task(job.task)
+        if inspect.iscoroutinefunction(func):
+            await func(**job.payload)
+        else:
+            await sync_to_async(func)(**job.payload)
+    except Exception:
+        return await sync_to_async(_record_outcome)(job, worker_id, traceback.format_exc())
+    return await sync_to_async(_record_outcome)(job, worker_id)
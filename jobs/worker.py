@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import os
+import socket
+import threading
+
+from asgiref.sync import sync_to_async
+from django.db import OperationalError, close_old_connections, connection
+
+from .queue import arun_job, claim, run_job
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    """Poll the jobs table and run whatever is due until `stop` is set
+
+    With `burst=True` the worker exits as soon as it finds the queue empty,
+    which is what tests and cron-style invocations want.
+    """
+
+    def __init__(self, name, stop, poll_interval=1.0, batch_size=1, visibility_timeout=None,
+                 burst=False, max_jobs=None, tasks=None):
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}:{name}'
+        self.stop = stop
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.visibility_timeout = visibility_timeout
+        self.burst = burst
+        self.max_jobs = max_jobs
+        self.tasks = tasks
+        self.processed = {'Done': 0, 'Queued': 0, 'Failed': 0}
+
+    def run(self):
+        handled = 0
+        try:
+            while not self.stop.is_set():
+                close_old_connections()
+                try:
+                    jobs = claim(self.worker_id, self.batch_size, self.visibility_timeout, tasks=self.tasks)
+                except OperationalError:
+                    self.stop.wait(self.poll_interval)
+                    continue
+                if not jobs:
+                    if self.burst:
+                        break
+                    self.stop.wait(self.poll_interval)
+                    continue
+                for job in jobs:
+                    try:
+                        status = run_job(job, self.worker_id)
+                    except OperationalError:
+                        # Could not record the outcome; the lease runs out and the job is retried
+                        logger.exception('Lost the result of job %s', job.id)
+                        continue
+                    self.processed[status] += 1
+                    handled += 1
+                    if self.max_jobs and handled >= self.max_jobs:
+                        return self.processed
+        finally:
+            connection.close()
+        return self.processed
+
+
+class AsyncWorker:
+    """Run up to `concurrency` jobs at once on one event loop
+
+    For tasks that mostly wait on the network, such as payment gateway calls: a job
+    awaiting a slow response costs a coroutine rather than a whole worker thread.
+    Database work still happens in a thread through sync_to_async.
+    """
+
+    def __init__(self, name, stop, concurrency=50, poll_interval=1.0, visibility_timeout=None,
+                 burst=False, max_jobs=None, tasks=None):
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}:{name}'
+        self.stop = stop
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.visibility_timeout = visibility_timeout
+        self.burst = burst
+        self.max_jobs = max_jobs
+        self.tasks = tasks
+        self.processed = {'Done': 0, 'Queued': 0, 'Failed': 0}
+
+    async def run(self):
+        running = set()
+        claimed = 0
+        while not self.stop.is_set():
+            free = self.concurrency - len(running)
+            if self.max_jobs:
+                free = min(free, self.max_jobs - claimed)
+            jobs = []
+            if free > 0:
+                try:
+                    jobs = await sync_to_async(self._claim)(free)
+                except OperationalError:
+                    pass
+            for job in jobs:
+                running.add(asyncio.create_task(self._run(job)))
+            claimed += len(jobs)
+            if not running:
+                if self.burst or (self.max_jobs and claimed >= self.max_jobs):
+                    break
+                await asyncio.sleep(self.poll_interval)
+                continue
+            done, running = await asyncio.wait(running, timeout=self.poll_interval,
+                                               return_when=asyncio.FIRST_COMPLETED)
+        if running:
+            await asyncio.wait(running)
+        await sync_to_async(self._close)()
+        return self.processed
+
+    def _close(self):
+        # Runs in the sync_to_async thread, whose connection is the one the jobs used
+        connection.close()
+
+    def _claim(self, limit):
+        close_old_connections()
+        return claim(self.worker_id, limit, self.visibility_timeout, tasks=self.tasks)
+
+    async def _run(self, job):
+        try:
+            status = await arun_job(job, self.worker_id)
+        except OperationalError:
+            logger.exception('Lost the result of job %s', job.id)
+            return
+        self.processed[status] += 1
+
+
+def run_in_thread(stop, results, name, options):
+    results[name] = Worker(name, stop, **options).run()
+
+
+def process_main(name, options):
+    """Entry point of a worker process; sets Django up itself so it also works under spawn"""
+    import django
+    django.setup()
+    import signal
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *args: stop.set())
+    signal.signal(signal.SIGINT, lambda *args: stop.set())
+    Worker(name, stop, **options).run()
@@ -19,6 +19,8 @@ INSTALLED_APPS = [
     'accounts',
     'fields',
     'bookings',
+    'jobs',
+    'api',
 ]
 
 MIDDLEWARE = [
@@ -86,4 +88,46 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
-DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
\ No newline at end of file
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# How long an unpaid (Pending) booking keeps its slot before the sweeper releases it
+BOOKING_HOLD_MINUTES = 15
+
+# Versioned field page cache. It must be shared by every process: web workers, run_workers,
+# expire_holds and import_fields all bump field versions, and a per-process backend
+# (LocMem) would never see the others' bumps (system check fields.E001). Use Memcached or
+# Redis once the site runs on more than one host.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    }
+}
+FIELD_CACHE_TIMEOUT = 300
+
+# Per-process LRU of advanced-search result ids (fields/result_cache.py): seconds an entry
+# lives, and the budget in ids (8 bytes each) shared by all entries
+SEARCH_RESULT_CACHE_TIMEOUT = 30
+SEARCH_RESULT_CACHE_MAX_IDS = 500000
+
+# Widths (px) of the WebP/JPEG thumbnails written next to every uploaded image
+THUMBNAIL_WIDTHS = (200, 400, 800)
+
+# Background job queue (jobs app); see `manage.py run_workers`
+JOBS_VISIBILITY_TIMEOUT = 300
+JOBS_RETRY_BACKOFF = 10
+JOBS_RETRY_BACKOFF_MAX = 3600
+
+# Snowflake transaction ids (bookings/transaction_ids.py). Give every host its own 0-1023 id;
+# left unset, each process leases a free id through lock files on this machine
+TRANSACTION_ID_WORKER_ID = os.environ.get('TRANSACTION_ID_WORKER_ID')
+
+# Payments are charged off the request by `run_workers --mode async --task bookings.tasks.process_payment`.
+# PAYMENT_GATEWAY names a bookings.gateways.PaymentGateway subclass; the stub answers locally
+PAYMENT_GATEWAY = 'bookings.gateways.StubGateway'
+PAYMENT_GATEWAY_TIMEOUT = 30
+PAYMENT_GATEWAY_RETRIES = 3
+PAYMENT_HOLD_MINUTES = 10
+PAYMENT_STUB_LATENCY = (0.5, 2.0)
+PAYMENT_STUB_ERROR_RATE = 0.0
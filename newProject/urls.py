@@ -10,6 +10,7 @@ urlpatterns = [
     path('accounts/', include('accounts.urls')),
     path('fields/', include('fields.urls')),
     path('bookings/', include('bookings.urls')),
+    path('api/v1/', include('api.urls')),
 ]
 
 # Serve media files during development